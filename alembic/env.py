@@ -11,8 +11,8 @@ from alembic import context
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from configs.db.postgresql import Base
-from src.modules.market_data.models import SecurityPrice
-from src.modules.etf.models import AnalysisLog
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate
+from src.modules.etf.models import AnalysisLog, Portfolio, PortfolioNav
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -0,0 +1,45 @@
+"""create corporate_actions and adjustment_factors tables
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('corporate_actions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('security_id', sa.Integer(), nullable=False),
+        sa.Column('ex_date', sa.DateTime(), nullable=False),
+        sa.Column('action_type', sa.String(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['security_id'], ['securities.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('security_id', 'ex_date', 'action_type', name='uq_corporate_action')
+    )
+    op.create_table('adjustment_factors',
+        sa.Column('security_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('price_factor', sa.Float(), nullable=False),
+        sa.Column('total_factor', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['security_id'], ['securities.id']),
+        sa.PrimaryKeyConstraint('security_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('adjustment_factors')
+    op.drop_table('corporate_actions')
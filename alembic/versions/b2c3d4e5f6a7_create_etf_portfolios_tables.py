@@ -0,0 +1,45 @@
+"""create etf_portfolios and etf_portfolio_nav tables
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c3d4e5f6a7'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('etf_portfolios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('weights', sa.JSON(), nullable=False),
+        sa.Column('latest_prices', sa.JSON(), nullable=True),
+        sa.Column('nav_computed_through', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_etf_portfolios_id'), 'etf_portfolios', ['id'], unique=False)
+
+    op.create_table('etf_portfolio_nav',
+        sa.Column('portfolio_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('nav', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['portfolio_id'], ['etf_portfolios.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('portfolio_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('etf_portfolio_nav')
+    op.drop_index(op.f('ix_etf_portfolios_id'), table_name='etf_portfolios')
+    op.drop_table('etf_portfolios')
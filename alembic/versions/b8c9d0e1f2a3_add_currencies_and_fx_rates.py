@@ -0,0 +1,36 @@
+"""add securities.currency and fx_rates hypertable
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('securities', sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False))
+
+    op.create_table('fx_rates',
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('usd_rate', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('date', 'currency')
+    )
+    # Rates are few per day; monthly chunks keep the chunk count low.
+    op.execute("SELECT create_hypertable('fx_rates', 'date', chunk_time_interval => interval '30 days')")
+
+
+def downgrade() -> None:
+    op.drop_table('fx_rates')
+    op.drop_column('securities', 'currency')
@@ -0,0 +1,72 @@
+"""dictionary-encode security_prices ticker into a securities table
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, None] = 'b2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('securities',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticker', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ticker')
+    )
+    op.execute("INSERT INTO securities (ticker) SELECT DISTINCT ticker FROM security_prices ORDER BY ticker")
+
+    # Rewriting into a fresh hypertable is a single pass, where an in-place UPDATE would
+    # leave a dead copy of every row and rebuild every index.
+    op.create_table('security_prices_encoded',
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('security_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['security_id'], ['securities.id']),
+        sa.PrimaryKeyConstraint('date', 'security_id')
+    )
+    op.execute(
+        "SELECT create_hypertable('security_prices_encoded', 'date', "
+        "chunk_time_interval => interval '1 day', create_default_indexes => false)"
+    )
+    op.execute(
+        "INSERT INTO security_prices_encoded (date, security_id, price) "
+        "SELECT p.date, s.id, p.price FROM security_prices p JOIN securities s ON s.ticker = p.ticker"
+    )
+    op.create_index('idx_security_date', 'security_prices_encoded', ['security_id', sa.literal_column('date DESC')], unique=False)
+
+    op.drop_table('security_prices')
+    op.rename_table('security_prices_encoded', 'security_prices')
+    op.execute("ANALYZE security_prices")
+
+
+def downgrade() -> None:
+    op.create_table('security_prices_decoded',
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('ticker', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('date', 'ticker')
+    )
+    op.execute("SELECT create_hypertable('security_prices_decoded', 'date', chunk_time_interval => interval '1 day')")
+    op.execute(
+        "INSERT INTO security_prices_decoded (date, ticker, price) "
+        "SELECT p.date, s.ticker, p.price FROM security_prices p JOIN securities s ON s.id = p.security_id"
+    )
+    op.drop_table('security_prices')
+    op.rename_table('security_prices_decoded', 'security_prices')
+
+    op.create_index('idx_ticker_date', 'security_prices', ['ticker', sa.literal_column('date DESC')], unique=False)
+    op.create_index(op.f('ix_security_prices_date'), 'security_prices', ['date'], unique=False)
+    op.create_index(op.f('ix_security_prices_ticker'), 'security_prices', ['ticker'], unique=False)
+    op.drop_table('securities')
@@ -0,0 +1,27 @@
+"""add etf_portfolios.nav_ingest_version
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL: the stored series predates the ingest log and is recomputed on its next view.
+    op.add_column('etf_portfolios', sa.Column('nav_ingest_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('etf_portfolios', 'nav_ingest_version')
@@ -0,0 +1,32 @@
+"""add bundle location columns to etf_analysis_files
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('etf_analysis_files', sa.Column('bundle_key', sa.String(), nullable=True))
+    op.add_column('etf_analysis_files', sa.Column('bundle_offset', sa.BigInteger(), nullable=True))
+    op.add_column('etf_analysis_files', sa.Column('bundle_length', sa.BigInteger(), nullable=True))
+    op.add_column('etf_analysis_files', sa.Column('content_encoding', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('etf_analysis_files', 'content_encoding')
+    op.drop_column('etf_analysis_files', 'bundle_length')
+    op.drop_column('etf_analysis_files', 'bundle_offset')
+    op.drop_column('etf_analysis_files', 'bundle_key')
@@ -0,0 +1,33 @@
+"""index etf_analysis_files for keyset-paginated history
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_etf_analysis_files_created_at_id', 'etf_analysis_files', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_etf_analysis_files_file_name_pattern',
+        'etf_analysis_files',
+        ['file_name'],
+        unique=False,
+        postgresql_ops={'file_name': 'varchar_pattern_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_etf_analysis_files_file_name_pattern', table_name='etf_analysis_files')
+    op.drop_index('ix_etf_analysis_files_created_at_id', table_name='etf_analysis_files')
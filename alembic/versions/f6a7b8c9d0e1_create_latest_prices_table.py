@@ -0,0 +1,38 @@
+"""create latest_prices table
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('latest_prices',
+        sa.Column('security_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['security_id'], ['securities.id']),
+        sa.PrimaryKeyConstraint('security_id')
+    )
+    # A single pass over the history; from here on the ingestion path keeps it current.
+    op.execute(
+        "INSERT INTO latest_prices (security_id, date, price) "
+        "SELECT DISTINCT ON (security_id) security_id, date, price "
+        "FROM security_prices ORDER BY security_id, date DESC"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('latest_prices')
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MATH_MAX_CONCURRENCY = int(os.getenv("MATH_MAX_CONCURRENCY", "4"))
+MATH_MAX_QUEUE = int(os.getenv("MATH_MAX_QUEUE", "16"))
+MATH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("MATH_QUEUE_TIMEOUT_SECONDS", "5"))
+MATH_RETRY_AFTER_SECONDS = int(os.getenv("MATH_RETRY_AFTER_SECONDS", "2"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a job cannot be admitted to a saturated executor"""
+    def __init__(self, retry_after: int):
+        super().__init__(f"Executor saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """
+    Bounds the number of jobs running on an executor and the number waiting for it.
+    Jobs beyond the queue bound, or waiting longer than the timeout, are rejected
+    immediately instead of piling up behind the running ones.
+    """
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            self.active = 0
+            self.waiting = 0
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after)
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+math_admission = AdmissionGate(
+    max_concurrency=MATH_MAX_CONCURRENCY,
+    max_queue=MATH_MAX_QUEUE,
+    queue_timeout=MATH_QUEUE_TIMEOUT_SECONDS,
+    retry_after=MATH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from configs.db.postgresql import engine as primary_engine
+
+load_dotenv()
+
+# Comma-separated read replica URLs; reads stay on the primary when empty.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+# A replica further behind than this is skipped until it catches up.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+# Reads go to the primary for this long after this process writes prices; writes by other
+# processes are caught by the watermark comparison at the next health check.
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", "60"))
+
+# Zero when everything received has been replayed, so an idle primary does not look like lag.
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+# Newest market data (price writes, corporate actions, FX rates); moves whenever any process ingests.
+WATERMARK_QUERY = text(
+    "SELECT (SELECT MAX(id) FROM price_ingests), "
+    "(SELECT MAX(date) FROM latest_prices), "
+    "(SELECT MAX(recorded_at) FROM corporate_actions), "
+    "(SELECT MAX(date) FROM fx_rates)"
+)
+
+
+class ReplicaState:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.behind = False
+        self.checked_at: Optional[float] = None
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """
+    Hands out sessions for read-only queries: round-robin over healthy replicas, falling back
+    to the primary when none is usable or reads are pinned after a write.
+    A replica is health-checked (reachable, replication lag, market data as new as the
+    primary's) at most once per interval, and marked down straight away when a connection to
+    it fails.
+    """
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Engine],
+        check_interval: float = REPLICA_HEALTH_CHECK_SECONDS,
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+        pin_seconds: float = REPLICA_PIN_SECONDS
+    ):
+        self.primary = primary
+        self.replicas = [ReplicaState(e) for e in replicas]
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.pin_seconds = pin_seconds
+        self.pinned_until = 0.0
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pin_primary(self, seconds: Optional[float] = None):
+        """Sends reads to the primary for a while, so data just written is visible."""
+        until = time.monotonic() + (self.pin_seconds if seconds is None else seconds)
+        with self._lock:
+            self.pinned_until = max(self.pinned_until, until)
+
+    def is_pinned(self) -> bool:
+        return time.monotonic() < self.pinned_until
+
+    def candidates(self) -> List[Engine]:
+        """Engines to try in order: healthy replicas starting at the round-robin position, then the primary."""
+        if not self.replicas or self.is_pinned():
+            return [self.primary]
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [r.engine for r in ordered if self._usable(r)] + [self.primary]
+
+    @contextmanager
+    def read_session(self):
+        session = None
+        for engine in self.candidates():
+            session = Session(bind=engine, autoflush=False)
+            try:
+                session.connection()
+                break
+            except DBAPIError:
+                session.close()
+                session = None
+                if engine is self.primary:
+                    raise
+                self._mark_down(engine)
+        if engine is self.primary:
+            self.primary_reads += 1
+        else:
+            self.replica_reads += 1
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _usable(self, replica: ReplicaState) -> bool:
+        now = time.monotonic()
+        if replica.checked_at is None or now - replica.checked_at >= self.check_interval:
+            self._check(replica)
+        return replica.healthy
+
+    def _check(self, replica: ReplicaState):
+        # Read before the replica's, so a replica that matches it has replayed every ingest
+        # committed before the check, whichever process wrote it.
+        primary_watermark = self._primary_watermark()
+        try:
+            with replica.engine.connect() as conn:
+                if replica.engine.dialect.name == "postgresql":
+                    lag = float(conn.execute(LAG_QUERY).scalar() or 0)
+                else:
+                    lag = 0.0
+                watermark = tuple(conn.execute(WATERMARK_QUERY).one())
+            replica.lag = lag
+            replica.behind = primary_watermark is not None and not caught_up(watermark, primary_watermark)
+            replica.healthy = lag <= self.max_lag and not replica.behind
+        except DBAPIError:
+            replica.lag = None
+            replica.healthy = False
+            replica.failures += 1
+        replica.checked_at = time.monotonic()
+
+    def _primary_watermark(self) -> Optional[tuple]:
+        """None when the primary cannot be read; replicas are then judged on lag alone."""
+        try:
+            with self.primary.connect() as conn:
+                return tuple(conn.execute(WATERMARK_QUERY).one())
+        except DBAPIError:
+            return None
+
+    def _mark_down(self, engine: Engine):
+        for replica in self.replicas:
+            if replica.engine is engine:
+                replica.healthy = False
+                replica.failures += 1
+                replica.checked_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "replicas": [
+                {
+                    "url": r.engine.url.render_as_string(hide_password=True),
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag,
+                    "behind_primary": r.behind,
+                    "failures": r.failures,
+                }
+                for r in self.replicas
+            ],
+            "pinned_to_primary": self.is_pinned(),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+        }
+
+
+def caught_up(replica: tuple, primary: tuple) -> bool:
+    return all(p is None or (r is not None and r >= p) for r, p in zip(replica, primary))
+
+
+replica_router = ReplicaRouter(
+    primary_engine,
+    [create_engine(url, pool_pre_ping=True) for url in DATABASE_REPLICA_URLS]
+)
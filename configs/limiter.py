@@ -1,6 +1,19 @@
+import os
+import time
+from dotenv import load_dotenv
+from limits import parse
 from slowapi import Limiter
 from starlette.requests import Request
 
+load_dotenv()
+
+# Shared counter store, e.g. "redis://localhost:6379/0" so every worker sees the same counters.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+DEFAULT_RATE_LIMIT = os.getenv("DEFAULT_RATE_LIMIT", "30/hour")
+ANALYZE_RATE_LIMIT = os.getenv("ANALYZE_RATE_LIMIT", "5/minute")
+# Budget of work per client, measured in ticker-days (tickers x days of price history).
+ANALYZE_COST_LIMIT = os.getenv("ANALYZE_COST_LIMIT", "2000000/hour")
+
 def get_real_user_ip(request: Request):
     """
     Retrieves the real IP address of the user.
@@ -10,7 +23,46 @@ def get_real_user_ip(request: Request):
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
         return forwarded.split(",")[0]
-    
+
     return request.client.host or "127.0.0.1"
 
-limiter = Limiter(key_func=get_real_user_ip, default_limits=["30/hour"])
\ No newline at end of file
+limiter = Limiter(
+    key_func=get_real_user_ip,
+    default_limits=[DEFAULT_RATE_LIMIT],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+)
+
+
+class CostLimiter:
+    """
+    Charges each request by its estimated work instead of counting requests.
+    Shares the slowapi storage backend so counters are global across workers.
+    """
+    def __init__(self, limit_value: str, namespace: str):
+        self.item = parse(limit_value)
+        self.namespace = namespace
+
+    def _clamp(self, cost: int) -> int:
+        # A single request larger than the whole budget is still allowed once per window.
+        return max(1, min(int(cost), self.item.amount))
+
+    def hit(self, key: str, cost: int) -> bool:
+        return limiter.limiter.hit(self.item, self.namespace, key, cost=self._clamp(cost))
+
+    def reconcile(self, key: str, charged: int, cost: int) -> bool:
+        """
+        Corrects an up-front `charged` estimate to the actual `cost` (refunding any excess).
+        Returns False when the corrected total is over the budget.
+        """
+        delta = self._clamp(cost) - self._clamp(charged)
+        if delta == 0:
+            return True
+        total = limiter.limiter.storage.incr(self.item.key_for(self.namespace, key), self.item.get_expiry(), amount=delta)
+        return total <= self.item.amount
+
+    def retry_after(self, key: str) -> int:
+        reset_time, _ = limiter.limiter.get_window_stats(self.item, self.namespace, key)
+        return max(1, int(reset_time - time.time()))
+
+
+analyze_cost_limiter = CostLimiter(ANALYZE_COST_LIMIT, "analyze_cost")
@@ -0,0 +1,95 @@
+"""
+Portfolio math per compute backend (pandas, numpy, polars if installed) across input sizes:
+aligning long-format price records into a forward-filled panel, then the weighted NAV sum.
+
+    python scripts/bench_compute_backends.py --sizes 10,100,1000,5000 --days 250
+
+Prints the best time per backend and size, then a COMPUTE_BACKEND_BANDS value that picks the
+fastest backend per size band (size = price quotes, the measure `compute.align` selects on).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.modules.etf.compute import BACKENDS
+from src.modules.market_data.repository import PriceRecord
+
+
+def synthetic_records(tickers: int, days: int, holes: float = 0.05):
+    """Random-walk quotes on business days with a few missing per ticker, in database order."""
+    rng = np.random.default_rng(0)
+    dates = [d.to_pydatetime() for d in pd.bdate_range("2031-01-01", periods=days)]
+    paths = 50 * np.cumprod(1 + rng.normal(0.0003, 0.015, (days, tickers)), axis=0)
+    quoted = rng.random((days, tickers)) > holes
+    names = [f"T{i:05d}" for i in range(tickers)]
+    return [
+        PriceRecord(dates[i], names[j], float(paths[i, j]))
+        for j in range(tickers)
+        for i in range(days)
+        if quoted[i, j]
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bands(results: dict, margin: float) -> str:
+    """
+    Lower bound of each size where the fastest backend changes, as config text. A backend only
+    takes over from the previous band's when it is more than `margin` faster.
+    """
+    chosen = []
+    for quotes, timings in sorted(results.items()):
+        fastest = min(timings, key=timings.get)
+        if chosen and timings[chosen[-1][1]] <= timings[fastest] * (1 + margin):
+            continue
+        chosen.append((quotes if chosen else 0, fastest))
+    return ",".join(f"{lower}:{name}" for lower, name in chosen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,50,200,1000,5000", help="Tickers per portfolio")
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--ffill-limit", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--margin", type=float, default=0.1, help="Speed-up needed to switch backend between bands")
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS.values() if b.available()]
+    skipped = [b.name for b in BACKENDS.values() if not b.available()]
+    if skipped:
+        print(f"Not installed: {', '.join(skipped)}")
+
+    results = {}
+    print(f"{args.days} days, ffill limit {args.ffill_limit}")
+    print(f"{'tickers':>8} {'quotes':>9} {'backend':<8} {'align ms':>9} {'nav ms':>8} {'total ms':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        records = synthetic_records(size, args.days)
+        timings = {}
+        for backend in backends:
+            panel = backend.align(records, args.ffill_limit)
+            weights = pd.Series(1.0, index=panel.prices.columns)
+            align = best_of(args.repeat, lambda: backend.align(records, args.ffill_limit))
+            nav = best_of(args.repeat, lambda: backend.weighted_sum(panel.prices, weights))
+            timings[backend.name] = align + nav
+            print(f"{size:>8} {len(records):>9} {backend.name:<8} {align * 1000:>9.2f} {nav * 1000:>8.2f} {(align + nav) * 1000:>9.2f}")
+        results[len(records)] = timings
+
+    print(f"\nCOMPUTE_BACKEND_BANDS={bands(results, args.margin)}")
+
+
+if __name__ == "__main__":
+    main()
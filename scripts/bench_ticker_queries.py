@@ -0,0 +1,100 @@
+"""
+get_price_history latency and statement size across portfolio sizes, per ticker-set strategy:
+IN list, one `= ANY(array)` parameter (PostgreSQL only) and sharded fan-out over pooled connections.
+
+    python scripts/bench_ticker_queries.py --url postgresql://localhost/etf_bench --sizes 10,100,1000,5000,10000
+    python scripts/bench_ticker_queries.py            # temporary SQLite database
+
+A synthetic BENCH* universe is loaded on first use, so point --url at a dedicated database.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from configs.db.postgresql import Base
+from src.modules.market_data import repository
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+PREFIX = "BENCH"
+DEFAULT_ARRAY_THRESHOLD = repository.PRICE_HISTORY_ARRAY_THRESHOLD
+
+
+def seed(db, tickers: int, days: int):
+    names = [f"{PREFIX}{i:05d}" for i in range(tickers)]
+    if db.query(Security.id).filter(Security.ticker == names[-1]).first() is not None:
+        return names
+    ids = security_ids.ensure(db, names)
+    dates = [d.to_pydatetime() for d in pd.bdate_range("2031-01-01", periods=days)]
+    paths = 50 * np.cumprod(1 + np.random.default_rng(0).normal(0.0003, 0.015, (days, tickers)), axis=0)
+    for i, date in enumerate(dates):
+        db.execute(insert(SecurityPrice.__table__), [
+            {"date": date, "security_id": ids[t], "price": float(paths[i, j])}
+            for j, t in enumerate(names)
+        ])
+    db.commit()
+    return names
+
+
+def strategies(dialect: str, fan_out: int) -> dict:
+    """name -> (array threshold, fan-out)"""
+    chosen = {"in_list": (float("inf"), 1)}
+    if dialect == "postgresql":
+        chosen["any_array"] = (0, 1)
+    chosen[f"fan_out_{fan_out}"] = (DEFAULT_ARRAY_THRESHOLD, fan_out)
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Dedicated database, migrated with alembic (default: temporary SQLite)")
+    parser.add_argument("--sizes", default="10,100,1000,5000,10000")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp(prefix='ticker-bench-')) / 'bench.db'}"
+    engine = create_engine(url, pool_size=max(5, args.fan_out))
+    if not args.url:
+        Base.metadata.create_all(engine, tables=[Security.__table__, SecurityPrice.__table__, LatestPrice.__table__, CorporateAction.__table__, AdjustmentFactor.__table__])
+    db = sessionmaker(bind=engine)()
+    names = seed(db, max(sizes), args.days)
+    repo = MarketDataRepository(db)
+    # Same tickers for every strategy; shuffled so shards do not line up with id ranges.
+    rng = np.random.default_rng(1)
+    repository.PRICE_HISTORY_FAN_OUT_MIN_TICKERS = 1
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    print(f"{engine.dialect.name}, {args.days} days per ticker")
+    print(f"{'tickers':>8} {'strategy':<12} {'rows':>9} {'best ms':>9} {'statements':>10} {'sql bytes':>10}")
+    for size in sizes:
+        tickers = list(rng.choice(names, size, replace=False))
+        for name, (threshold, fan_out) in strategies(engine.dialect.name, args.fan_out).items():
+            repository.PRICE_HISTORY_ARRAY_THRESHOLD = threshold
+            best, rows = float("inf"), 0
+            for _ in range(args.repeat):
+                statements.clear()
+                started = time.perf_counter()
+                rows = len(repo.get_price_history(tickers, fan_out=fan_out))
+                best = min(best, time.perf_counter() - started)
+            history = [s for s in statements if "security_prices" in s]
+            print(f"{size:>8} {name:<12} {rows:>9} {best * 1000:>9.1f} {len(history):>10} {sum(map(len, history)):>10}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
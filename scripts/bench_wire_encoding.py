@@ -0,0 +1,68 @@
+"""
+Payload size and encode time of the NAV series encodings, with and without compression.
+
+    python scripts/bench_wire_encoding.py --years 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from configs.compression import COMPRESSORS
+from src.modules.etf import schemas
+from src.modules.etf.encoding import encode_series
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2000-01-03", periods=args.years * 252)
+    navs = np.round(1000 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(dates))), 2)
+    full = schemas.EtfAnalysisResponse(
+        etf_name="bench",
+        latest_close=float(navs[-1]),
+        etf_time_series=[schemas.TimeSeriesPoint(date=str(d), nav=float(v)) for d, v in zip(dates, navs)],
+        latest_prices=[]
+    )
+
+    print(f"{len(dates)} daily points")
+    print(f"{'encoding':<10} {'bytes':>10} {'encode ms':>10}  " + "  ".join(f"{c + ' bytes':>11} {c + ' ms':>8}" for c in COMPRESSORS))
+    def encode(encoding: str) -> bytes:
+        if encoding == "json":
+            return full.model_dump_json().encode()
+        compact = full.model_copy(update={
+            "etf_time_series": [],
+            "etf_time_series_compact": encode_series(full.etf_time_series, encoding)
+        })
+        return compact.model_dump_json().encode()
+
+    for encoding in ("json", "delta", "float32"):
+        encode_time, body = timed(lambda: encode(encoding), args.repeat)
+        row = f"{encoding:<10} {len(body):>10} {encode_time * 1000:>10.2f}  "
+        for compress in COMPRESSORS.values():
+            compress_time, compressed = timed(lambda: compress(body), args.repeat)
+            row += f"{len(compressed):>11} {compress_time * 1000:>8.2f}  "
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
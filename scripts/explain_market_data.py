@@ -0,0 +1,51 @@
+"""
+EXPLAIN (ANALYZE, BUFFERS) of every MarketDataRepository query against a dedicated TimescaleDB,
+with a synthetic PLAN* universe loaded on first use. Plans are written as JSON artifacts;
+pass a previous run's directory as --baseline to flag regressions (exit code 1).
+
+    python scripts/explain_market_data.py --url postgresql://localhost/etf_plans --out plans/after --baseline plans/before
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.modules.market_data.tests.query_plans import seed_plan_dataset, run_plan_checks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True, help="Dedicated TimescaleDB database, migrated with alembic")
+    parser.add_argument("--out", default=".query-plans")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    db = sessionmaker(bind=create_engine(args.url))()
+    try:
+        if seed_plan_dataset(db):
+            print("loaded the PLAN* dataset")
+        results = run_plan_checks(db, Path(args.out), Path(args.baseline) if args.baseline else None)
+    finally:
+        db.close()
+
+    print(f"{'query':<22} {'chunks':>6} {'buffers':>8} {'exec ms':>8}  indexes")
+    failed = False
+    for name, result in results.items():
+        for summary in result["summaries"]:
+            print(
+                f"{name:<22} {summary['chunks_scanned']:>6} {summary['shared_buffers']:>8} "
+                f"{summary['execution_ms'] or 0:>8.2f}  {', '.join(summary['indexes']) or '-'}"
+            )
+        for problem in result["problems"]:
+            failed = True
+            print(f"  REGRESSION {name}: {problem}")
+    print(f"plans written to {args.out}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Loads corporate actions from a CSV with columns ticker,ex_date,action_type,value and updates
+the adjustment factors of the securities it touches. `value` is new shares per old share for a
+split (4 for a 4-for-1) and the cash amount per share for a dividend.
+
+    python scripts/load_corporate_actions.py actions.csv
+"""
+import sys
+import csv
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from configs.db.postgresql import SessionLocal
+from src.modules.market_data.adjustments import ACTION_TYPES
+from src.modules.market_data.models import CorporateAction
+from src.modules.market_data.repository import MarketDataRepository
+
+
+def read_corporate_actions(csv_path: str) -> list[CorporateAction]:
+    actions = []
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            try:
+                action_type = row['action_type'].strip().lower()
+                value = float(row['value'])
+                if action_type not in ACTION_TYPES or value < 0 or (action_type == "split" and value == 0):
+                    raise ValueError(f"invalid {action_type} value {value}")
+                actions.append(CorporateAction(
+                    ticker=row['ticker'].strip().upper(),
+                    ex_date=datetime.strptime(row['ex_date'].strip(), '%Y-%m-%d'),
+                    action_type=action_type,
+                    value=value
+                ))
+            except (ValueError, KeyError, AttributeError) as e:
+                print(f"Skipping line {line}: {e}")
+    return actions
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    actions = read_corporate_actions(sys.argv[1])
+    print(f"Loaded {len(actions)} corporate actions")
+
+    db = SessionLocal()
+    try:
+        MarketDataRepository(db).save_corporate_actions(actions)
+        print(f"Saved {len(actions)} corporate actions")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,70 @@
+"""
+Loads FX rates and ticker currencies.
+
+    python scripts/load_fx_rates.py --rates fx.csv --currencies tickers.csv
+
+--rates is laid out like the price CSV: a DATE column, then one column per currency
+holding the USD value of one unit on that day (e.g. CAD 0.74). --currencies has
+columns ticker,currency; tickers not listed there are quoted in USD.
+"""
+import argparse
+import csv
+import sys
+from pathlib import Path
+from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from configs.db.postgresql import SessionLocal
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.models import FxRate
+
+
+def read_fx_rates(csv_path: str) -> list[FxRate]:
+    rates = []
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        currencies = [col for col in reader.fieldnames if col != 'DATE']
+        for row in reader:
+            try:
+                date = datetime.strptime(row['DATE'], '%Y-%m-%d')
+                for currency in currencies:
+                    rate_str = row.get(currency, '').strip()
+                    if rate_str:
+                        rates.append(FxRate(date=date, currency=currency.strip().upper(), usd_rate=float(rate_str)))
+            except (ValueError, KeyError):
+                continue
+    return rates
+
+
+def read_currencies(csv_path: str) -> dict:
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        return {
+            row['ticker'].strip().upper(): row['currency'].strip().upper()
+            for row in csv.DictReader(file)
+            if len(row['currency'].strip()) == 3
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", help="Wide CSV of USD rates per currency")
+    parser.add_argument("--currencies", help="CSV of ticker,currency")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        repo = MarketDataRepository(db)
+        if args.currencies:
+            currencies = read_currencies(args.currencies)
+            repo.set_currencies(currencies)
+            print(f"Set the currency of {len(currencies)} tickers")
+        if args.rates:
+            rates = read_fx_rates(args.rates)
+            repo.save_fx_rates(rates)
+            print(f"Saved {len(rates)} FX rates")
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+    finally:
+        db.close()
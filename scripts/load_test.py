@@ -0,0 +1,282 @@
+"""
+Load generator for POST /etf/analyze with latency percentiles.
+
+By default the app runs in-process on offline stand-ins: a SQLite database seeded from
+sample-data/ plus synthetic tickers, and the local storage backend under a temporary directory.
+
+    python scripts/load_test.py --concurrency 16 --duration 30 --mix 5:0.5,50:0.3,500:0.2
+    python scripts/load_test.py --url http://localhost:8000 --requests 2000
+    python scripts/load_test.py --requests 500 --record run.jsonl
+    python scripts/load_test.py --replay run.jsonl --speed 2
+
+Every simulated client sends its own X-Forwarded-For address, so per-client rate limits
+apply as they would in production; raise --clients or ANALYZE_RATE_LIMIT to measure
+capacity rather than the limiter.
+
+Replay logs are JSON lines: {"t": seconds since start, "file": "<csv text>", "query": {...},
+"client": "<ip>"}. --record writes one for the requests of a run.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+SAMPLE_PRICES = ROOT / "sample-data" / "bankofmontreal-prices.csv"
+SAMPLE_PORTFOLIO = ROOT / "sample-data" / "bankofmontreal-ETF1.csv"
+
+
+def configure_offline(workdir: Path):
+    """Points the app at local stand-ins. Must run before anything imports the app."""
+    os.environ["DATABASE_POSTGRESQL_URL"] = f"sqlite:///{workdir / 'loadtest.db'}"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["STORAGE_LOCAL_ROOT"] = str(workdir / "storage")
+    os.environ.setdefault("DATABASE_REPLICA_URLS", "")
+
+
+def seed_offline_db(synthetic_tickers: int, seed: int) -> list:
+    """Creates the schema and loads the sample prices plus synthetic random-walk tickers."""
+    from configs.db.postgresql import Base, engine, SessionLocal
+    from src.modules.etf import models as etf_models  # noqa: F401 (registers tables)
+    from src.modules.market_data.models import SecurityPrice
+    from src.modules.market_data.repository import MarketDataRepository
+    from scripts.seed_db import read_csv_and_transform
+
+    Base.metadata.create_all(engine)
+    prices = read_csv_and_transform(str(SAMPLE_PRICES))
+    dates = sorted({p.date for p in prices})
+
+    rng = np.random.default_rng(seed)
+    paths = 50 * np.cumprod(1 + rng.normal(0.0003, 0.015, (len(dates), synthetic_tickers)), axis=0)
+    names = [f"SYN{i:04d}" for i in range(synthetic_tickers)]
+    prices += [
+        SecurityPrice(date=d, ticker=t, price=float(paths[i, j]))
+        for i, d in enumerate(dates)
+        for j, t in enumerate(names)
+    ]
+
+    db = SessionLocal()
+    try:
+        MarketDataRepository(db).bulk_save_prices(prices)
+    finally:
+        db.close()
+    return sorted({p.ticker for p in prices})
+
+
+def parse_mix(value: str) -> list:
+    """'5:0.5,50:0.5' -> [(5, 0.5), (50, 0.5)]; the sample portfolio is size 'sample'."""
+    mix = []
+    for part in value.split(","):
+        size, share = part.split(":")
+        mix.append((size if size == "sample" else int(size), float(share)))
+    total = sum(share for _, share in mix)
+    return [(size, share / total) for size, share in mix]
+
+
+def portfolio_pool(tickers: list, mix: list, distinct: int, rng: random.Random) -> list:
+    """`distinct` portfolio CSVs drawn from the size mix; requests sample from this pool."""
+    sample = SAMPLE_PORTFOLIO.read_text()
+    sizes, shares = zip(*mix)
+    pool = []
+    for size in rng.choices(sizes, weights=shares, k=distinct):
+        if size == "sample":
+            pool.append(sample)
+            continue
+        chosen = rng.sample(tickers, min(size, len(tickers)))
+        rows = "\n".join(f"{t},{rng.uniform(1, 100):.3f}" for t in chosen)
+        pool.append(f"name,weight\n{rows}\n")
+    return pool
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.log = []
+        self.elapsed = 0.0
+
+    def report(self, elapsed: float) -> dict:
+        latencies = np.array(self.latencies) * 1000
+        total = len(self.latencies)
+        ok = sum(n for status, n in self.statuses.items() if isinstance(status, int) and status < 400)
+        limited = self.statuses.get(429, 0)
+        failed = total - ok - limited
+        pct = lambda q: round(float(np.percentile(latencies, q)), 2) if total else None
+        return {
+            "requests": total,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+            "ok_rps": round(ok / elapsed, 2) if elapsed else None,
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": pct(100)},
+            "rate_limited_rate": round(limited / total, 4) if total else None,
+            "error_rate": round(failed / total, 4) if total else None,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=lambda kv: str(kv[0]))},
+            "errors": dict(self.errors),
+        }
+
+
+async def send(client, recorder: Recorder, csv_text: str, query: dict, ip: str, started: float, record: bool):
+    sent_at = time.perf_counter()
+    try:
+        response = await client.post(
+            "/etf/analyze",
+            params=query,
+            files={"file": ("portfolio.csv", csv_text.encode(), "text/csv")},
+            headers={"X-Forwarded-For": ip}
+        )
+        recorder.statuses[response.status_code] += 1
+    except Exception as e:
+        recorder.statuses["exception"] += 1
+        recorder.errors[type(e).__name__] += 1
+    recorder.latencies.append(time.perf_counter() - sent_at)
+    if record:
+        recorder.log.append({"t": round(sent_at - started, 4), "file": csv_text, "query": query, "client": ip})
+
+
+async def run_closed_loop(client, args, pool: list, rng: random.Random) -> Recorder:
+    """`concurrency` workers, each sending its next request as soon as the previous one finishes."""
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration if args.duration else None
+    remaining = [args.requests]
+    query = dict(args.query)
+
+    async def worker():
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            client_id = rng.randrange(args.clients)
+            ip = f"10.{client_id >> 16 & 255}.{client_id >> 8 & 255}.{client_id & 255}"
+            await send(client, recorder, rng.choice(pool), query, ip, started, bool(args.record))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    recorder.elapsed = time.perf_counter() - started
+    return recorder
+
+
+async def run_replay(client, args) -> Recorder:
+    """Sends each logged request at its original offset (divided by --speed), with at most --concurrency in flight."""
+    entries = [json.loads(line) for line in Path(args.replay).read_text().splitlines() if line.strip()]
+    recorder = Recorder()
+    started = time.perf_counter()
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def fire(entry):
+        delay = entry.get("t", 0) / args.speed - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with limit:
+            await send(client, recorder, entry["file"], entry.get("query", {}), entry.get("client", "127.0.0.1"), started, bool(args.record))
+
+    await asyncio.gather(*(fire(e) for e in entries))
+    recorder.elapsed = time.perf_counter() - started
+    return recorder
+
+
+async def wait_until_ready(client, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    print("warning: /readyz did not report ready, measuring anyway", file=sys.stderr)
+
+
+async def main_async(args):
+    import httpx
+
+    rng = random.Random(args.seed)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        tickers = [row for row in next(csv.reader(SAMPLE_PRICES.open())) if row != "DATE"]
+        lifespan = workdir = None
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix="etf-loadtest-"))
+        configure_offline(workdir)
+        tickers = seed_offline_db(args.synthetic_tickers, args.seed)
+        from src.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        print(f"offline stand-ins in {workdir} ({len(tickers)} tickers)", file=sys.stderr)
+
+    try:
+        await wait_until_ready(client, args.ready_timeout)
+        if args.replay:
+            recorder = await run_replay(client, args)
+        else:
+            pool = portfolio_pool(tickers, parse_mix(args.mix), args.distinct, rng)
+            recorder = await run_closed_loop(client, args, pool, rng)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if workdir is not None and not args.keep_data:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.record:
+        with open(args.record, "w") as f:
+            for entry in sorted(recorder.log, key=lambda e: e["t"]):
+                f.write(json.dumps(entry) + "\n")
+    return recorder.report(recorder.elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--mix", default="sample:0.2,10:0.4,50:0.3,300:0.1", help="Portfolio size:share list")
+    parser.add_argument("--distinct", type=int, default=200, help="Distinct portfolios to draw requests from")
+    parser.add_argument("--clients", type=int, default=1000, help="Distinct client addresses")
+    parser.add_argument("--query", type=json.loads, default={}, help='Query parameters as JSON, e.g. \'{"include_analytics": true}\'')
+    parser.add_argument("--synthetic-tickers", type=int, default=500)
+    parser.add_argument("--keep-data", action="store_true", help="Keep the offline database and storage directory")
+    parser.add_argument("--replay", help="Replay a JSON-lines request log")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor")
+    parser.add_argument("--record", help="Write the requests sent to a JSON-lines log")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--ready-timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    latency = report["latency_ms"]
+    print(f"requests      {report['requests']} in {report['elapsed_seconds']}s")
+    print(f"throughput    {report['throughput_rps']} req/s ({report['ok_rps']} ok/s)")
+    print(f"latency ms    p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"429 rate      {report['rate_limited_rate']}")
+    print(f"error rate    {report['error_rate']}")
+    print(f"statuses      {report['statuses']}")
+    if report["errors"]:
+        print(f"exceptions    {report['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Reports the on-disk size of security_prices and the time of typical lookups.
+Run it before and after `alembic upgrade` to compare the string-keyed and
+dictionary-encoded layouts; both schemas are detected automatically.
+
+    python scripts/report_price_storage.py --tickers 50 --repeat 20
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from configs.db.postgresql import SessionLocal
+
+
+def mb(size) -> str:
+    return f"{(size or 0) / 1024 / 1024:.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        columns = {row[0] for row in db.execute(text(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'security_prices'"
+        ))}
+        encoded = "security_id" in columns
+        print(f"layout: {'(date, security_id, price)' if encoded else '(date, ticker, price)'}")
+
+        table, indexes, toast, total = db.execute(text(
+            "SELECT table_bytes, index_bytes, toast_bytes, total_bytes FROM hypertable_detailed_size('security_prices')"
+        )).one()
+        print(f"rows: {db.execute(text('SELECT count(*) FROM security_prices')).scalar()}")
+        print(f"table: {mb(table)}  indexes: {mb(indexes)}  toast: {mb(toast)}  total: {mb(total)}")
+        for (name,) in db.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'security_prices'")):
+            size = db.execute(text("SELECT hypertable_index_size(:name)"), {"name": name}).scalar()
+            print(f"  {name}: {mb(size)}")
+
+        if encoded:
+            keys = [row[0] for row in db.execute(text("SELECT id FROM securities"))]
+            history = text("SELECT date, security_id, price FROM security_prices WHERE security_id = ANY(:keys)")
+        else:
+            keys = [row[0] for row in db.execute(text("SELECT DISTINCT ticker FROM security_prices"))]
+            history = text("SELECT date, ticker, price FROM security_prices WHERE ticker = ANY(:keys)")
+
+        rng = random.Random(0)
+        timings = []
+        for _ in range(args.repeat):
+            sample = rng.sample(keys, min(args.tickers, len(keys)))
+            start = time.perf_counter()
+            rows = db.execute(history, {"keys": sample}).fetchall()
+            timings.append(time.perf_counter() - start)
+        print(
+            f"history of {min(args.tickers, len(keys))} tickers ({len(rows)} rows): "
+            f"median {statistics.median(timings) * 1000:.1f} ms, min {min(timings) * 1000:.1f} ms"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,21 @@ class InvalidCsvFormatException(HTTPException):
     def __init__(self, detail: str = "Invalid CSV format"):
         super().__init__(status_code=400, detail=detail)
         self.error_code = "INVALID_FILE"
+
+class NotModifiedException(HTTPException):
+    """Raised when the client's cached representation (If-None-Match) is still current"""
+    def __init__(self, etag: str, cache_control: str):
+        super().__init__(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+        self.error_code = "NOT_MODIFIED"
+
+class CostLimitExceededException(HTTPException):
+    """Raised when a client has used up its work budget for the current window"""
+    def __init__(self, retry_after: int, detail: str = "Analysis work budget exceeded, try again later"):
+        super().__init__(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.error_code = "COST_LIMIT_EXCEEDED"
+
+class ServiceOverloadedException(HTTPException):
+    """Raised when the service is saturated and sheds load"""
+    def __init__(self, retry_after: int, detail: str = "Service is busy, try again later"):
+        super().__init__(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.error_code = "SERVICE_OVERLOADED"
@@ -1,16 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from src.modules.etf.router import router as etf_router
+from src.modules.health.router import router as health_router
+from src.modules.market_data.router import router as market_data_router
+from src.modules.health.service import HealthService
+from src.modules.health.config import WARMUP_ENABLED
+from src.modules.etf.scheduler import scheduler
+from src.modules.etf.config import ENABLE_PRECOMPUTE_SCHEDULER
+from src.modules.etf.archive import archive_bundler
 from configs.limiter import limiter
+from configs.compression import CompressionMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = None
+    if WARMUP_ENABLED:
+        # Runs in the background so /livez answers while /readyz is held until warmup completes.
+        warmup_task = asyncio.create_task(HealthService().warmup())
+    else:
+        HealthService().state.reset([])
+    precompute_task = asyncio.create_task(scheduler.run_forever()) if ENABLE_PRECOMPUTE_SCHEDULER else None
+    bundle_task = asyncio.create_task(archive_bundler.run_forever()) if archive_bundler.enabled else None
+    yield
+    for task in (warmup_task, precompute_task, bundle_task):
+        if task and not task.done():
+            task.cancel()
+    if archive_bundler.enabled:
+        # Buffered files would otherwise be lost on shutdown.
+        try:
+            await archive_bundler.flush()
+        except Exception as e:
+            print(f"Archive bundle flush failed: {e}")
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 
 app.add_middleware(
@@ -23,11 +57,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
 )
 
 
 
 app.include_router(etf_router)
+app.include_router(health_router)
+app.include_router(market_data_router)
 
 @app.get("/health")
 @limiter.limit("5/minute")
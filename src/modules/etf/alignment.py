@@ -0,0 +1,74 @@
+import pandas as pd
+from typing import List, Sequence
+
+from src.modules.etf import schemas
+
+
+def records_frame(price_records) -> pd.DataFrame:
+    try:
+        data = [{'date': r.date, 'ticker': r.ticker, 'price': r.price} for r in price_records]
+    except AttributeError:
+        data = price_records
+    return pd.DataFrame(data, columns=['date', 'ticker', 'price'])
+
+
+class AlignedPanel:
+    """
+    A (dates x tickers) price panel on one calendar, forward-filled per ticker.
+    `coverage` holds, per ticker, its first and last quote and how many calendar days
+    were quoted, forward-filled, or are still missing after its first quote.
+    """
+    def __init__(self, prices: pd.DataFrame, coverage: pd.DataFrame, quotes: int, ffill_limit: int):
+        self.prices = prices
+        self.coverage = coverage
+        self.quotes = quotes
+        self.ffill_limit = ffill_limit
+
+    @property
+    def empty(self) -> bool:
+        return self.prices.empty
+
+    def adjusted(self, factors) -> "AlignedPanel":
+        """The same panel with prices multiplied element-wise by a (dates x tickers) factor matrix."""
+        return AlignedPanel(self.prices * factors, self.coverage, self.quotes, self.ffill_limit)
+
+    def coverage_for(self, tickers: Sequence[str]) -> List[schemas.TickerCoverage]:
+        rows = self.coverage.reindex(list(tickers))
+        return [
+            schemas.TickerCoverage(
+                ticker=ticker,
+                first_date=str(row.first_date) if pd.notna(row.first_date) else None,
+                last_date=str(row.last_date) if pd.notna(row.last_date) else None,
+                quoted_days=int(row.quoted_days) if pd.notna(row.quoted_days) else 0,
+                filled_days=int(row.filled_days) if pd.notna(row.filled_days) else 0,
+                missing_days=int(row.missing_days) if pd.notna(row.missing_days) else 0,
+                coverage=round(float(row.coverage), 6) if pd.notna(row.coverage) else 0.0
+            )
+            for ticker, row in zip(rows.index, rows.itertuples())
+        ]
+
+
+def align_prices(price_records, ffill_limit: int) -> AlignedPanel:
+    """
+    Builds the unified calendar (every date any ticker traded) once and forward-fills each
+    ticker across at most `ffill_limit` consecutive missing days. Longer gaps, and the days
+    before a ticker's first quote, stay missing.
+    """
+    frame = records_frame(price_records)
+    raw = frame.pivot(index='date', columns='ticker', values='price').sort_index()
+    quoted = raw.notna()
+
+    prices = raw.ffill(limit=ffill_limit) if ffill_limit else raw
+
+    present = prices.notna()
+    quoted_days = quoted.sum()
+    listed = quoted.cummax()
+    coverage = pd.DataFrame({
+        'first_date': quoted.idxmax().where(quoted_days > 0),
+        'last_date': quoted.iloc[::-1].idxmax().where(quoted_days > 0),
+        'quoted_days': quoted_days,
+        'filled_days': present.sum() - quoted_days,
+        'missing_days': (listed & ~present).sum(),
+        'coverage': quoted_days / max(len(raw), 1),
+    })
+    return AlignedPanel(prices, coverage, int(quoted_days.sum()), ffill_limit)
@@ -0,0 +1,122 @@
+import numpy as np
+from typing import List, Optional, Sequence
+
+from src.modules.etf import schemas
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sample standard deviation over a trailing window in O(n) using cumulative sums.
+    Positions without a full window are NaN.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return out
+
+    # Centering first keeps the sum-of-squares difference numerically stable.
+    centered = values - values.mean()
+    s1 = np.concatenate(([0.0], np.cumsum(centered)))
+    s2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    window_sum = s1[window:] - s1[:-window]
+    window_sq = s2[window:] - s2[:-window]
+    variance = (window_sq - window_sum * window_sum / window) / (window - 1)
+    out[window - 1:] = np.sqrt(np.clip(variance, 0.0, None))
+    return out
+
+
+def drawdown(nav: np.ndarray) -> np.ndarray:
+    peaks = np.maximum.accumulate(nav)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peaks > 0, nav / peaks - 1.0, 0.0)
+
+
+def finite_or_none(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), 6)
+
+
+def compute_analytics(
+    dates: Sequence,
+    nav: np.ndarray,
+    pnl: np.ndarray,
+    latest_values: np.ndarray,
+    tickers: Sequence[str],
+    windows: List[int],
+    include_series: bool = True,
+    positions: Optional[np.ndarray] = None
+) -> schemas.PortfolioAnalytics:
+    """
+    Risk/return analytics of a NAV series.
+    `pnl` is each ticker's share of the NAV change over the series and `latest_values`
+    each ticker's value on the last date; both come from the NAV methodology used.
+    `positions` limits the returned series to those dates (a downsampled NAV series); the
+    statistics always cover every date.
+    """
+    n = len(nav)
+    returns = np.full(n, np.nan)
+    if n > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[1:] = nav[1:] / nav[:-1] - 1.0
+    valid_returns = returns[1:][np.isfinite(returns[1:])]
+
+    total_return = nav[-1] / nav[0] - 1.0 if n and nav[0] else np.nan
+    annualized_return = (
+        (nav[-1] / nav[0]) ** (TRADING_DAYS_PER_YEAR / (n - 1)) - 1.0
+        if n > 1 and nav[0] > 0 and nav[-1] > 0 else np.nan
+    )
+    if len(valid_returns) > 1:
+        daily_std = valid_returns.std(ddof=1)
+        volatility = daily_std * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sharpe = valid_returns.mean() / daily_std * np.sqrt(TRADING_DAYS_PER_YEAR) if daily_std > 0 else np.nan
+    else:
+        volatility = sharpe = np.nan
+
+    drawdowns = drawdown(nav)
+    trough = int(np.argmin(drawdowns)) if n else 0
+    peak = int(np.argmax(nav[:trough + 1])) if n else 0
+
+    rolling = {}
+    if n > 1:
+        filled = np.where(np.isfinite(returns), returns, 0.0)
+        for window in windows:
+            vol = np.full(n, np.nan)
+            vol[1:] = rolling_std(filled[1:], window) * np.sqrt(TRADING_DAYS_PER_YEAR)
+            rolling[str(window)] = vol
+    else:
+        rolling = {str(window): np.full(n, np.nan) for window in windows}
+
+    contributions = [
+        schemas.TickerContribution(
+            ticker=ticker,
+            contribution=finite_or_none(change / nav[0]) if nav[0] else None,
+            weight_share=finite_or_none(value / nav[-1]) if nav[-1] else None
+        )
+        for ticker, change, value in zip(tickers, pnl, latest_values)
+    ]
+
+    series = None
+    if include_series:
+        series = [
+            schemas.AnalyticsSeriesPoint(
+                date=str(d),
+                daily_return=finite_or_none(returns[i]),
+                drawdown=finite_or_none(drawdowns[i]),
+                rolling_volatility={w: finite_or_none(v[i]) for w, v in rolling.items()}
+            )
+            for i, d in (enumerate(dates) if positions is None else ((i, dates[i]) for i in positions))
+        ]
+
+    return schemas.PortfolioAnalytics(
+        total_return=finite_or_none(total_return),
+        annualized_return=finite_or_none(annualized_return),
+        annualized_volatility=finite_or_none(volatility),
+        sharpe_ratio=finite_or_none(sharpe),
+        max_drawdown=finite_or_none(drawdowns[trough]) if n else None,
+        max_drawdown_peak_date=str(dates[peak]) if n else None,
+        max_drawdown_trough_date=str(dates[trough]) if n else None,
+        rolling_volatility_latest={w: finite_or_none(v[-1]) if n else None for w, v in rolling.items()},
+        contributions=contributions,
+        series=series
+    )
@@ -0,0 +1,28 @@
+from typing import List
+
+from configs.db.postgresql import SessionLocal
+from src.modules.etf.repository import EtfRepository
+from src.modules.storage.bundler import ArchiveBundler
+from src.modules.storage.service import ArchivedFile
+
+
+def log_archived(files: List[ArchivedFile]):
+    """Records every file of a written bundle with its byte range, in one transaction."""
+    db = SessionLocal()
+    try:
+        EtfRepository(db).log_requests([
+            {
+                "file_name": f.file_name,
+                "url": f.url,
+                "bundle_key": f.key,
+                "bundle_offset": f.offset,
+                "bundle_length": f.length,
+                "content_encoding": f.content_encoding,
+            }
+            for f in files
+        ])
+    finally:
+        db.close()
+
+
+archive_bundler = ArchiveBundler(on_flush=log_archived)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.modules.etf import schemas
+from src.modules.etf.config import (
+    PRECOMPUTE_CACHE_SIZE,
+    POPULARITY_TRACK_MAX,
+    PANEL_CACHE_SIZE,
+    PANEL_CACHE_MAX_BYTES,
+    ETAG_VERSION
+)
+
+
+def weights_fingerprint(weights: Dict[str, float]) -> str:
+    """Stable identity of a weight set, independent of row order and number formatting."""
+    normalized = sorted((str(ticker), round(float(weight), 10)) for ticker, weight in weights.items())
+    return hashlib.sha1(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+def analysis_key(fingerprint: str, options: schemas.AnalysisOptions) -> str:
+    """Cache key of one weight set analyzed with one set of computation options."""
+    return f"{fingerprint}:{options.compute_key()}"
+
+
+def panel_key(tickers: Sequence[str], ffill_limit: int, nav_basis: str = "raw", base_currency: Optional[str] = None) -> str:
+    """Cache key of the aligned (and possibly adjusted or converted) price panel of one ticker set."""
+    digest = hashlib.sha1("\n".join(sorted(tickers)).encode("utf-8")).hexdigest()
+    key = f"{digest}:{ffill_limit}"
+    if nav_basis != "raw":
+        key += f":{nav_basis}"
+    if base_currency is not None:
+        key += f":{base_currency}"
+    return key
+
+
+def market_stamp(snapshot) -> Optional[str]:
+    """
+    Market-data version usable across workers: the latest ingested date and newest price
+    write (so backfills and same-date corrections count), plus the latest corporate action
+    write and FX date once there are any.
+    (The snapshot generation is a per-process counter, so it cannot go into an ETag.)
+    """
+    if not snapshot.loaded or snapshot.latest_date is None:
+        return None
+    stamp = snapshot.latest_date.isoformat()
+    if snapshot.ingest_version is not None:
+        stamp += f"/ingest:{snapshot.ingest_version}"
+    if snapshot.adjustments_version is not None:
+        stamp += f"/adjustments:{snapshot.adjustments_version.isoformat()}"
+    if snapshot.fx_date is not None:
+        stamp += f"/fx:{snapshot.fx_date.isoformat()}"
+    return stamp
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps([ETAG_VERSION, *parts], default=str).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+class PopularityTracker:
+    """Counts how often each weight set is analyzed, keeping at most `max_tracked` of them."""
+    def __init__(self, max_tracked: int = POPULARITY_TRACK_MAX):
+        self.max_tracked = max_tracked
+        self.counts: Counter = Counter()
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, fingerprint: str, weights: Dict[str, float]):
+        with self._lock:
+            self.counts[fingerprint] += 1
+            self.weights.setdefault(fingerprint, {t: float(w) for t, w in weights.items()})
+            if len(self.counts) > self.max_tracked:
+                # Drop the least popular half so one-off uploads do not crowd out regulars.
+                for stale, _ in self.counts.most_common()[self.max_tracked // 2:]:
+                    del self.counts[stale]
+                    del self.weights[stale]
+
+    def top(self, k: int) -> List[Tuple[str, Dict[str, float]]]:
+        with self._lock:
+            return [(fp, self.weights[fp]) for fp, _ in self.counts.most_common(k)]
+
+
+class GenerationCache:
+    """
+    LRU cache of values valid for one market-data generation.
+    Bounded by entry count and, when `sizeof` is given, by the total size of the values.
+    """
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self.entries.get(fingerprint)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry[1]
+
+    def contains(self, fingerprint: str, generation: int) -> bool:
+        with self._lock:
+            entry = self.entries.get(fingerprint)
+            return entry is not None and entry[0] == generation
+
+    def put(self, fingerprint: str, generation: int, result: Any):
+        size = self.sizeof(result) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self.entries.pop(fingerprint, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self.entries[fingerprint] = (generation, result, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= evicted[2]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class AnalysisResultCache(GenerationCache):
+    """LRU cache of full analysis results, valid for one market-data generation."""
+    def __init__(self, max_entries: int = PRECOMPUTE_CACHE_SIZE):
+        super().__init__(max_entries)
+
+    def get(self, fingerprint: str, generation: int) -> Optional[schemas.EtfAnalysisResponse]:
+        return super().get(fingerprint, generation)
+
+
+popularity = PopularityTracker()
+analysis_cache = AnalysisResultCache()
+# Aligned price panels, shared read-only between requests for the same ticker set.
+panel_cache = GenerationCache(
+    PANEL_CACHE_SIZE,
+    max_bytes=PANEL_CACHE_MAX_BYTES,
+    sizeof=lambda panel: int(panel.prices.memory_usage(index=True).sum())
+)
@@ -0,0 +1,70 @@
+import numpy as np
+from typing import List, Tuple
+
+
+def nav_matrix(prices: np.ndarray, holdings: np.ndarray) -> np.ndarray:
+    """
+    NAV of every portfolio (row of `holdings`) on every date of a (dates x tickers) panel,
+    as one matrix product. A ticker without a price contributes nothing, as in the single-portfolio NAV.
+    """
+    return np.where(np.isfinite(prices), prices, 0.0) @ holdings.T
+
+
+def return_correlation(nav: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Pairwise correlation of daily NAV returns over the dates where every portfolio has a return.
+    Returns the (portfolios x portfolios) matrix and the number of observations used.
+    """
+    n = nav.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = nav[1:] / nav[:-1] - 1.0
+    returns = returns[np.isfinite(returns).all(axis=1)]
+    if len(returns) < 2:
+        return np.full((n, n), np.nan), len(returns)
+
+    centered = returns - returns.mean(axis=0)
+    norms = np.sqrt((centered * centered).sum(axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (centered.T @ centered) / np.outer(norms, norms)
+    corr = np.clip(corr, -1.0, 1.0)
+    constant = norms == 0
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+    return corr, len(returns)
+
+
+def value_weights(holdings: np.ndarray, latest_prices: np.ndarray) -> np.ndarray:
+    """Share of each portfolio's latest value held in each ticker; unpriced tickers weigh nothing."""
+    values = holdings * np.where(np.isfinite(latest_prices), latest_prices, 0.0)
+    totals = values.sum(axis=1, keepdims=True)
+    return np.divide(values, totals, out=np.zeros_like(values), where=totals != 0)
+
+
+def weight_overlap(weights: np.ndarray) -> np.ndarray:
+    """
+    Overlap of every pair of weight vectors: the sum over tickers of the smaller weight.
+    One vectorized row per portfolio keeps memory at portfolios x tickers.
+    """
+    overlap = np.empty((len(weights), len(weights)))
+    for i, row in enumerate(weights):
+        overlap[i] = np.minimum(row, weights).sum(axis=1)
+    return overlap
+
+
+def common_holdings(held: np.ndarray, tickers: List[str]) -> Tuple[np.ndarray, List[Tuple[int, int, List[str]]]]:
+    """
+    Common-holding counts for every pair (one matrix product) and, for each pair i < j,
+    the tickers both portfolios hold.
+    """
+    as_float = held.astype(float)
+    counts = (as_float @ as_float.T).astype(int)
+    names = np.asarray(tickers, dtype=object)
+
+    pairs = []
+    for i in range(len(held) - 1):
+        shared = held[i] & held[i + 1:]
+        rows, cols = np.nonzero(shared)
+        splits = np.searchsorted(rows, np.arange(1, len(shared)))
+        for offset, columns in enumerate(np.split(cols, splits)):
+            pairs.append((i, i + 1 + offset, names[columns].tolist()))
+    return counts, pairs
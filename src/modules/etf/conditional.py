@@ -0,0 +1,54 @@
+import asyncio
+from typing import Optional
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from src.modules.etf import schemas
+from src.modules.etf.cache import weights_fingerprint, market_stamp, make_etag, etag_matches
+from src.modules.etf.config import ANALYZE_CACHE_CONTROL, PORTFOLIO_CACHE_CONTROL
+from src.modules.etf.exceptions import PortfolioNotFoundException
+from src.modules.etf.repository import EtfRepository
+from src.modules.etf.service import EtfService
+from src.modules.market_data.cache import market_snapshot
+from src.modules.market_data.repository import MarketDataRepository
+from src.exceptions import NotModifiedException
+
+
+async def current_market_stamp(db: Session) -> Optional[str]:
+    """market_stamp of a snapshot re-checked within SNAPSHOT_MAX_AGE_SECONDS, so no ETag outlives an ingest."""
+    await asyncio.to_thread(market_snapshot.refresh_if_stale, MarketDataRepository(db))
+    return market_stamp(market_snapshot)
+
+
+async def analysis_etag(db: Session, file: UploadFile, options: schemas.AnalysisOptions, if_none_match: Optional[str] = None) -> Optional[str]:
+    """
+    ETag of the analysis an upload would produce: normalized weights, name and options plus
+    the market-data version. Raises NotModifiedException when `if_none_match` matches, before
+    any price fetch or math. None while the market-data version is unknown.
+    """
+    stamp = await current_market_stamp(db)
+    if stamp is None:
+        return None
+
+    await file.seek(0)
+    weights = EtfService._parse_weights(await file.read())
+    etf_name = file.filename.rsplit('.', 1)[0] if file.filename else "ETF"
+    etag = make_etag(weights_fingerprint(weights), etf_name, options.model_dump(), stamp)
+    if etag_matches(if_none_match, etag):
+        raise NotModifiedException(etag, ANALYZE_CACHE_CONTROL)
+    return etag
+
+
+async def portfolio_etag(db: Session, portfolio_id: int, if_none_match: Optional[str] = None) -> Optional[str]:
+    """Same as analysis_etag for a saved portfolio; costs one primary-key read."""
+    stamp = await current_market_stamp(db)
+    if stamp is None:
+        return None
+
+    portfolio = await asyncio.to_thread(EtfRepository(db).get_portfolio, portfolio_id)
+    if portfolio is None:
+        raise PortfolioNotFoundException()
+    etag = make_etag("portfolio", portfolio.id, portfolio.name, weights_fingerprint(portfolio.weights), stamp)
+    if etag_matches(if_none_match, etag):
+        raise NotModifiedException(etag, PORTFOLIO_CACHE_CONTROL)
+    return etag
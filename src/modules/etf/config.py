@@ -1,4 +1,54 @@
 """
 ETF service configuration settings
 """
+import os
+
 ENABLE_BACKGROUND_STORING_TASK = True
+
+# Precomputation of popular portfolios
+ENABLE_PRECOMPUTE_SCHEDULER = True
+PRECOMPUTE_INTERVAL_SECONDS = 60
+PRECOMPUTE_TOP_K = 10
+PRECOMPUTE_CACHE_SIZE = 32
+POPULARITY_TRACK_MAX = 1000
+
+# Live NAV feed for saved portfolios
+STREAM_POLL_SECONDS = 5
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_QUEUE_SIZE = 100
+
+# Scenario engine
+SCENARIO_MAX_COUNT = 100000
+SCENARIO_MAX_TOP_K = 100
+SCENARIO_BLOCK_BYTES = 64 * 1024 * 1024
+
+# HTTP caching. Bump ETAG_VERSION whenever a change alters computed results.
+ETAG_VERSION = "1"
+ANALYZE_CACHE_CONTROL = "private, no-cache"
+PORTFOLIO_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+# Calendar alignment of price panels
+ALIGN_FFILL_LIMIT = 5 # trading days a missing price is carried forward
+MAX_FFILL_LIMIT = 63
+PANEL_CACHE_SIZE = 32
+PANEL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Downsampling of the returned NAV series (max_points)
+DOWNSAMPLE_MIN_POINTS = 3
+DOWNSAMPLE_PRESELECT_RATIO = 4 # min/max candidates are kept from this many buckets per output point
+
+# Multi-portfolio comparison
+COMPARE_MAX_PORTFOLIOS = 64
+
+# Analysis history
+ANALYSES_PAGE_SIZE = 50
+ANALYSES_MAX_PAGE_SIZE = 500
+
+# Portfolio math backend: "pandas", "numpy", "polars" (needs the polars package) or "auto",
+# which picks per input size (price quotes) from "lower:backend" bands. Re-derive the bands
+# with scripts/bench_compute_backends.py.
+COMPUTE_BACKEND = os.getenv("COMPUTE_BACKEND", "auto")
+COMPUTE_BACKEND_BANDS = [
+    (int(lower), name.strip())
+    for lower, name in (band.split(":") for band in os.getenv("COMPUTE_BACKEND_BANDS", "0:numpy").split(",") if band.strip())
+]
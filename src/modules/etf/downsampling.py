@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence
+
+from src.modules.etf import schemas
+from src.modules.etf.config import DOWNSAMPLE_PRESELECT_RATIO
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Positions of the minimum and maximum of each of `buckets` equal-count buckets, in order."""
+    n = len(y)
+    width = -(-n // buckets)
+    padded = np.full(buckets * width, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, width)
+    valid = ~np.isnan(rows).all(axis=1)
+    offsets = np.arange(buckets)[valid] * width
+    rows = rows[valid]
+    picks = np.concatenate((offsets + np.nanargmin(rows, axis=1), offsets + np.nanargmax(rows, axis=1)))
+    return np.unique(picks)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Positions of at most `max_points` points chosen by Largest-Triangle-Three-Buckets: the
+    first and last point, plus per bucket the point spanning the largest triangle with the
+    previous bucket's pick and the next bucket's mean, so peaks and troughs survive.
+
+    Every bucket is scored at once against the previous round's picks until the picks stop
+    changing. The first bucket's anchor is fixed, so each round settles at least one more
+    bucket and the result is exactly the sequential algorithm's, usually after a few rounds.
+    Long series are first cut to the min and max of DOWNSAMPLE_PRESELECT_RATIO x `max_points`
+    buckets (MinMaxLTTB).
+    """
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    candidates = None
+    if n > 2 * DOWNSAMPLE_PRESELECT_RATIO * max_points:
+        inner = minmax_indices(y[1:-1], DOWNSAMPLE_PRESELECT_RATIO * max_points) + 1
+        candidates = np.concatenate(([0], inner, [n - 1]))
+        x, y, n = x[candidates], y[candidates], len(candidates)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    starts, counts = edges[:-1], np.diff(edges)
+    # Each bucket's third vertex: the mean of the next bucket, and the last point for the last bucket
+    mean_x = np.append(np.add.reduceat(x[:-1], starts)[1:] / counts[1:], x[-1])[:, None]
+    mean_y = np.append(np.add.reduceat(y[:-1], starts)[1:] / counts[1:], y[-1])[:, None]
+
+    members = starts[:, None] + np.arange(counts.max())
+    padding = members >= edges[1:, None]
+    members[padding] = 0
+    bx, by = x[members], y[members]
+
+    picks = starts.copy()
+    while True:
+        anchors = np.concatenate(([0], picks[:-1]))
+        ax, ay = x[anchors][:, None], y[anchors][:, None]
+        areas = np.abs((ax - mean_x) * (by - ay) - (ax - bx) * (mean_y - ay))
+        areas[padding] = -1.0
+        settled = starts + np.argmax(areas, axis=1)
+        if np.array_equal(settled, picks):
+            break
+        picks = settled
+
+    picks = np.concatenate(([0], picks, [n - 1]))
+    return picks if candidates is None else candidates[picks]
+
+
+def downsample_index(index: Sequence, values: np.ndarray, max_points: int) -> np.ndarray:
+    """LTTB positions of a NAV series, with the time since its first date as the x axis."""
+    dates = pd.DatetimeIndex(index).to_numpy()
+    x = (dates - dates[0]).astype("timedelta64[s]").astype(np.float64) if len(dates) else np.empty(0)
+    return lttb_indices(x, np.asarray(values, dtype=np.float64), max_points)
+
+
+def downsample_positions(points: Sequence[schemas.TimeSeriesPoint], max_points: int) -> np.ndarray:
+    """downsample_index of already built response points (a cached analysis)."""
+    dates = pd.to_datetime([p.date for p in points], format="ISO8601")
+    y = np.fromiter((p.nav for p in points), dtype=np.float64, count=len(points))
+    return downsample_index(dates, y, max_points)
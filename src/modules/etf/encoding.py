@@ -0,0 +1,57 @@
+import base64
+import numpy as np
+import pandas as pd
+from typing import List, Sequence, Tuple
+
+from src.modules.etf import schemas
+
+SERIES_ENCODINGS = ("json", "float32", "delta")
+# The JSON series carries NAVs rounded to cents, so delta encoding at this scale is lossless.
+DELTA_SCALE = 100
+
+
+def rle_calendar(dates: pd.DatetimeIndex) -> List[List[int]]:
+    """Day steps between consecutive dates as [step, repeat] runs, e.g. a trading week is [[1, 4], [3, 1]]."""
+    if len(dates) < 2:
+        return []
+    steps = np.diff(dates.normalize().to_numpy().astype("datetime64[D]").astype(np.int64))
+    boundaries = np.flatnonzero(np.concatenate(([True], steps[1:] != steps[:-1], [True])))
+    return [[int(steps[start]), int(end - start)] for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+
+def expand_calendar(start: str, calendar: Sequence[Sequence[int]]) -> pd.DatetimeIndex:
+    steps = np.repeat([step for step, _ in calendar], [repeat for _, repeat in calendar]).astype(np.int64)
+    offsets = np.concatenate(([0], np.cumsum(steps)))
+    return pd.Timestamp(start) + pd.to_timedelta(offsets, unit="D")
+
+
+def encode_series(points: Sequence[schemas.TimeSeriesPoint], encoding: str) -> schemas.CompactSeries:
+    dates = pd.DatetimeIndex(pd.to_datetime([p.date for p in points], format="ISO8601"))
+    navs = np.fromiter((p.nav for p in points), dtype=np.float64, count=len(points))
+    start = points[0].date if points else ""
+
+    if encoding == "float32":
+        values = base64.b64encode(navs.astype("<f4").tobytes()).decode("ascii")
+        return schemas.CompactSeries(start=start, calendar=rle_calendar(dates), encoding=encoding, values=values)
+
+    fixed = np.rint(navs * DELTA_SCALE).astype(np.int64)
+    deltas = np.diff(fixed, prepend=0)
+    return schemas.CompactSeries(
+        start=start,
+        calendar=rle_calendar(dates),
+        encoding=encoding,
+        scale=DELTA_SCALE,
+        values=deltas.tolist()
+    )
+
+
+def decode_series(compact: schemas.CompactSeries) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """Reference decoder (what a client does): dates and NAV values."""
+    if not compact.start:
+        return pd.DatetimeIndex([]), np.empty(0)
+    dates = expand_calendar(compact.start, compact.calendar)
+    if compact.encoding == "float32":
+        values = np.frombuffer(base64.b64decode(compact.values), dtype="<f4").astype(np.float64)
+    else:
+        values = np.cumsum(np.asarray(compact.values, dtype=np.int64)) / compact.scale
+    return dates, values
@@ -17,3 +17,33 @@ class NoMatchingTickerDataException(HTTPException):
     def __init__(self, detail: str = "No matching price data for the provided tickers"):
         super().__init__(status_code=404, detail=detail)
         self.error_code = "NO_MATCHING_DATA"
+
+class PortfolioNotFoundException(HTTPException):
+    """Raised when a saved portfolio does not exist"""
+    def __init__(self, detail: str = "Portfolio not found"):
+        super().__init__(status_code=404, detail=detail)
+        self.error_code = "PORTFOLIO_NOT_FOUND"
+
+class InvalidAnalysisOptionsException(HTTPException):
+    """Raised when the analysis options cannot be applied to the portfolio"""
+    def __init__(self, detail: str = "Invalid analysis options"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_OPTIONS"
+
+class InvalidComparisonRequestException(HTTPException):
+    """Raised when a comparison request cannot be evaluated"""
+    def __init__(self, detail: str = "Invalid comparison request"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_COMPARISON"
+
+class InvalidScenarioRequestException(HTTPException):
+    """Raised when a scenario request cannot be evaluated"""
+    def __init__(self, detail: str = "Invalid scenario request"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_SCENARIO"
+
+class InvalidCursorException(HTTPException):
+    """Raised when a pagination cursor cannot be decoded"""
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_CURSOR"
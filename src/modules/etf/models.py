@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, JSON, ForeignKey, Index, func
 from configs.db.postgresql import Base
 
 class AnalysisLog(Base):
@@ -7,4 +7,37 @@ class AnalysisLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     file_name = Column(String)
     storage_url = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # Set when the file was archived inside a bundle object: its byte range within that object.
+    bundle_key = Column(String, nullable=True)
+    bundle_offset = Column(BigInteger, nullable=True)
+    bundle_length = Column(BigInteger, nullable=True)
+    content_encoding = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Keyset pagination of the history walks this index in either direction.
+        Index("ix_etf_analysis_files_created_at_id", "created_at", "id"),
+        # Lets prefix filters (file_name LIKE 'abc%') use a range scan under any collation.
+        Index("ix_etf_analysis_files_file_name_pattern", "file_name", postgresql_ops={"file_name": "varchar_pattern_ops"}),
+    )
+
+
+class Portfolio(Base):
+    __tablename__ = "etf_portfolios"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    weights = Column(JSON, nullable=False)
+    latest_prices = Column(JSON, nullable=True)
+    nav_computed_through = Column(DateTime, nullable=True)
+    # Newest price write (price_ingests.id) the stored NAV reflects
+    nav_ingest_version = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PortfolioNav(Base):
+    __tablename__ = "etf_portfolio_nav"
+
+    portfolio_id = Column(Integer, ForeignKey("etf_portfolios.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(DateTime, primary_key=True)
+    nav = Column(Float, nullable=False)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence, Tuple
+
+REBALANCE_FREQUENCIES = ("monthly", "quarterly", "annual")
+
+
+def rebalance_starts(dates: Sequence, frequency: str) -> np.ndarray:
+    """Row positions of the first trading day of each rebalancing period."""
+    index = pd.DatetimeIndex(dates)
+    if frequency == "monthly":
+        period = index.year.to_numpy() * 12 + index.month.to_numpy()
+    elif frequency == "quarterly":
+        period = index.year.to_numpy() * 4 + (index.month.to_numpy() - 1) // 3
+    elif frequency == "annual":
+        period = index.year.to_numpy()
+    else:
+        raise ValueError(f"Rebalance frequency must be one of: {', '.join(REBALANCE_FREQUENCIES)}")
+    return np.flatnonzero(np.concatenate(([True], period[1:] != period[:-1])))
+
+
+def rebalanced_nav(
+    dates: Sequence,
+    prices: np.ndarray,
+    targets: np.ndarray,
+    frequency: str,
+    initial_nav: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    NAV of a portfolio reset to its target allocations at the close of the first
+    trading day of every period, without looping over dates.
+
+    Within a segment the NAV is the segment's starting NAV times the value of the units
+    bought per unit of NAV at the anchor (one matrix-vector product per segment); segment
+    starting NAVs chain as a cumulative product of each segment's end-to-start growth.
+    A missing price is treated as an unchanged holding.
+
+    Returns (nav per date, per-ticker P&L over the whole series, per-ticker latest value).
+    """
+    total = targets.sum()
+    if total == 0:
+        raise ValueError("Target allocations must not sum to zero")
+    targets = targets / total
+    n = len(prices)
+
+    starts = rebalance_starts(dates, frequency)
+    ends = np.concatenate((starts[1:], [n - 1]))
+    segment = np.cumsum(np.isin(np.arange(n), starts)) - 1
+
+    # Units held per unit of NAV in each segment; allocations without an anchor price keep their value.
+    anchors = prices[starts]
+    anchor_ok = np.isfinite(anchors) & (anchors != 0)
+    units = targets / np.where(anchor_ok, anchors, np.inf)
+    fixed = targets * ~anchor_ok
+    fixed_total = fixed.sum(axis=1)
+
+    def value_of(block: np.ndarray, s) -> np.ndarray:
+        # Allocation whose price is missing on a given date is carried at its anchor value.
+        finite = np.isfinite(block)
+        return np.where(finite, block * units[s], targets * anchor_ok[s]) + fixed[s]
+
+    # One BLAS product per segment reads the panel once; a single product over all segments
+    # needs a dates x tickers temporary (units per row, or prices over their anchors) instead.
+    growth = np.empty(n)
+    for s, (a, b) in enumerate(zip(starts, np.append(starts[1:], n))):
+        g = prices[a:b] @ units[s] + fixed_total[s]
+        if not np.isfinite(g).all():
+            # Gaps are rare, so the masked product only runs on segments that have them.
+            g = value_of(prices[a:b], s).sum(axis=1)
+        growth[a:b] = g
+
+    # Per-ticker value of each segment's holdings at the segment end, per unit of starting NAV.
+    end_prices = prices[ends]
+    end_values = end_prices * units + fixed
+    if not np.isfinite(end_values).all():
+        end_values = value_of(end_prices, slice(None))
+    start_navs = initial_nav * np.concatenate(([1.0], np.cumprod(end_values.sum(axis=1)[:-1])))
+    nav = start_navs[segment] * growth
+
+    # NAV change of each segment splits exactly into per-ticker moves of that segment's holdings.
+    pnl = (start_navs[:, None] * (end_values - targets)).sum(axis=0)
+    latest_values = start_navs[-1] * end_values[-1]
+    return nav, pnl, latest_values
@@ -1,13 +1,137 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from src.modules.etf.models import AnalysisLog
+from src.modules.etf.models import AnalysisLog, Portfolio, PortfolioNav
 
 class EtfRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def log_request(self, file_name: str, url: str) -> AnalysisLog:
-        log = AnalysisLog(file_name=file_name, storage_url=url)
+    def log_request(
+        self,
+        file_name: str,
+        url: str,
+        bundle_key: Optional[str] = None,
+        bundle_offset: Optional[int] = None,
+        bundle_length: Optional[int] = None,
+        content_encoding: Optional[str] = None
+    ) -> AnalysisLog:
+        log = AnalysisLog(
+            file_name=file_name,
+            storage_url=url,
+            bundle_key=bundle_key,
+            bundle_offset=bundle_offset,
+            bundle_length=bundle_length,
+            content_encoding=content_encoding
+        )
         self.db.add(log)
         self.db.commit()
         self.db.refresh(log)
-        return log
\ No newline at end of file
+        return log
+
+    def log_requests(self, entries: List[Dict]):
+        """Logs many archived files in one transaction; each entry holds log_request's arguments."""
+        try:
+            self.db.bulk_save_objects([
+                AnalysisLog(
+                    file_name=entry["file_name"],
+                    storage_url=entry["url"],
+                    bundle_key=entry.get("bundle_key"),
+                    bundle_offset=entry.get("bundle_offset"),
+                    bundle_length=entry.get("bundle_length"),
+                    content_encoding=entry.get("content_encoding")
+                )
+                for entry in entries
+            ])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def list_analyses(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+        file_name_prefix: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> List[AnalysisLog]:
+        """
+        Newest first. `before` is the (created_at, id) of the last row of the previous page;
+        seeking past it on the (created_at, id) index keeps every page equally cheap.
+        """
+        query = self.db.query(AnalysisLog)
+        if before is not None:
+            query = query.filter(tuple_(AnalysisLog.created_at, AnalysisLog.id) < tuple_(*before))
+        if file_name_prefix:
+            query = query.filter(AnalysisLog.file_name.startswith(file_name_prefix, autoescape=True))
+        if created_from is not None:
+            query = query.filter(AnalysisLog.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(AnalysisLog.created_at < created_to)
+        return query.order_by(AnalysisLog.created_at.desc(), AnalysisLog.id.desc()).limit(limit).all()
+
+    def create_portfolio(self, name: str, weights: Dict[str, float]) -> Portfolio:
+        portfolio = Portfolio(name=name, weights=weights)
+        self.db.add(portfolio)
+        self.db.commit()
+        self.db.refresh(portfolio)
+        return portfolio
+
+    def get_portfolio(self, portfolio_id: int, for_update: bool = False) -> Optional[Portfolio]:
+        query = self.db.query(Portfolio).filter(Portfolio.id == portfolio_id)
+        if for_update:
+            query = query.with_for_update().populate_existing()
+        return query.first()
+
+    def get_nav_series(self, portfolio_id: int, after: Optional[datetime] = None) -> List[PortfolioNav]:
+        query = self.db.query(PortfolioNav)\
+            .filter(PortfolioNav.portfolio_id == portfolio_id)
+        if after is not None:
+            query = query.filter(PortfolioNav.date > after)
+        return query.order_by(PortfolioNav.date).all()
+
+    def get_nav_date(self, portfolio_id: int, back: int, before: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Date of the stored NAV point `back` positions before the newest (before `before`, when
+        given); None when the series is shorter.
+        """
+        query = self.db.query(PortfolioNav.date)\
+            .filter(PortfolioNav.portfolio_id == portfolio_id)
+        if before is not None:
+            query = query.filter(PortfolioNav.date < before)
+        return query.order_by(PortfolioNav.date.desc())\
+            .offset(back)\
+            .limit(1)\
+            .scalar()
+
+    def append_nav_points(
+        self,
+        portfolio: Portfolio,
+        points: List[Tuple[datetime, float]],
+        latest_prices: Dict[str, float],
+        ingest_version: Optional[int] = None,
+        replace_from: Optional[datetime] = None
+    ):
+        """Stores the points, first dropping stored points from `replace_from` on (a recomputation)."""
+        try:
+            if replace_from is not None:
+                self.db.query(PortfolioNav)\
+                    .filter(PortfolioNav.portfolio_id == portfolio.id, PortfolioNav.date >= replace_from)\
+                    .delete(synchronize_session=False)
+            self.db.bulk_save_objects([
+                PortfolioNav(portfolio_id=portfolio.id, date=date, nav=nav)
+                for date, nav in points
+            ])
+            if points:
+                portfolio.nav_computed_through = max(date for date, _ in points)
+            portfolio.latest_prices = latest_prices
+            portfolio.nav_ingest_version = ingest_version
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def rollback(self):
+        self.db.rollback()
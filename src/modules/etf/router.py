@@ -1,19 +1,156 @@
-from fastapi import APIRouter, UploadFile, File, Depends, Request
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from configs.db.postgresql import get_db
-from configs.limiter import limiter
+from configs.limiter import limiter, get_real_user_ip, ANALYZE_RATE_LIMIT
 from src.modules.etf.service import EtfService
+from src.modules.etf.scheduler import scheduler
+from src.modules.etf.streaming import broadcaster, nav_events
+from src.modules.etf.conditional import analysis_etag, portfolio_etag
 from src.modules.etf import schemas
+from src.modules.etf.config import (
+    ALIGN_FFILL_LIMIT,
+    MAX_FFILL_LIMIT,
+    ANALYZE_CACHE_CONTROL,
+    PORTFOLIO_CACHE_CONTROL,
+    ANALYSES_PAGE_SIZE,
+    ANALYSES_MAX_PAGE_SIZE,
+    DOWNSAMPLE_MIN_POINTS
+)
 
 router = APIRouter(prefix="/etf", tags=["Analysis"])
 
 @router.post("/analyze", response_model=schemas.EtfAnalysisResponse)
-@limiter.limit("5/minute")
+@limiter.limit(ANALYZE_RATE_LIMIT)
 async def analyze(
     request: Request,
+    response: Response,
     file: UploadFile = File(...), 
+    include_analytics: bool = Query(False, description="Add returns, volatility, drawdown and per-ticker contribution"),
+    windows: List[int] = Query([21, 63], description="Rolling volatility windows in trading days"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' omits the per-date series"),
+    methodology: str = Query("shares", pattern="^(shares|rebalanced)$", description="'rebalanced' treats weights as target allocations"),
+    rebalance: str = Query("monthly", pattern="^(monthly|quarterly|annual)$", description="Rebalancing schedule for the 'rebalanced' methodology"),
+    ffill_limit: int = Query(ALIGN_FFILL_LIMIT, ge=0, le=MAX_FFILL_LIMIT, description="Trading days a missing price is carried forward"),
+    series_encoding: str = Query("json", pattern="^(json|float32|delta)$", description="'float32' / 'delta' return the NAV series in etf_time_series_compact"),
+    nav_basis: str = Query("raw", pattern="^(raw|price_return|total_return)$", description="Adjust prices for splits ('price_return') or splits and dividends ('total_return')"),
+    base_currency: Optional[str] = Query(None, pattern="^[A-Za-z]{3}$", description="Convert every price into this currency, e.g. USD"),
+    max_points: Optional[int] = Query(None, ge=DOWNSAMPLE_MIN_POINTS, description="Downsample the series to at most this many points, keeping peaks and troughs"),
     db: Session = Depends(get_db)
 ):
     service = EtfService(db)
+    options = schemas.AnalysisOptions(
+        include_analytics=include_analytics,
+        rolling_windows=windows,
+        view=view,
+        methodology=methodology,
+        rebalance=rebalance,
+        ffill_limit=ffill_limit,
+        series_encoding=series_encoding,
+        nav_basis=nav_basis,
+        base_currency=base_currency.upper() if base_currency else None,
+        max_points=max_points
+    )
+
+    etag = await analysis_etag(db, file, options, request.headers.get("If-None-Match"))
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = ANALYZE_CACHE_CONTROL
     
-    return await service.analyze_portfolio(file)
\ No newline at end of file
+    return await service.analyze_portfolio(file, client_key=get_real_user_ip(request), options=options)
+
+
+@router.get("/analyses", response_model=schemas.AnalysisHistoryResponse)
+async def list_analyses(
+    request: Request,
+    limit: int = Query(ANALYSES_PAGE_SIZE, ge=1, le=ANALYSES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    file_name_prefix: Optional[str] = Query(None, max_length=255),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    db: Session = Depends(get_db)
+):
+    service = EtfService(db)
+
+    return await service.list_analyses(
+        limit,
+        cursor=cursor,
+        file_name_prefix=file_name_prefix,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+
+@router.post("/portfolios", response_model=schemas.PortfolioResponse, status_code=201)
+async def create_portfolio(
+    request: Request,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    service = EtfService(db)
+
+    return await service.create_portfolio(file)
+
+
+@router.get("/portfolios/{portfolio_id}/analysis", response_model=schemas.EtfAnalysisResponse)
+async def get_portfolio_analysis(
+    request: Request,
+    response: Response,
+    portfolio_id: int,
+    db: Session = Depends(get_db)
+):
+    service = EtfService(db)
+
+    etag = await portfolio_etag(db, portfolio_id, request.headers.get("If-None-Match"))
+    if etag:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PORTFOLIO_CACHE_CONTROL
+
+    return await service.get_portfolio_analysis(portfolio_id)
+
+
+@router.get("/portfolios/{portfolio_id}/stream")
+async def stream_portfolio_nav(
+    request: Request,
+    portfolio_id: int
+):
+    queue, analysis = await broadcaster.open(portfolio_id)
+
+    return StreamingResponse(
+        nav_events(request, portfolio_id, queue, analysis),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/scenarios", response_model=schemas.ScenarioResponse)
+@limiter.limit(ANALYZE_RATE_LIMIT)
+async def run_scenarios(
+    request: Request,
+    scenario_request: schemas.ScenarioRequest,
+    db: Session = Depends(get_db)
+):
+    service = EtfService(db)
+
+    return await service.run_scenarios(scenario_request, client_key=get_real_user_ip(request))
+
+
+@router.post("/compare", response_model=schemas.ComparisonResponse)
+@limiter.limit(ANALYZE_RATE_LIMIT)
+async def compare_portfolios(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    include_holdings: bool = Query(True, description="List the common tickers of every pair"),
+    db: Session = Depends(get_db)
+):
+    service = EtfService(db)
+
+    return await service.compare_portfolios(files, client_key=get_real_user_ip(request), include_holdings=include_holdings)
+
+
+@router.get("/precompute/stats", response_model=schemas.PrecomputeStatsResponse)
+@limiter.exempt
+async def precompute_stats(request: Request):
+    return scheduler.stats()
@@ -0,0 +1,146 @@
+import itertools
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from src.modules.etf.analytics import TRADING_DAYS_PER_YEAR
+
+# Metric name -> whether a larger value ranks higher
+SCENARIO_METRICS = {
+    "total_return": True,
+    "annualized_return": True,
+    "annualized_volatility": False,
+    "sharpe_ratio": True,
+    "max_drawdown": True,
+}
+
+
+def dirichlet_weights(n_tickers: int, count: int, alpha: float, rng: np.random.Generator) -> np.ndarray:
+    return rng.dirichlet(np.full(n_tickers, alpha), size=count)
+
+
+def grid_weights(n_tickers: int, steps: int, limit: int) -> np.ndarray:
+    """
+    Every weight vector on the simplex lattice with increments of 1/steps.
+    Uses stars and bars: each choice of n-1 bar positions among steps+n-1 slots is one vector.
+    """
+    slots = steps + n_tickers - 1
+    rows = []
+    for bars in itertools.combinations(range(slots), n_tickers - 1):
+        if len(rows) >= limit:
+            raise ValueError(f"Grid produces more than {limit} scenarios, reduce steps or tickers")
+        rows.append(bars)
+    if n_tickers == 1:
+        return np.ones((1, 1))
+
+    bars = np.array(rows)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), slots)])
+    return (np.diff(edges, axis=1) - 1) / steps
+
+
+def perturbed_weights(base: np.ndarray, count: int, scale: float, rng: np.random.Generator) -> np.ndarray:
+    """Multiplicative log-normal noise around a base vector, rescaled to the base's total."""
+    noise = rng.lognormal(mean=0.0, sigma=scale, size=(count, len(base)))
+    weights = base * noise
+    totals = weights.sum(axis=1, keepdims=True)
+    return weights / np.where(totals > 0, totals, 1.0) * base.sum()
+
+
+def scenario_stats(nav: np.ndarray) -> Dict[str, np.ndarray]:
+    """Summary statistics for every column of a (dates x scenarios) NAV block."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = nav[1:] / nav[:-1] - 1.0
+        start, end = nav[0], nav[-1]
+        periods = max(len(nav) - 1, 1)
+        total_return = end / start - 1.0
+        annualized_return = np.where((start > 0) & (end > 0), (end / start) ** (TRADING_DAYS_PER_YEAR / periods) - 1.0, np.nan)
+        if len(returns) > 1:
+            daily_std = returns.std(axis=0, ddof=1)
+            annualized_volatility = daily_std * np.sqrt(TRADING_DAYS_PER_YEAR)
+            sharpe_ratio = np.where(daily_std > 0, returns.mean(axis=0) / daily_std * np.sqrt(TRADING_DAYS_PER_YEAR), np.nan)
+        else:
+            annualized_volatility = sharpe_ratio = np.full(nav.shape[1], np.nan)
+        peaks = np.maximum.accumulate(nav, axis=0)
+        max_drawdown = np.where(peaks > 0, nav / peaks - 1.0, 0.0).min(axis=0)
+
+    return {
+        "total_return": total_return,
+        "annualized_return": annualized_return,
+        "annualized_volatility": annualized_volatility,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+    }
+
+
+def evaluate_scenarios(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    metric: str,
+    top_k: int,
+    block_size: int
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Evaluates every weight vector (row of `weights`) against one (dates x tickers) price panel.
+    NAVs of a block of scenarios come from a single matrix product, so memory stays at
+    dates x block_size no matter how many scenarios there are. Returns the indices of the
+    top_k scenarios by `metric` and their statistics.
+    """
+    higher_is_better = SCENARIO_METRICS[metric]
+    best_idx = np.empty(0, dtype=np.int64)
+    best_stats: Dict[str, np.ndarray] = {name: np.empty(0) for name in SCENARIO_METRICS}
+
+    for start in range(0, len(weights), block_size):
+        block = weights[start:start + block_size]
+        stats = scenario_stats(prices @ block.T)
+
+        idx = np.concatenate([best_idx, np.arange(start, start + len(block))])
+        merged = {name: np.concatenate([best_stats[name], stats[name]]) for name in SCENARIO_METRICS}
+        score = merged[metric] if higher_is_better else -merged[metric]
+        score = np.where(np.isfinite(score), score, -np.inf)
+
+        keep = min(top_k, len(idx))
+        top = np.argpartition(-score, keep - 1)[:keep] if keep < len(idx) else np.arange(len(idx))
+        top = top[np.argsort(-score[top], kind="stable")]
+        best_idx = idx[top]
+        best_stats = {name: values[top] for name, values in merged.items()}
+
+    return best_idx, best_stats
+
+
+def block_size_for(n_dates: int, max_block_bytes: int) -> int:
+    # NAV block, returns and running peaks are each dates x block float64 arrays.
+    return max(1, max_block_bytes // max(1, n_dates * 8 * 4))
+
+
+def resolve_weights(
+    tickers: List[str],
+    kind: Optional[str],
+    explicit: Optional[List[List[float]]],
+    count: int,
+    alpha: float,
+    steps: int,
+    base: Optional[Dict[str, float]],
+    scale: float,
+    seed: Optional[int],
+    limit: int
+) -> np.ndarray:
+    if explicit is not None:
+        weights = np.asarray(explicit, dtype=float)
+        if weights.ndim != 2 or weights.shape[1] != len(tickers):
+            raise ValueError("Each weight vector must have one weight per ticker")
+        if len(weights) > limit:
+            raise ValueError(f"At most {limit} scenarios are allowed")
+        return weights
+
+    if count > limit:
+        raise ValueError(f"At most {limit} scenarios are allowed")
+    rng = np.random.default_rng(seed)
+    if kind == "dirichlet":
+        return dirichlet_weights(len(tickers), count, alpha, rng)
+    if kind == "grid":
+        return grid_weights(len(tickers), steps, limit)
+    if kind == "perturb":
+        if not base:
+            raise ValueError("Perturbation needs base weights")
+        base_vector = np.array([float(base.get(t, 0.0)) for t in tickers])
+        return perturbed_weights(base_vector, count, scale, rng)
+    raise ValueError("Provide either a weights matrix or a generator")
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from configs.db.postgresql import SessionLocal
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.cache import market_snapshot
+from src.modules.etf.service import EtfService
+from src.modules.etf import schemas
+from src.modules.etf.cache import analysis_key, popularity, analysis_cache
+from src.modules.etf.config import PRECOMPUTE_INTERVAL_SECONDS, PRECOMPUTE_TOP_K
+
+
+class PrecomputeScheduler:
+    """
+    Keeps full analyses of the most popular weight sets precomputed.
+    Each run polls the market-data snapshot; a new generation means a price load
+    happened, so the popular set is recomputed against it.
+    """
+    def __init__(self, interval: float = PRECOMPUTE_INTERVAL_SECONDS, top_k: int = PRECOMPUTE_TOP_K):
+        self.interval = interval
+        self.top_k = top_k
+        self.runs = 0
+        self.computed = 0
+        self.last_run_at: Optional[datetime] = None
+
+    def stats(self) -> schemas.PrecomputeStatsResponse:
+        return schemas.PrecomputeStatsResponse(
+            hits=analysis_cache.hits,
+            misses=analysis_cache.misses,
+            hit_rate=round(analysis_cache.hit_rate, 4),
+            cached_entries=len(analysis_cache.entries),
+            tracked_portfolios=len(popularity.counts),
+            runs=self.runs,
+            computed=self.computed,
+            market_data_generation=market_snapshot.generation,
+            last_run_at=self.last_run_at
+        )
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Precompute run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        await asyncio.to_thread(self._refresh_snapshot)
+        generation = market_snapshot.generation
+
+        for fingerprint, weights in popularity.top(self.top_k):
+            key = analysis_key(fingerprint, schemas.AnalysisOptions())
+            if analysis_cache.contains(key, generation):
+                continue
+            result = await asyncio.to_thread(self._compute, weights)
+            if result is not None:
+                analysis_cache.put(key, generation, result)
+                self.computed += 1
+
+        self.runs += 1
+        self.last_run_at = datetime.now(timezone.utc)
+
+    def _refresh_snapshot(self):
+        db = SessionLocal()
+        try:
+            market_snapshot.refresh(MarketDataRepository(db))
+        finally:
+            db.close()
+
+    def _compute(self, weights):
+        db = SessionLocal()
+        try:
+            service = EtfService(db)
+            price_records = service.market_data.get_price_history(list(weights.keys()))
+            if not price_records:
+                return None
+            return service._calculate_portfolio_math(
+                weights, price_records, "precomputed", latest_quotes=market_snapshot.latest_prices
+            )
+        except Exception as e:
+            print(f"Precompute failed for portfolio: {e}")
+            return None
+        finally:
+            db.close()
+
+
+scheduler = PrecomputeScheduler()
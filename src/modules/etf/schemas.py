@@ -1,18 +1,167 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from src.modules.etf.config import ALIGN_FFILL_LIMIT
 
 class TimeSeriesPoint(BaseModel):
     date: str
     nav: float # Net Asset Value
 
+class CompactSeries(BaseModel):
+    start: str # date of the first point
+    calendar: List[List[int]] # run-length encoded day steps between points: [step, repeat]
+    encoding: str # "float32": base64 little-endian float32 values; "delta": fixed-point first value then differences
+    scale: Optional[int] = None # delta: values are integer multiples of 1/scale
+    values: Union[str, List[int]]
+
 class LatestPriceResponse(BaseModel):
     ticker: str
     price: float
     weight: float
     value: float
 
+class TickerCoverage(BaseModel):
+    ticker: str
+    first_date: Optional[str] = None
+    last_date: Optional[str] = None
+    quoted_days: int
+    filled_days: int # forward-filled from an earlier quote
+    missing_days: int # still missing after the first quote (gap longer than the fill limit)
+    coverage: float # quoted_days / calendar days
+
+class TickerContribution(BaseModel):
+    ticker: str
+    contribution: Optional[float] = None # Share of the total return coming from this ticker
+    weight_share: Optional[float] = None # Share of the latest NAV held in this ticker
+
+class AnalyticsSeriesPoint(BaseModel):
+    date: str
+    daily_return: Optional[float] = None
+    drawdown: Optional[float] = None
+    rolling_volatility: Dict[str, Optional[float]] = {}
+
+class PortfolioAnalytics(BaseModel):
+    total_return: Optional[float] = None
+    annualized_return: Optional[float] = None
+    annualized_volatility: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    max_drawdown: Optional[float] = None
+    max_drawdown_peak_date: Optional[str] = None
+    max_drawdown_trough_date: Optional[str] = None
+    rolling_volatility_latest: Dict[str, Optional[float]] = {}
+    contributions: List[TickerContribution] = []
+    series: Optional[List[AnalyticsSeriesPoint]] = None
+
+class AnalysisOptions(BaseModel):
+    include_analytics: bool = False
+    rolling_windows: List[int] = [21, 63]
+    view: str = "full" # "full" returns every series point, "summary" only the figures
+    methodology: str = "shares" # "shares" holds the weights as share counts, "rebalanced" as target allocations
+    rebalance: str = "monthly" # rebalancing schedule when methodology is "rebalanced"
+    ffill_limit: int = ALIGN_FFILL_LIMIT # trading days a missing price is carried forward
+    series_encoding: str = "json" # "float32" / "delta" send etf_time_series_compact instead of etf_time_series
+    nav_basis: str = "raw" # "price_return" adjusts prices for splits, "total_return" for splits and reinvested dividends
+    base_currency: Optional[str] = None # converts every price into this currency; None keeps each listing's own
+    max_points: Optional[int] = None # downsamples the returned series to at most this many points (LTTB)
+
+    def compute_key(self) -> str:
+        """Identity of the options that change the computed figures (view, encoding and downsampling only pick the points returned)."""
+        return self.model_dump_json(exclude={"view", "series_encoding", "max_points"})
+
 class EtfAnalysisResponse(BaseModel):
     etf_name: str
     latest_close: float
     etf_time_series: List[TimeSeriesPoint]
-    latest_prices: List[LatestPriceResponse]
\ No newline at end of file
+    etf_time_series_compact: Optional[CompactSeries] = None
+    latest_prices: List[LatestPriceResponse]
+    analytics: Optional[PortfolioAnalytics] = None
+    coverage: Optional[List[TickerCoverage]] = None
+    base_currency: Optional[str] = None
+    downsampled_from: Optional[int] = None # length of the full series when max_points cut it
+
+class PortfolioResponse(BaseModel):
+    id: int
+    name: str
+    weights: Dict[str, float]
+    created_at: Optional[datetime] = None
+
+class AnalysisLogEntry(BaseModel):
+    id: int
+    file_name: Optional[str] = None
+    storage_url: Optional[str] = None
+    bundle_key: Optional[str] = None
+    bundle_offset: Optional[int] = None
+    bundle_length: Optional[int] = None
+    content_encoding: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class AnalysisHistoryResponse(BaseModel):
+    items: List[AnalysisLogEntry]
+    # Pass as `cursor` to get the next (older) page; None on the last page.
+    next_cursor: Optional[str] = None
+
+class PrecomputeStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    cached_entries: int
+    tracked_portfolios: int
+    runs: int
+    computed: int
+    market_data_generation: int
+    last_run_at: Optional[datetime] = None
+
+class ScenarioGenerator(BaseModel):
+    kind: str = Field(pattern="^(dirichlet|grid|perturb)$")
+    count: int = Field(1000, ge=1) # dirichlet / perturb
+    alpha: float = Field(1.0, gt=0) # dirichlet concentration
+    steps: int = Field(10, ge=1) # grid increments of 1/steps
+    base_weights: Optional[Dict[str, float]] = None # perturb around these weights...
+    base_portfolio_id: Optional[int] = None # ...or around a saved portfolio
+    scale: float = Field(0.1, gt=0) # perturb log-normal sigma
+    seed: Optional[int] = None
+
+class ScenarioRequest(BaseModel):
+    tickers: List[str] = Field(min_length=1)
+    weights: Optional[List[List[float]]] = None # one row per scenario, one column per ticker
+    generator: Optional[ScenarioGenerator] = None
+    metric: str = "sharpe_ratio"
+    top_k: int = Field(10, ge=1)
+    include_series: bool = False
+
+class ScenarioResult(BaseModel):
+    rank: int
+    index: int
+    weights: Dict[str, float]
+    total_return: Optional[float] = None
+    annualized_return: Optional[float] = None
+    annualized_volatility: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    max_drawdown: Optional[float] = None
+    etf_time_series: Optional[List[TimeSeriesPoint]] = None
+
+class ScenarioResponse(BaseModel):
+    tickers: List[str]
+    metric: str
+    scenarios_evaluated: int
+    results: List[ScenarioResult]
+
+class ComparedPortfolio(BaseModel):
+    name: str
+    holdings: int
+    latest_nav: Optional[float] = None
+
+class CommonHoldings(BaseModel):
+    a: int # indices into `portfolios`
+    b: int
+    weight_overlap: float
+    tickers: List[str]
+
+class ComparisonResponse(BaseModel):
+    portfolios: List[ComparedPortfolio]
+    observations: int # daily returns used for the correlations
+    correlation: List[List[Optional[float]]]
+    weight_overlap: List[List[float]]
+    common_count: List[List[int]]
+    common_holdings: Optional[List[CommonHoldings]] = None
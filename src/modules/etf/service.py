@@ -1,23 +1,75 @@
 import asyncio
 import io
+import numpy as np
 import pandas as pd
 from io import BytesIO
+from datetime import datetime
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, List, Optional
 
 from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.cache import market_snapshot
+from src.modules.market_data.adjustments import factor_matrix
+from src.modules.market_data.fx import RATE_CURRENCY, conversion_matrix, fx_matrix
 from src.modules.storage.service import StorageService
+from src.modules.etf.archive import archive_bundler
 from src.modules.etf.repository import EtfRepository
 from src.modules.etf import schemas
-from src.exceptions import InvalidCsvFormatException
+from src.modules.etf.cache import (
+    weights_fingerprint,
+    analysis_key,
+    panel_key,
+    popularity,
+    analysis_cache,
+    panel_cache
+)
+from src.modules.etf.alignment import AlignedPanel
+from src.modules.etf import compute
+from src.modules.etf.encoding import encode_series
+from src.modules.etf.downsampling import downsample_index, downsample_positions
+from src.modules.etf.analytics import compute_analytics, finite_or_none
+from src.modules.etf.rebalancing import rebalanced_nav
+from src.modules.etf.scenarios import (
+    SCENARIO_METRICS,
+    resolve_weights,
+    evaluate_scenarios,
+    block_size_for
+)
+from src.modules.etf.pagination import encode_cursor, decode_cursor
+from src.modules.etf.comparison import (
+    nav_matrix,
+    return_correlation,
+    value_weights,
+    weight_overlap,
+    common_holdings
+)
+from src.exceptions import (
+    InvalidCsvFormatException,
+    CostLimitExceededException,
+    ServiceOverloadedException
+)
 from src.modules.etf.exceptions import (
     InvalidCsvColumnsException,
     NoPriceDataException,
-    NoMatchingTickerDataException
+    NoMatchingTickerDataException,
+    PortfolioNotFoundException,
+    InvalidScenarioRequestException,
+    InvalidAnalysisOptionsException,
+    InvalidComparisonRequestException,
+    InvalidCursorException
 )
 from configs.db.postgresql import SessionLocal
-from src.modules.etf.config import ENABLE_BACKGROUND_STORING_TASK
+from configs.limiter import analyze_cost_limiter
+from configs.admission import math_admission, AdmissionRejected
+from src.modules.etf.config import (
+    ENABLE_BACKGROUND_STORING_TASK,
+    SCENARIO_MAX_COUNT,
+    SCENARIO_MAX_TOP_K,
+    SCENARIO_BLOCK_BYTES,
+    COMPARE_MAX_PORTFOLIOS,
+    ALIGN_FFILL_LIMIT
+)
 
 class EtfService:
 
@@ -26,16 +78,456 @@ class EtfService:
         self.etf_repo = EtfRepository(db)
         self.storage = StorageService()
 
-    async def analyze_portfolio(self, file: UploadFile) -> schemas.EtfAnalysisResponse:
+    async def analyze_portfolio(self, file: UploadFile, client_key: str = "anonymous", options: Optional[schemas.AnalysisOptions] = None) -> schemas.EtfAnalysisResponse:
+        options = options or schemas.AnalysisOptions()
         await file.seek(0)
         content = await file.read()
         filename = file.filename
+        weights = self._parse_weights(content)
+
+        if ENABLE_BACKGROUND_STORING_TASK:
+            asyncio.create_task(self._store_and_log_background(content, filename))
+
+        etf_name = filename.rsplit('.', 1)[0] if filename else "ETF"
+
+        fingerprint = weights_fingerprint(weights)
+        popularity.record(fingerprint, weights)
+        await self._refresh_market_snapshot()
+        cached = analysis_cache.get(analysis_key(fingerprint, options), market_snapshot.generation)
+        if cached is not None:
+            return self._apply_view(cached.model_copy(update={"etf_name": etf_name}), options)
 
+        return await self._process_portfolio_data(weights, etf_name, client_key, options)
+
+    async def create_portfolio(self, file: UploadFile) -> schemas.PortfolioResponse:
+        await file.seek(0)
+        content = await file.read()
+        weights = {ticker: float(weight) for ticker, weight in self._parse_weights(content).items()}
+        name = file.filename.rsplit('.', 1)[0] if file.filename else "ETF"
+
+        portfolio = await asyncio.to_thread(self.etf_repo.create_portfolio, name, weights)
+        return schemas.PortfolioResponse(
+            id=portfolio.id,
+            name=portfolio.name,
+            weights=portfolio.weights,
+            created_at=portfolio.created_at
+        )
+
+    async def list_analyses(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        file_name_prefix: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> schemas.AnalysisHistoryResponse:
+        try:
+            before = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise InvalidCursorException()
+
+        # One extra row tells whether another page exists without a COUNT.
+        rows = await asyncio.to_thread(
+            self.etf_repo.list_analyses,
+            limit + 1,
+            before=before,
+            file_name_prefix=file_name_prefix,
+            created_from=created_from,
+            created_to=created_to
+        )
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+        return schemas.AnalysisHistoryResponse(
+            items=[
+                schemas.AnalysisLogEntry(
+                    id=row.id,
+                    file_name=row.file_name,
+                    storage_url=row.storage_url,
+                    bundle_key=row.bundle_key,
+                    bundle_offset=row.bundle_offset,
+                    bundle_length=row.bundle_length,
+                    content_encoding=row.content_encoding,
+                    created_at=row.created_at
+                )
+                for row in page
+            ],
+            next_cursor=next_cursor
+        )
+
+    async def get_portfolio_analysis(self, portfolio_id: int) -> schemas.EtfAnalysisResponse:
+        await self._refresh_market_snapshot()
+        portfolio, nav_points = await asyncio.to_thread(self._refresh_portfolio_nav, portfolio_id)
+
+        if not nav_points:
+            raise NoPriceDataException()
+
+        latest_prices = portfolio.latest_prices or {}
+        return schemas.EtfAnalysisResponse(
+            etf_name=portfolio.name,
+            latest_close=round(nav_points[-1].nav, 2),
+            etf_time_series=[
+                schemas.TimeSeriesPoint(date=str(p.date), nav=round(p.nav, 2))
+                for p in nav_points
+            ],
+            latest_prices=[
+                schemas.LatestPriceResponse(
+                    ticker=t,
+                    price=round(price, 2),
+                    weight=portfolio.weights[t],
+                    value=round(price * portfolio.weights[t], 2)
+                )
+                for t, price in sorted(latest_prices.items())
+            ]
+        )
+
+    def _refresh_portfolio_nav(self, portfolio_id: int):
+        portfolio = self.etf_repo.get_portfolio(portfolio_id)
+        if portfolio is None:
+            raise PortfolioNotFoundException()
+
+        if self._has_new_market_data(portfolio):
+            self._extend_portfolio_nav(portfolio_id)
+            portfolio = self.etf_repo.get_portfolio(portfolio_id)
+
+        return portfolio, self.etf_repo.get_nav_series(portfolio_id)
+
+    def _nav_points_since(self, portfolio_id: int, after):
+        """Extend the stored series if needed and return only the points after `after`."""
+        portfolio = self.etf_repo.get_portfolio(portfolio_id)
+        if portfolio is None:
+            raise PortfolioNotFoundException()
+
+        if self._has_new_market_data(portfolio):
+            self._extend_portfolio_nav(portfolio_id)
+
+        return self.etf_repo.get_nav_series(portfolio_id, after=after)
+
+    def _extend_portfolio_nav(self, portfolio_id: int):
+        """
+        Bring the stored NAV up to date with the price writes since it was last computed. Points
+        from the earliest date those writes touched are recomputed (late quotes, backfills and
+        corrections), and new dates appended. The ALIGN_FFILL_LIMIT stored dates before the
+        recomputed ones are re-read with them, so a constituent that did not trade on a date is
+        carried forward exactly as far as a full recomputation would.
+        """
+        portfolio = self.etf_repo.get_portfolio(portfolio_id, for_update=True)
+        computed_through = portfolio.nav_computed_through
+        # Read before the prices: a write landing in between is picked up by the next refresh.
+        ingest_version = self.market_data.get_ingest_version()
+        replace_from = None
+        if computed_through is not None:
+            earliest = self.market_data.get_earliest_ingested_date(portfolio.nav_ingest_version)
+            if earliest is not None and earliest <= computed_through:
+                replace_from = earliest
+        context_after = self.etf_repo.get_nav_date(portfolio_id, ALIGN_FFILL_LIMIT, before=replace_from) if computed_through else None
+        price_records = self.market_data.get_price_history(list(portfolio.weights.keys()), after=context_after)
+        if not price_records:
+            self.etf_repo.rollback()
+            return
+        if replace_from is None and computed_through is not None and max(r.date for r in price_records) <= computed_through:
+            # Only other securities were written; remember that this NAV has seen those writes.
+            self.etf_repo.append_nav_points(portfolio, [], portfolio.latest_prices, ingest_version)
+            return
+
+        panel = compute.align(price_records, ALIGN_FFILL_LIMIT)
+        etf_series, prices_subset, _ = self._build_nav_series(portfolio.weights, panel)
+        if replace_from is not None:
+            etf_series = etf_series[etf_series.index >= replace_from]
+        elif computed_through is not None:
+            etf_series = etf_series[etf_series.index > computed_through]
+        last_prices = prices_subset.loc[prices_subset.index.max()]
+        latest_prices = dict(portfolio.latest_prices or {})
+        latest_prices.update({t: float(last_prices[t]) for t in prices_subset.columns if pd.notna(last_prices[t])})
+        self.etf_repo.append_nav_points(
+            portfolio,
+            [(pd.Timestamp(d).to_pydatetime(), float(nav)) for d, nav in etf_series.items()],
+            latest_prices,
+            ingest_version,
+            replace_from
+        )
+
+    def _has_new_market_data(self, portfolio) -> bool:
+        computed_through = portfolio.nav_computed_through
+        if computed_through is None or not market_snapshot.loaded:
+            return True
+        if market_snapshot.ingest_version != portfolio.nav_ingest_version:
+            return True
+        return market_snapshot.latest_date is None or market_snapshot.latest_date > computed_through
+
+    async def _process_portfolio_data(self, weights: Dict[str, float], etf_name: str, client_key: str = "anonymous", options: Optional[schemas.AnalysisOptions] = None) -> schemas.EtfAnalysisResponse:
+        options = options or schemas.AnalysisOptions()
+        # Charged up front from the stored calendar, so an over-budget client never reaches the price fetch.
+        estimate = len(weights) * max(market_snapshot.trading_days, 1)
+        if not analyze_cost_limiter.hit(client_key, estimate):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        panel = await self._load_panel(list(weights.keys()), options.ffill_limit, options.nav_basis, options.base_currency)
+
+        # One quote per ticker per day, so the quote count is the actual ticker-days of work.
+        if not analyze_cost_limiter.reconcile(client_key, estimate, panel.quotes):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        # Quotes from latest_prices are in listing currency; a converted panel reports its own last row.
+        latest_quotes = await self._latest_quotes(list(weights.keys())) if options.base_currency is None else None
+        try:
+            async with math_admission.slot():
+                return await asyncio.to_thread(
+                    self._calculate_portfolio_math, 
+                    weights, 
+                    panel,
+                    etf_name,
+                    options,
+                    latest_quotes
+                )
+        except AdmissionRejected as e:
+            raise ServiceOverloadedException(retry_after=e.retry_after)
+
+    async def _refresh_market_snapshot(self):
+        """Picks up prices ingested by another process before any lookup keyed on the generation."""
+        await asyncio.to_thread(market_snapshot.refresh_if_stale, self.market_data)
+
+    async def _latest_quotes(self, tickers: List[str]) -> Dict[str, float]:
+        """Latest price per ticker from the latest_prices table, through the snapshot once it is loaded."""
+        if market_snapshot.loaded:
+            return market_snapshot.latest_prices
+        records = await asyncio.to_thread(self.market_data.get_latest_prices, tickers)
+        return {r.ticker: r.price for r in records}
+
+    async def _load_panel(
+        self,
+        tickers: List[str],
+        ffill_limit: int = ALIGN_FFILL_LIMIT,
+        nav_basis: str = "raw",
+        base_currency: Optional[str] = None
+    ) -> AlignedPanel:
+        """
+        Aligned price panel of a ticker set, reused across requests until new market data arrives.
+        Adjusted and converted panels are the raw panel times one (dates x tickers) factor matrix:
+        the precomputed adjustment factors and/or the as-of FX conversion.
+        """
+        await self._refresh_market_snapshot()
+        key = panel_key(tickers, ffill_limit, nav_basis, base_currency)
+        generation = market_snapshot.generation
+        if market_snapshot.loaded:
+            panel = panel_cache.get(key, generation)
+            if panel is not None:
+                return panel
+
+        if nav_basis == "raw" and base_currency is None:
+            price_records = await asyncio.to_thread(self.market_data.get_price_history, tickers)
+            if not price_records:
+                raise NoPriceDataException()
+            panel = await asyncio.to_thread(compute.align, price_records, ffill_limit)
+        else:
+            raw = await self._load_panel(tickers, ffill_limit)
+            index, columns = raw.prices.index, list(raw.prices.columns)
+            try:
+                factors = np.ones(raw.prices.shape)
+                if nav_basis != "raw":
+                    records = await asyncio.to_thread(self.market_data.get_adjustment_factors, columns)
+                    factors = factor_matrix(records, index, columns, nav_basis)
+                if base_currency is not None:
+                    factors = factors * await self._fx_factors(index, columns, base_currency)
+            except ValueError as e:
+                raise InvalidAnalysisOptionsException(str(e))
+            panel = raw.adjusted(factors)
+        if market_snapshot.loaded:
+            panel_cache.put(key, generation, panel)
+        return panel
+
+    async def _fx_factors(self, index, tickers: List[str], base_currency: str) -> np.ndarray:
+        currencies = await asyncio.to_thread(self.market_data.get_currencies, tickers)
+        listed = [currencies.get(t, RATE_CURRENCY) for t in tickers]
+        if all(c == base_currency for c in listed):
+            return np.ones((len(index), len(tickers)))
+        generation = market_snapshot.generation if market_snapshot.loaded else None
+        fx = await asyncio.to_thread(fx_matrix.get, self.market_data, generation)
+        return conversion_matrix(fx, index, listed, base_currency)
+
+    async def run_scenarios(self, request: schemas.ScenarioRequest, client_key: str = "anonymous") -> schemas.ScenarioResponse:
+        tickers = [t.strip().upper() for t in request.tickers]
+        if len(set(tickers)) != len(tickers):
+            raise InvalidScenarioRequestException("Tickers must be unique")
+        if request.metric not in SCENARIO_METRICS:
+            raise InvalidScenarioRequestException(f"Metric must be one of: {', '.join(SCENARIO_METRICS)}")
+        if request.top_k > SCENARIO_MAX_TOP_K:
+            raise InvalidScenarioRequestException(f"top_k must be at most {SCENARIO_MAX_TOP_K}")
+
+        generator = request.generator
+        base = generator.base_weights if generator else None
+        if generator and generator.base_portfolio_id is not None:
+            portfolio = await asyncio.to_thread(self.etf_repo.get_portfolio, generator.base_portfolio_id)
+            if portfolio is None:
+                raise PortfolioNotFoundException()
+            base = portfolio.weights
+        if base:
+            base = {t.strip().upper(): w for t, w in base.items()}
+
+        try:
+            weights = resolve_weights(
+                tickers,
+                kind=generator.kind if generator else None,
+                explicit=request.weights,
+                count=generator.count if generator else 0,
+                alpha=generator.alpha if generator else 1.0,
+                steps=generator.steps if generator else 1,
+                base=base,
+                scale=generator.scale if generator else 0.1,
+                seed=generator.seed if generator else None,
+                limit=SCENARIO_MAX_COUNT
+            )
+        except ValueError as e:
+            raise InvalidScenarioRequestException(str(e))
+
+        # Every block of scenarios is one pass over the ticker-day panel; charged up front from
+        # the stored calendar, then settled against the panel actually loaded.
+        await self._refresh_market_snapshot()
+        days = max(market_snapshot.trading_days, 1)
+        estimate = len(tickers) * days * -(-len(weights) // block_size_for(days, SCENARIO_BLOCK_BYTES))
+        if not analyze_cost_limiter.hit(client_key, estimate):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        panel = await self._load_panel(tickers)
+
+        blocks = -(-len(weights) // block_size_for(len(panel.prices), SCENARIO_BLOCK_BYTES))
+        if not analyze_cost_limiter.reconcile(client_key, estimate, panel.quotes * blocks):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        try:
+            async with math_admission.slot():
+                return await asyncio.to_thread(
+                    self._calculate_scenarios,
+                    tickers,
+                    weights,
+                    panel,
+                    request
+                )
+        except AdmissionRejected as e:
+            raise ServiceOverloadedException(retry_after=e.retry_after)
+
+    def _calculate_scenarios(self, tickers: list, weights, panel: AlignedPanel, request: schemas.ScenarioRequest) -> schemas.ScenarioResponse:
+        prices_df = panel.prices
+        if prices_df.columns.intersection(tickers).empty:
+            raise NoMatchingTickerDataException()
+
+        # Same convention as the single-portfolio NAV: a ticker without a price contributes nothing.
+        frame = prices_df.reindex(columns=tickers).fillna(0.0)
+        prices = frame.to_numpy()
+
+        top_idx, top_stats = evaluate_scenarios(
+            prices,
+            weights,
+            request.metric,
+            request.top_k,
+            block_size_for(len(prices), SCENARIO_BLOCK_BYTES)
+        )
+
+        results = []
+        for position, idx in enumerate(top_idx):
+            series = None
+            if request.include_series:
+                nav = prices @ weights[idx]
+                series = [schemas.TimeSeriesPoint(date=str(d), nav=round(v, 2)) for d, v in zip(frame.index, nav)]
+            results.append(schemas.ScenarioResult(
+                rank=position + 1,
+                index=int(idx),
+                weights={t: round(float(w), 8) for t, w in zip(tickers, weights[idx])},
+                etf_time_series=series,
+                **{name: finite_or_none(values[position]) for name, values in top_stats.items()}
+            ))
+
+        return schemas.ScenarioResponse(
+            tickers=tickers,
+            metric=request.metric,
+            scenarios_evaluated=len(weights),
+            results=results
+        )
+
+    async def compare_portfolios(self, files: List[UploadFile], client_key: str = "anonymous", include_holdings: bool = True) -> schemas.ComparisonResponse:
+        if len(files) < 2:
+            raise InvalidComparisonRequestException("Upload at least two portfolios to compare")
+        if len(files) > COMPARE_MAX_PORTFOLIOS:
+            raise InvalidComparisonRequestException(f"At most {COMPARE_MAX_PORTFOLIOS} portfolios can be compared")
+
+        portfolios = []
+        for file in files:
+            await file.seek(0)
+            weights = self._parse_weights(await file.read())
+            name = file.filename.rsplit('.', 1)[0] if file.filename else "ETF"
+            portfolios.append((name, weights))
+
+        # The union of tickers is fetched once for every portfolio.
+        tickers = sorted({t for _, weights in portfolios for t in weights})
+        await self._refresh_market_snapshot()
+        estimate = len(tickers) * max(market_snapshot.trading_days, 1)
+        if not analyze_cost_limiter.hit(client_key, estimate):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        panel = await self._load_panel(tickers)
+
+        if not analyze_cost_limiter.reconcile(client_key, estimate, panel.quotes):
+            raise CostLimitExceededException(retry_after=analyze_cost_limiter.retry_after(client_key))
+
+        try:
+            async with math_admission.slot():
+                return await asyncio.to_thread(
+                    self._calculate_comparison,
+                    portfolios,
+                    tickers,
+                    panel,
+                    include_holdings
+                )
+        except AdmissionRejected as e:
+            raise ServiceOverloadedException(retry_after=e.retry_after)
+
+    def _calculate_comparison(self, portfolios: list, tickers: list, panel: AlignedPanel, include_holdings: bool) -> schemas.ComparisonResponse:
+        prices_df = panel.prices
+        if prices_df.columns.intersection(tickers).empty:
+            raise NoMatchingTickerDataException()
+
+        frame = prices_df.reindex(columns=tickers)
+        column = {t: i for i, t in enumerate(tickers)}
+        holdings = np.zeros((len(portfolios), len(tickers)))
+        for row, (_, weights) in enumerate(portfolios):
+            holdings[row, [column[t] for t in weights]] = list(weights.values())
+
+        nav = nav_matrix(frame.to_numpy(), holdings)
+        corr, observations = return_correlation(nav)
+        # Overlap by value at each ticker's last available price.
+        overlap = weight_overlap(value_weights(holdings, frame.ffill().iloc[-1].to_numpy()))
+        counts, pairs = common_holdings(holdings != 0, tickers)
+
+        common = None
+        if include_holdings:
+            common = [
+                schemas.CommonHoldings(a=a, b=b, weight_overlap=round(float(overlap[a, b]), 6), tickers=shared)
+                for a, b, shared in pairs
+            ]
+
+        return schemas.ComparisonResponse(
+            portfolios=[
+                schemas.ComparedPortfolio(
+                    name=name,
+                    holdings=int(np.count_nonzero(holdings[row])),
+                    latest_nav=round(float(nav[-1, row]), 2)
+                )
+                for row, (name, _) in enumerate(portfolios)
+            ],
+            observations=observations,
+            correlation=[[finite_or_none(v) for v in row] for row in corr],
+            weight_overlap=np.round(overlap, 6).tolist(),
+            common_count=counts.tolist(),
+            common_holdings=common
+        )
+
+    @staticmethod
+    def _parse_weights(content: bytes) -> Dict[str, float]:
         try:
             df_input = pd.read_csv(BytesIO(content))
             if df_input.empty:
                 raise InvalidCsvFormatException("CSV file is empty")
-            weights = dict(zip(df_input['name'].str.strip().str.upper(), df_input['weight']))
+            return dict(zip(df_input['name'].str.strip().str.upper(), df_input['weight']))
         except KeyError as e:
             raise InvalidCsvColumnsException()
         except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
@@ -43,53 +535,36 @@ class EtfService:
         except Exception as e:
             raise InvalidCsvFormatException()
 
-        if ENABLE_BACKGROUND_STORING_TASK:
-            asyncio.create_task(self._store_and_log_background(content, filename))
-
-        etf_name = filename.rsplit('.', 1)[0] if filename else "ETF"
-        return await self._process_portfolio_data(weights, etf_name)
-
-    async def _process_portfolio_data(self, weights: Dict[str, float], etf_name: str) -> schemas.EtfAnalysisResponse:
-        tickers = list(weights.keys())
-        price_records = await asyncio.to_thread(self.market_data.get_price_history, tickers)
-        
-        if not price_records:
-            raise NoPriceDataException()
-
-        return await asyncio.to_thread(
-            self._calculate_portfolio_math, 
-            weights, 
-            price_records,
-            etf_name
-        )
-
     async def _store_and_log_background(self, file_content: bytes, filename: str):
+        if archive_bundler.enabled:
+            try:
+                await archive_bundler.add(filename, file_content)
+            except Exception as e:
+                print(f"Background storage/DB task failed: {e}")
+            return
+
         db = SessionLocal()
         try:
-            public_url = await asyncio.to_thread(
-                self.storage.upload,
-                file_content=file_content,
-                filename=filename
-            )
+            archived = await asyncio.to_thread(self.storage.archive, file_content, filename)
             etf_repo = EtfRepository(db)
-            await asyncio.to_thread(etf_repo.log_request, filename, public_url)
+            await asyncio.to_thread(
+                etf_repo.log_request,
+                filename,
+                archived.url,
+                content_encoding=archived.content_encoding
+            )
         except Exception as e:
             print(f"Background storage/DB task failed: {e}")
         finally:
             db.close()
 
-    def _calculate_portfolio_math(self, weights: Dict[str, float], price_records: list, etf_name: str) -> schemas.EtfAnalysisResponse:
-        try:
-            data = [{'date': r.date, 'ticker': r.ticker, 'price': r.price} for r in price_records]
-        except AttributeError:
-            data = price_records
-             
-        df_prices = pd.DataFrame(data)
+    def _build_nav_series(self, weights: Dict[str, float], price_records):
+        panel = price_records if isinstance(price_records, AlignedPanel) else compute.align(price_records, ALIGN_FFILL_LIMIT)
         
-        if df_prices.empty:
+        if panel.empty:
             raise NoPriceDataException()
 
-        prices_df = df_prices.pivot(index='date', columns='ticker', values='price')
+        prices_df = panel.prices
         available_tickers = prices_df.columns.intersection(weights.keys())
         
         if available_tickers.empty:
@@ -97,31 +572,111 @@ class EtfService:
 
         weight_series = pd.Series(weights)[available_tickers]
         prices_subset = prices_df[available_tickers]
-        weighted_prices = prices_subset.mul(weight_series, axis=1)
-        etf_series = weighted_prices.sum(axis=1)
+        etf_series = compute.weighted_sum(prices_subset, weight_series)
+        return etf_series, prices_subset, weight_series
+
+    def _calculate_portfolio_math(
+        self,
+        weights: Dict[str, float],
+        price_records,
+        etf_name: str,
+        options: Optional[schemas.AnalysisOptions] = None,
+        latest_quotes: Optional[Dict[str, float]] = None
+    ) -> schemas.EtfAnalysisResponse:
+        """`latest_quotes` (from latest_prices) supplies the reported prices; tickers missing from it use the panel's last row."""
+        options = options or schemas.AnalysisOptions()
+        panel = price_records if isinstance(price_records, AlignedPanel) else compute.align(price_records, options.ffill_limit)
+        etf_series, prices_subset, weight_series = self._build_nav_series(weights, panel)
+        available_tickers = prices_subset.columns
+        last_prices = prices_subset.loc[prices_subset.index.max()]
+        if latest_quotes:
+            last_prices = pd.Series({t: latest_quotes.get(t, last_prices[t]) for t in available_tickers}, dtype=float)
+
+        if options.methodology == "rebalanced":
+            try:
+                nav, pnl, latest_values = rebalanced_nav(
+                    prices_subset.index,
+                    prices_subset.to_numpy(dtype=float),
+                    weight_series.to_numpy(dtype=float),
+                    options.rebalance,
+                    initial_nav=float(etf_series.iloc[0])
+                )
+            except ValueError as e:
+                raise InvalidAnalysisOptionsException(str(e))
+            etf_series = pd.Series(nav, index=prices_subset.index)
+        else:
+            pnl = ((prices_subset.iloc[-1] - prices_subset.iloc[0]) * weight_series).to_numpy()
+            latest_values = (last_prices * weight_series).to_numpy()
 
-        last_date = prices_subset.index.max()
-        last_prices = prices_subset.loc[last_date]
         latest_close = round(etf_series.iloc[-1], 2)
+
+        # Downsampled here, so response points are only built for the dates that are returned.
+        positions = None
+        if options.view != "summary" and options.max_points is not None and len(etf_series) > options.max_points:
+            positions = downsample_index(etf_series.index, etf_series.to_numpy(), options.max_points)
+        shown = etf_series if positions is None else etf_series.iloc[positions]
         
         latest_prices_resp = [
             schemas.LatestPriceResponse(
                 ticker=t, 
                 price=round(last_prices[t], 2),
                 weight=weights[t],
-                value=round(last_prices[t] * weights[t], 2)
+                value=round(latest_values[i], 2)
             ) 
-            for t in available_tickers
+            for i, t in enumerate(available_tickers)
         ]
         
         etf_time_series_resp = [
             schemas.TimeSeriesPoint(date=str(d), nav=round(p, 2))
-            for d, p in etf_series.items()
+            for d, p in shown.items()
         ]
 
-        return schemas.EtfAnalysisResponse(
+        analytics = None
+        if options.include_analytics:
+            analytics = compute_analytics(
+                etf_series.index,
+                etf_series.to_numpy(),
+                pnl,
+                latest_values,
+                list(available_tickers),
+                options.rolling_windows,
+                include_series=options.view == "full",
+                positions=positions
+            )
+
+        return self._apply_view(schemas.EtfAnalysisResponse(
             etf_name=etf_name,
             latest_close=latest_close,
             etf_time_series=etf_time_series_resp,
-            latest_prices=latest_prices_resp
-        )
\ No newline at end of file
+            latest_prices=latest_prices_resp,
+            analytics=analytics,
+            coverage=panel.coverage_for(available_tickers),
+            base_currency=options.base_currency,
+            downsampled_from=len(etf_series) if positions is not None else None
+        ), options)
+
+    def _apply_view(self, result: schemas.EtfAnalysisResponse, options: schemas.AnalysisOptions) -> schemas.EtfAnalysisResponse:
+        if options.view == "summary":
+            return result.model_copy(update={"etf_time_series": []})
+        if options.max_points is not None and len(result.etf_time_series) > options.max_points:
+            result = self._downsample(result, options.max_points)
+        if options.series_encoding != "json":
+            return result.model_copy(update={
+                "etf_time_series": [],
+                "etf_time_series_compact": encode_series(result.etf_time_series, options.series_encoding)
+            })
+        return result
+
+    @staticmethod
+    def _downsample(result: schemas.EtfAnalysisResponse, max_points: int) -> schemas.EtfAnalysisResponse:
+        """
+        Keeps the LTTB-chosen NAV points, and the analytics series points of the same dates.
+        For results built in full (cached); fresh ones are downsampled in _calculate_portfolio_math.
+        """
+        series = result.etf_time_series
+        positions = downsample_positions(series, max_points)
+        update = {"etf_time_series": [series[i] for i in positions], "downsampled_from": len(series)}
+        analytics = result.analytics
+        if analytics is not None and analytics.series is not None and len(analytics.series) == len(series):
+            update["analytics"] = analytics.model_copy(update={"series": [analytics.series[i] for i in positions]})
+        return result.model_copy(update=update)
\ No newline at end of file
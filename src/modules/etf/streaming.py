@@ -0,0 +1,174 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from fastapi import Request
+
+from configs.db.postgresql import SessionLocal
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.cache import market_snapshot
+from src.modules.etf.service import EtfService
+from src.modules.etf import schemas
+from src.modules.etf.config import STREAM_POLL_SECONDS, STREAM_HEARTBEAT_SECONDS, STREAM_QUEUE_SIZE
+
+
+class PortfolioFeed:
+    """All subscribers of one portfolio; new NAV points are loaded once and copied to each."""
+    def __init__(self, portfolio_id: int):
+        self.portfolio_id = portfolio_id
+        self.subscribers: Set[asyncio.Queue] = set()
+        # None until the first subscriber's full series is loaded
+        self.last_date: Optional[datetime] = None
+        self.missed_update = False
+
+
+class NavBroadcaster:
+    """
+    Pushes new NAV points of saved portfolios to subscribers.
+    A single watcher polls the market-data snapshot while anyone is subscribed;
+    when a new price load is observed, each subscribed portfolio is extended once
+    and the new points are fanned out to every queue of that portfolio.
+    """
+    def __init__(self, poll_interval: float = STREAM_POLL_SECONDS, queue_size: int = STREAM_QUEUE_SIZE):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.feeds: Dict[int, PortfolioFeed] = {}
+        self._watcher: Optional[asyncio.Task] = None
+        self._generation: Optional[int] = None
+
+    async def open(self, portfolio_id: int) -> Tuple[asyncio.Queue, schemas.EtfAnalysisResponse]:
+        """Subscribe first, then load the full series, so no point can fall between the two."""
+        queue = self.subscribe(portfolio_id)
+        try:
+            analysis = await self._load_analysis(portfolio_id)
+        except Exception:
+            self.unsubscribe(portfolio_id, queue)
+            raise
+
+        feed = self.feeds.get(portfolio_id)
+        if feed is not None and feed.last_date is None and analysis.etf_time_series:
+            feed.last_date = datetime.fromisoformat(analysis.etf_time_series[-1].date)
+            if feed.missed_update:
+                # New prices arrived while the series loaded, which may have read before them.
+                feed.missed_update = False
+                try:
+                    await self._publish_new_points(feed)
+                except Exception as e:
+                    print(f"NAV feed update failed: {e}")
+        return queue, analysis
+
+    def subscribe(self, portfolio_id: int) -> asyncio.Queue:
+        feed = self.feeds.setdefault(portfolio_id, PortfolioFeed(portfolio_id))
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        feed.subscribers.add(queue)
+        if self._watcher is None or self._watcher.done():
+            self._generation = market_snapshot.generation
+            self._watcher = asyncio.create_task(self._watch())
+        return queue
+
+    def unsubscribe(self, portfolio_id: int, queue: asyncio.Queue):
+        feed = self.feeds.get(portfolio_id)
+        if feed is None:
+            return
+        feed.subscribers.discard(queue)
+        if not feed.subscribers:
+            del self.feeds[portfolio_id]
+        if not self.feeds and self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def publish_updates(self):
+        for feed in list(self.feeds.values()):
+            if feed.last_date is None:
+                # Still opening: without a last date the whole history would be pushed, so open() catches up.
+                feed.missed_update = True
+                continue
+            await self._publish_new_points(feed)
+
+    async def _publish_new_points(self, feed: PortfolioFeed):
+        points = await asyncio.to_thread(self._load_new_points, feed.portfolio_id, feed.last_date)
+        if not points:
+            return
+        feed.last_date = points[-1].date
+        for point in points:
+            self._publish(feed, schemas.TimeSeriesPoint(date=str(point.date), nav=round(point.nav, 2)))
+
+    def _publish(self, feed: PortfolioFeed, point: schemas.TimeSeriesPoint):
+        for queue in list(feed.subscribers):
+            try:
+                queue.put_nowait(point)
+            except asyncio.QueueFull:
+                # Slow consumer: close its stream, it can reconnect and resync from the full series.
+                self.unsubscribe(feed.portfolio_id, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _watch(self):
+        while self.feeds:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self._refresh_snapshot)
+                if market_snapshot.generation != self._generation:
+                    self._generation = market_snapshot.generation
+                    await self.publish_updates()
+            except Exception as e:
+                print(f"NAV feed update failed: {e}")
+
+    async def _load_analysis(self, portfolio_id: int) -> schemas.EtfAnalysisResponse:
+        db = SessionLocal()
+        try:
+            return await EtfService(db).get_portfolio_analysis(portfolio_id)
+        finally:
+            db.close()
+
+    def _load_new_points(self, portfolio_id: int, after: Optional[datetime]):
+        db = SessionLocal()
+        try:
+            return EtfService(db)._nav_points_since(portfolio_id, after)
+        finally:
+            db.close()
+
+    def _refresh_snapshot(self):
+        db = SessionLocal()
+        try:
+            market_snapshot.refresh(MarketDataRepository(db))
+        finally:
+            db.close()
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def nav_events(
+    request: Request,
+    portfolio_id: int,
+    queue: asyncio.Queue,
+    analysis: schemas.EtfAnalysisResponse,
+    heartbeat: float = STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Server-sent events: the full analysis once, then one `nav` event per new point."""
+    last_sent = analysis.etf_time_series[-1].date if analysis.etf_time_series else ""
+    try:
+        yield _sse("snapshot", analysis.model_dump_json())
+        while True:
+            try:
+                point = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if point is None:
+                break
+            if point.date <= last_sent:
+                continue
+            last_sent = point.date
+            yield _sse("nav", json.dumps(point.model_dump()))
+    finally:
+        broadcaster.unsubscribe(portfolio_id, queue)
+
+
+broadcaster = NavBroadcaster()
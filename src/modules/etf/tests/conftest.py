@@ -9,9 +9,16 @@ import pandas as pd
 
 from src.main import app
 from src.modules.market_data.models import SecurityPrice
+from src.modules.market_data.cache import market_snapshot
 from configs.db.postgresql import get_db
 
 
+@pytest.fixture(autouse=True)
+def background_market_snapshot(monkeypatch):
+    """Leaves the market-data snapshot to the tests, so requests do not query the database for it."""
+    monkeypatch.setattr(market_snapshot, "max_age", None)
+
+
 @pytest.fixture
 def mock_db_session():
     """Mock database session"""
@@ -23,6 +30,7 @@ def mock_market_data_repo(mock_db_session):
     """Mock MarketDataRepository"""
     repo = Mock()
     repo.get_price_history = Mock(return_value=[])
+    repo.get_latest_prices = Mock(return_value=[])
     return repo
 
 
@@ -0,0 +1,165 @@
+"""Unit tests for calendar alignment of price panels"""
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+
+from src.modules.etf.service import EtfService
+from src.modules.etf.alignment import align_prices
+from src.modules.etf.cache import GenerationCache
+from src.modules.etf import schemas
+from src.modules.market_data.adjustments import AdjustmentRecord
+from src.modules.market_data.cache import MarketDataSnapshot
+from src.modules.market_data.fx import FxMatrixCache, FxRecord
+from src.modules.market_data.models import SecurityPrice
+
+
+def day(d: int) -> datetime:
+    return datetime(2024, 1, d)
+
+
+@pytest.fixture
+def gappy_records():
+    """AAPL quoted every day; MSFT misses days 3-4 and 6-9; NVDA lists on day 5"""
+    records = [SecurityPrice(date=day(d), ticker="AAPL", price=100.0 + d) for d in range(1, 11)]
+    records += [SecurityPrice(date=day(d), ticker="MSFT", price=200.0 + d) for d in (1, 2, 5, 10)]
+    records += [SecurityPrice(date=day(d), ticker="NVDA", price=50.0) for d in range(5, 11)]
+    return records
+
+
+class TestAlignPrices:
+    """Test suite for align_prices"""
+
+    def test_forward_fill_limit_and_coverage(self, gappy_records):
+        panel = align_prices(gappy_records, ffill_limit=2)
+
+        assert len(panel.prices) == 10
+        msft = panel.prices["MSFT"].tolist()
+        assert msft[:5] == [201.0, 202.0, 202.0, 202.0, 205.0]
+        # Gap of four days: two filled, two left missing
+        assert msft[5:7] == [205.0, 205.0] and np.isnan(msft[7]) and np.isnan(msft[8])
+        # No backfill before a ticker's first quote
+        assert panel.prices["NVDA"].isna().sum() == 4
+
+        coverage = {c.ticker: c for c in panel.coverage_for(["AAPL", "MSFT", "NVDA", "TSLA"])}
+        assert (coverage["MSFT"].quoted_days, coverage["MSFT"].filled_days, coverage["MSFT"].missing_days) == (4, 4, 2)
+        assert coverage["MSFT"].coverage == 0.4
+        assert coverage["NVDA"].first_date == str(day(5))
+        assert coverage["NVDA"].missing_days == 0
+        assert coverage["AAPL"].coverage == 1.0
+        assert coverage["TSLA"].quoted_days == 0 and coverage["TSLA"].first_date is None
+        assert panel.quotes == 20
+
+
+class TestAlignedNav:
+    """Test suite for NAV on aligned panels"""
+
+    @pytest.fixture
+    def service(self, gappy_records):
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            mock_market_repo_class.return_value.get_price_history = Mock(return_value=gappy_records)
+            yield EtfService(Mock())
+
+    def test_missing_quote_does_not_crash_nav(self, service, gappy_records):
+        """Test that a missing constituent price no longer drops the NAV"""
+        result = service._calculate_portfolio_math({"AAPL": 1.0, "MSFT": 1.0}, gappy_records, "T")
+
+        navs = [p.nav for p in result.etf_time_series]
+        assert navs[2] == 103.0 + 202.0
+        assert {c.ticker: c.filled_days for c in result.coverage} == {"AAPL": 0, "MSFT": 6}
+
+    @pytest.mark.asyncio
+    async def test_panel_cached_per_generation(self, service):
+        """Test that the aligned panel is reused until the market data generation changes"""
+        snapshot = MarketDataSnapshot(max_age=None)
+        snapshot.loaded = True
+        snapshot.generation = 1
+        cache = GenerationCache(4)
+
+        with patch('src.modules.etf.service.market_snapshot', snapshot), \
+             patch('src.modules.etf.service.panel_cache', cache):
+            first = await service._load_panel(["AAPL", "MSFT"])
+            second = await service._load_panel(["MSFT", "AAPL"])
+            snapshot.generation = 2
+            third = await service._load_panel(["AAPL", "MSFT"])
+
+        assert second is first
+        assert third is not first
+        assert service.market_data.get_price_history.call_count == 2
+
+
+class TestAdjustedNav:
+    """Test suite for price-return and total-return NAV"""
+
+    @pytest.fixture
+    def service(self):
+        # 2-for-1 split on day 3
+        records = [SecurityPrice(date=day(d), ticker="AAPL", price=p) for d, p in ((1, 200.0), (2, 202.0), (3, 101.0), (4, 102.0))]
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            mock_market_repo_class.return_value.get_price_history = Mock(return_value=records)
+            mock_market_repo_class.return_value.get_adjustment_factors = Mock(return_value=[AdjustmentRecord(day(3), "AAPL", 2.0, 2.0)])
+            yield EtfService(Mock())
+
+    @pytest.mark.asyncio
+    async def test_split_does_not_jump(self, service):
+        snapshot = MarketDataSnapshot(max_age=None)
+        snapshot.loaded = True
+        cache = GenerationCache(4)
+        options = schemas.AnalysisOptions(nav_basis="price_return")
+
+        with patch('src.modules.etf.service.market_snapshot', snapshot), \
+             patch('src.modules.etf.service.panel_cache', cache):
+            panel = await service._load_panel(["AAPL"], options.ffill_limit, options.nav_basis)
+            again = await service._load_panel(["AAPL"], options.ffill_limit, options.nav_basis)
+            raw = await service._load_panel(["AAPL"], options.ffill_limit)
+
+        result = service._calculate_portfolio_math({"AAPL": 10.0}, panel, "T", options)
+        assert [p.nav for p in result.etf_time_series] == [1000.0, 1010.0, 1010.0, 1020.0]
+        assert raw.prices["AAPL"].tolist() == [200.0, 202.0, 101.0, 102.0]
+        assert again is panel
+        assert service.market_data.get_price_history.call_count == 1
+        assert service.market_data.get_adjustment_factors.call_count == 1
+
+
+class TestConvertedNav:
+    """Test suite for base_currency conversion"""
+
+    @pytest.mark.asyncio
+    async def test_listing_currencies_converted_as_of(self):
+        records = [SecurityPrice(date=day(d), ticker=t, price=100.0) for d in (1, 2, 3) for t in ("RY", "AAPL")]
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'), \
+             patch('src.modules.etf.service.fx_matrix', FxMatrixCache()), \
+             patch('src.modules.etf.service.market_snapshot', MarketDataSnapshot(max_age=None)):
+            repo = mock_market_repo_class.return_value
+            repo.get_price_history = Mock(return_value=records)
+            repo.get_currencies = Mock(return_value={"RY": "CAD", "AAPL": "USD"})
+            # No CAD rate on day 2: the day 1 rate applies.
+            repo.get_fx_rates = Mock(return_value=[FxRecord(day(1), "CAD", 0.75), FxRecord(day(3), "CAD", 0.80)])
+            service = EtfService(Mock())
+            options = schemas.AnalysisOptions(base_currency="USD")
+            panel = await service._load_panel(["RY", "AAPL"], options.ffill_limit, options.nav_basis, options.base_currency)
+
+        result = service._calculate_portfolio_math({"RY": 1.0, "AAPL": 1.0}, panel, "T", options)
+        assert [p.nav for p in result.etf_time_series] == [175.0, 175.0, 180.0]
+        assert {p.ticker: p.price for p in result.latest_prices} == {"AAPL": 100.0, "RY": 80.0}
+        assert result.base_currency == "USD"
+
+
+class TestGenerationCache:
+    def test_byte_bound_evicts_oldest(self):
+        cache = GenerationCache(10, max_bytes=100, sizeof=len)
+        cache.put("a", 1, "x" * 60)
+        cache.put("b", 1, "y" * 30)
+        cache.put("c", 1, "z" * 30)
+        cache.put("huge", 1, "w" * 200)
+
+        assert not cache.contains("a", 1)
+        assert cache.contains("b", 1) and cache.contains("c", 1)
+        assert not cache.contains("huge", 1)
+        assert cache.bytes == 60
@@ -0,0 +1,94 @@
+"""Tests for the keyset-paginated analysis history (in-memory SQLite)"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.modules.etf.models import AnalysisLog
+from src.modules.etf.repository import EtfRepository
+from src.modules.etf.service import EtfService
+from src.modules.etf.pagination import encode_cursor, decode_cursor
+from src.modules.etf.exceptions import InvalidCursorException
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[AnalysisLog.__table__])
+    session = sessionmaker(bind=engine)()
+    # Pairs of rows share a timestamp so the id tie-breaker is exercised.
+    session.add_all([
+        AnalysisLog(file_name=name, storage_url=f"file:///{name}", created_at=START + timedelta(minutes=i // 2))
+        for i, name in enumerate(["spy.csv", "qqq.csv", "spy_2.csv", "iwm.csv", "spx%.csv", "spy.csv", "dia.csv"])
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def service(db):
+    with patch("src.modules.etf.service.StorageService"):
+        yield EtfService(db)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor(START, 42)) == (START, 42)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(START, 1)[:-3]])
+    def test_rejects_garbage(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestListAnalyses:
+    async def collect(self, service, limit, **filters):
+        pages, cursor = [], None
+        while True:
+            page = await service.list_analyses(limit, cursor=cursor, **filters)
+            pages.append([item.id for item in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    async def test_pages_cover_every_row_newest_first(self, service, db):
+        pages = await self.collect(service, 3)
+
+        expected = [r.id for r in db.query(AnalysisLog).order_by(AnalysisLog.created_at.desc(), AnalysisLog.id.desc())]
+        assert [len(p) for p in pages] == [3, 3, 1]
+        assert sum(pages, []) == expected == [7, 6, 5, 4, 3, 2, 1]
+
+    async def test_exact_multiple_has_no_empty_last_page(self, service):
+        pages = await self.collect(service, 7)
+
+        assert pages == [[7, 6, 5, 4, 3, 2, 1]]
+
+    async def test_prefix_filter_escapes_wildcards(self, service):
+        assert sum(await self.collect(service, 2, file_name_prefix="spy"), []) == [6, 3, 1]
+        assert sum(await self.collect(service, 2, file_name_prefix="spx%"), []) == [5]
+        assert sum(await self.collect(service, 2, file_name_prefix="spy_"), []) == [3]
+        assert sum(await self.collect(service, 2, file_name_prefix="sp_"), []) == []
+
+    async def test_time_range(self, service):
+        pages = await self.collect(
+            service, 10,
+            created_from=START + timedelta(minutes=1),
+            created_to=START + timedelta(minutes=3)
+        )
+
+        assert pages == [[6, 5, 4, 3]]
+
+    async def test_invalid_cursor(self, service):
+        with pytest.raises(InvalidCursorException):
+            await service.list_analyses(10, cursor="garbage")
+
+    def test_rows_after_cursor_only(self, db):
+        rows = EtfRepository(db).list_analyses(10, before=(START + timedelta(minutes=1), 4))
+
+        assert [r.id for r in rows] == [3, 2, 1]
@@ -0,0 +1,96 @@
+"""Unit tests for portfolio risk/return analytics"""
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+
+from src.modules.etf import schemas
+from src.modules.etf.analytics import rolling_std, drawdown, compute_analytics
+from src.modules.etf.service import EtfService
+from src.modules.market_data.models import SecurityPrice
+
+
+class TestAnalyticsMath:
+    """Test suite for the vectorized analytics helpers"""
+
+    def test_rolling_std_matches_pandas(self):
+        """Test the cumulative-sum rolling std against pandas' windowed std"""
+        values = np.random.default_rng(0).normal(0.001, 0.02, 500)
+
+        expected = pd.Series(values).rolling(21).std().to_numpy()
+        result = rolling_std(values, 21)
+
+        assert np.isnan(result[:20]).all()
+        np.testing.assert_allclose(result[20:], expected[20:], rtol=1e-9)
+
+    def test_rolling_std_window_longer_than_series(self):
+        """Test that a window longer than the series yields no values"""
+        assert np.isnan(rolling_std(np.array([0.1, 0.2]), 5)).all()
+
+    def test_drawdown(self):
+        """Test drawdown from the running peak"""
+        np.testing.assert_allclose(
+            drawdown(np.array([100.0, 110.0, 99.0, 120.0])),
+            [0.0, 0.0, -0.1, 0.0]
+        )
+
+    def test_compute_analytics(self):
+        """Test summary figures and exact per-ticker contribution"""
+        dates = pd.date_range("2024-01-01", periods=4)
+        prices = np.array([[10.0, 20.0], [11.0, 20.0], [9.0, 21.0], [12.0, 22.0]])
+        weights = np.array([2.0, 1.0])
+        nav = prices @ weights
+
+        pnl = (prices[-1] - prices[0]) * weights
+        result = compute_analytics(dates, nav, pnl, prices[-1] * weights, ["A", "B"], [2])
+
+        assert result.total_return == pytest.approx(nav[-1] / nav[0] - 1, abs=1e-6)
+        assert result.max_drawdown == pytest.approx(39.0 / 42.0 - 1, abs=1e-6)
+        assert result.max_drawdown_peak_date == str(dates[1])
+        assert result.max_drawdown_trough_date == str(dates[2])
+        assert sum(c.contribution for c in result.contributions) == pytest.approx(result.total_return, abs=1e-5)
+        assert len(result.series) == 4
+        assert result.series[0].daily_return is None
+        assert result.series[1].rolling_volatility["2"] is None
+        assert result.rolling_volatility_latest["2"] is not None
+
+
+class TestAnalyticsInService:
+    """Test suite for analytics produced by EtfService"""
+
+    @pytest.fixture
+    def service(self):
+        """Create EtfService instance with mocked dependencies"""
+        with patch('src.modules.etf.service.MarketDataRepository'), \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            yield EtfService(Mock())
+
+    @pytest.fixture
+    def price_records(self):
+        """Sample price data"""
+        dates = [datetime(2024, 1, d) for d in range(1, 6)]
+        return [
+            SecurityPrice(date=d, ticker=t, price=p + i)
+            for t, p in (("AAPL", 150.0), ("MSFT", 300.0))
+            for i, d in enumerate(dates)
+        ]
+
+    def test_analytics_omitted_by_default(self, service, price_records):
+        """Test that the analytics block is opt-in"""
+        result = service._calculate_portfolio_math({"AAPL": 0.5, "MSFT": 0.5}, price_records, "test")
+
+        assert result.analytics is None
+        assert len(result.etf_time_series) == 5
+
+    def test_summary_view(self, service, price_records):
+        """Test that the summary view carries the figures but no per-date series"""
+        options = schemas.AnalysisOptions(include_analytics=True, rolling_windows=[3], view="summary")
+
+        result = service._calculate_portfolio_math({"AAPL": 0.5, "MSFT": 0.5}, price_records, "test", options)
+
+        assert result.etf_time_series == []
+        assert result.analytics.series is None
+        assert result.analytics.total_return == pytest.approx(229.0 / 225.0 - 1, abs=1e-6)
+        assert [c.ticker for c in result.analytics.contributions] == ["AAPL", "MSFT"]
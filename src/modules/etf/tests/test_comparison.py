@@ -0,0 +1,145 @@
+"""Unit tests for multi-portfolio correlation and overlap"""
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from io import BytesIO
+from unittest.mock import Mock, patch
+from datetime import datetime
+from fastapi import UploadFile
+
+from src.modules.etf.service import EtfService
+from src.exceptions import CostLimitExceededException
+from src.modules.etf.exceptions import InvalidComparisonRequestException
+from src.modules.etf.comparison import (
+    nav_matrix,
+    return_correlation,
+    value_weights,
+    weight_overlap,
+    common_holdings
+)
+from src.modules.market_data.models import SecurityPrice
+
+
+class TestComparisonMath:
+    """Test suite for the vectorized comparison kernels"""
+
+    def test_correlation_matches_pandas(self):
+        """Test the correlation matrix against pandas on the same NAV returns"""
+        rng = np.random.default_rng(3)
+        prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(250, 30)), axis=0)
+        holdings = rng.random((6, 30)) * (rng.random((6, 30)) > 0.5)
+
+        nav = nav_matrix(prices, holdings)
+        corr, observations = return_correlation(nav)
+
+        expected = pd.DataFrame(nav).pct_change().iloc[1:].corr().to_numpy()
+        assert observations == 249
+        np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+    def test_constant_nav_has_no_correlation(self):
+        nav = np.array([[1.0, 10.0], [2.0, 10.0], [3.0, 10.0]])
+
+        corr, _ = return_correlation(nav)
+
+        assert corr[0, 0] == pytest.approx(1.0)
+        assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 1])
+
+    def test_overlap_and_common_holdings(self):
+        """Test overlap and pair lists against a brute-force reference"""
+        rng = np.random.default_rng(5)
+        tickers = [f"T{i}" for i in range(40)]
+        holdings = rng.random((5, 40)) * (rng.random((5, 40)) > 0.6)
+        latest = rng.random(40) * 100
+        latest[3] = np.nan
+
+        weights = value_weights(holdings, latest)
+        overlap = weight_overlap(weights)
+        counts, pairs = common_holdings(holdings != 0, tickers)
+
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        assert [(a, b) for a, b, _ in pairs] == list(itertools.combinations(range(5), 2))
+        for a, b, shared in pairs:
+            expected = [t for i, t in enumerate(tickers) if holdings[a, i] and holdings[b, i]]
+            assert shared == expected
+            assert counts[a, b] == counts[b, a] == len(expected)
+            assert overlap[a, b] == pytest.approx(sum(min(x, y) for x, y in zip(weights[a], weights[b])))
+        np.testing.assert_allclose(np.diag(overlap), 1.0)
+
+
+class TestCompareService:
+    """Test suite for EtfService.compare_portfolios"""
+
+    @pytest.fixture
+    def mock_market_data_repo(self):
+        repo = Mock()
+        repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p + d * s)
+            for d in range(1, 5)
+            for t, p, s in (("AAPL", 100.0, 1), ("MSFT", 200.0, -1), ("NVDA", 50.0, 2))
+        ])
+        return repo
+
+    @pytest.fixture
+    def service(self, mock_market_data_repo):
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            mock_market_repo_class.return_value = mock_market_data_repo
+            yield EtfService(Mock())
+
+    @staticmethod
+    def upload(name: str, csv: str) -> UploadFile:
+        return UploadFile(filename=name, file=BytesIO(csv.encode()))
+
+    @pytest.mark.asyncio
+    async def test_compare(self, service, mock_market_data_repo):
+        """Test that the ticker union is fetched once and every matrix is filled"""
+        files = [
+            self.upload("a.csv", "name,weight\nAAPL,1\nMSFT,1\n"),
+            self.upload("b.csv", "name,weight\naapl,2\nNVDA,1\n"),
+            self.upload("c.csv", "name,weight\nMSFT,1\n"),
+        ]
+
+        result = await service.compare_portfolios(files)
+
+        mock_market_data_repo.get_price_history.assert_called_once_with(["AAPL", "MSFT", "NVDA"])
+        assert [p.name for p in result.portfolios] == ["a", "b", "c"]
+        assert [p.holdings for p in result.portfolios] == [2, 2, 1]
+        assert result.portfolios[0].latest_nav == 300.0
+        assert result.observations == 3
+        # a's NAV is flat (AAPL gains what MSFT loses), so it has no correlation
+        assert result.correlation[0] == [None, None, None]
+        assert result.correlation[1][1] == pytest.approx(1.0)
+        expected = pd.Series([254.0, 258, 262, 266]).pct_change().corr(pd.Series([199.0, 198, 197, 196]).pct_change())
+        assert result.correlation[1][2] == pytest.approx(expected, abs=1e-6)
+        assert result.common_count == [[2, 1, 1], [1, 2, 0], [1, 0, 1]]
+        assert [(p.a, p.b, p.tickers) for p in result.common_holdings] == [
+            (0, 1, ["AAPL"]), (0, 2, ["MSFT"]), (1, 2, [])
+        ]
+        # a is 104/300 AAPL and 196/300 MSFT; c is all MSFT
+        assert result.weight_overlap[0][2] == pytest.approx(196 / 300, abs=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_cost_charged_before_price_fetch(self, service, mock_market_data_repo):
+        """Test that the ticker union is charged up front and settled against the loaded quotes"""
+        files = [self.upload("a.csv", "name,weight\nAAPL,1\nMSFT,1\n"), self.upload("b.csv", "name,weight\nNVDA,1\n")]
+        limiter = Mock(hit=Mock(return_value=False), retry_after=Mock(return_value=5))
+        snapshot = Mock(trading_days=250, generation=None, loaded=False)
+
+        with patch('src.modules.etf.service.analyze_cost_limiter', limiter), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            with pytest.raises(CostLimitExceededException):
+                await service.compare_portfolios(files, client_key="1.2.3.4")
+            limiter.hit.assert_called_once_with("1.2.3.4", 750)
+            mock_market_data_repo.get_price_history.assert_not_called()
+
+            limiter.hit.return_value = True
+            limiter.reconcile = Mock(return_value=True)
+            await service.compare_portfolios(files, client_key="1.2.3.4")
+        limiter.reconcile.assert_called_once_with("1.2.3.4", 750, 12)
+
+    @pytest.mark.asyncio
+    async def test_requires_two_portfolios(self, service):
+        with pytest.raises(InvalidComparisonRequestException):
+            await service.compare_portfolios([self.upload("a.csv", "name,weight\nAAPL,1\n")])
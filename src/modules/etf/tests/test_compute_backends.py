@@ -0,0 +1,102 @@
+"""Conformance suite: every compute backend must reproduce the pandas reference"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+
+from src.modules.etf.alignment import align_prices
+from src.modules.etf.compute import BACKENDS, ComputeBackend, backend_for
+from src.modules.market_data.models import SecurityPrice
+from src.modules.market_data.repository import PriceRecord
+
+
+def day(d: int) -> datetime:
+    return datetime(2024, 1, 1) + timedelta(days=d)
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    backend = BACKENDS[request.param]
+    if not backend.available():
+        pytest.skip(f"{backend.name} is not installed")
+    return backend
+
+
+def random_records(tickers: int, days: int, holes: float, seed: int = 0):
+    """Unsorted PriceRecords with random gaps and late listings"""
+    rng = np.random.default_rng(seed)
+    listed = rng.integers(0, days // 2, tickers)
+    records = [
+        PriceRecord(day(d), f"T{t:03d}", float(rng.uniform(1, 500)))
+        for t in range(tickers)
+        for d in range(listed[t], days)
+        if rng.random() > holes
+    ]
+    rng.shuffle(records)
+    return records
+
+
+def assert_same_panel(panel, reference):
+    pd.testing.assert_frame_equal(panel.prices, reference.prices, check_freq=False)
+    pd.testing.assert_frame_equal(panel.coverage, reference.coverage, check_dtype=False)
+    assert panel.quotes == reference.quotes
+    assert panel.ffill_limit == reference.ffill_limit
+
+
+class TestBackendConformance:
+    @pytest.mark.parametrize("ffill_limit", [0, 1, 5])
+    def test_random_gaps(self, backend, ffill_limit):
+        records = random_records(tickers=40, days=60, holes=0.3)
+
+        assert_same_panel(backend.align(records, ffill_limit), align_prices(records, ffill_limit))
+
+    @pytest.mark.parametrize("kind", ["security_price", "dict"])
+    def test_record_kinds(self, backend, kind):
+        tuples = random_records(tickers=3, days=5, holes=0.2, seed=2)
+        if kind == "dict":
+            records = [r._asdict() for r in tuples]
+        else:
+            records = [SecurityPrice(date=r.date, ticker=r.ticker, price=r.price) for r in tuples]
+
+        assert_same_panel(backend.align(records, 5), align_prices(records, 5))
+
+    def test_single_quote_and_empty(self, backend):
+        single = [PriceRecord(day(0), "AAPL", 100.0)]
+
+        assert_same_panel(backend.align(single, 5), align_prices(single, 5))
+        assert backend.align([], 5).empty
+
+    def test_weighted_sum(self, backend):
+        prices = align_prices(random_records(tickers=20, days=30, holes=0.4, seed=3), 2).prices
+        weights = pd.Series(np.linspace(0.5, 3.0, prices.shape[1]), index=prices.columns)
+
+        reference = BACKENDS["pandas"].weighted_sum(prices, weights)
+        pd.testing.assert_series_equal(backend.weighted_sum(prices, weights), reference, check_names=False, rtol=1e-12)
+
+
+class TestBackendSelection:
+    def test_fixed_setting(self):
+        assert backend_for(10, "pandas").name == "pandas"
+        with pytest.raises(ValueError):
+            backend_for(10, "spark")
+
+    def test_auto_uses_size_bands(self):
+        bands = [(0, "pandas"), (1000, "numpy")]
+
+        assert backend_for(999, "auto", bands).name == "pandas"
+        assert backend_for(1000, "auto", bands).name == "numpy"
+
+    def test_unavailable_backend_falls_back_to_numpy(self, monkeypatch):
+        monkeypatch.setattr(BACKENDS["polars"], "available", lambda: False)
+
+        assert backend_for(10, "polars").name == "numpy"
+
+    def test_backend_must_implement_every_operation(self):
+        class AlignOnly(ComputeBackend):
+            name = "partial"
+
+            def align(self, price_records, ffill_limit):
+                return align_prices(price_records, ffill_limit)
+
+        with pytest.raises(TypeError):
+            AlignOnly()
@@ -0,0 +1,170 @@
+"""Tests for ETag / If-None-Match handling of analyses"""
+import pandas as pd
+import pytest
+from io import BytesIO
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.main import app
+from src.modules.etf import schemas
+from src.modules.etf.cache import etag_matches
+from src.modules.market_data.cache import MarketDataSnapshot
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+from configs.limiter import limiter
+
+
+@pytest.fixture
+def client():
+    limiter.reset()
+    return TestClient(app)
+
+
+@pytest.fixture
+def snapshot():
+    snapshot = MarketDataSnapshot(max_age=None)
+    snapshot.loaded = True
+    snapshot.latest_date = datetime(2024, 1, 3)
+    with patch('src.modules.etf.conditional.market_snapshot', snapshot):
+        yield snapshot
+
+
+@pytest.fixture
+def mock_service():
+    service = Mock()
+    service.analyze_portfolio = AsyncMock(return_value=schemas.EtfAnalysisResponse(
+        etf_name="portfolio", latest_close=1.0, etf_time_series=[], latest_prices=[]
+    ))
+    service.get_portfolio_analysis = AsyncMock(return_value=schemas.EtfAnalysisResponse(
+        etf_name="saved", latest_close=1.0, etf_time_series=[], latest_prices=[]
+    ))
+    with patch('src.modules.etf.router.EtfService', return_value=service):
+        yield service
+
+
+def csv_upload(weights):
+    csv = pd.DataFrame({'name': list(weights), 'weight': list(weights.values())}).to_csv(index=False).encode('utf-8')
+    return {"file": ("portfolio.csv", BytesIO(csv), "text/csv")}
+
+
+class TestAnalyzeConditional:
+    """Test suite for conditional /etf/analyze requests"""
+
+    def test_not_modified_skips_analysis(self, client, snapshot, mock_service):
+        """Test that a matching If-None-Match returns 304 without running the analysis"""
+        first = client.post("/etf/analyze", files=csv_upload({"AAPL": 1, "MSFT": 2}))
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        # Same weights in a different row order and number format
+        second = client.post(
+            "/etf/analyze",
+            files=csv_upload({"msft": 2.0, "AAPL": 1.0}),
+            headers={"If-None-Match": etag}
+        )
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        assert mock_service.analyze_portfolio.call_count == 1
+
+    def test_etag_changes_with_market_data_and_options(self, client, snapshot, mock_service):
+        etag = client.post("/etf/analyze", files=csv_upload({"AAPL": 1})).headers["ETag"]
+
+        with_options = client.post("/etf/analyze?view=summary", files=csv_upload({"AAPL": 1}), headers={"If-None-Match": etag})
+        snapshot.latest_date = datetime(2024, 1, 4)
+        after_ingest = client.post("/etf/analyze", files=csv_upload({"AAPL": 1}), headers={"If-None-Match": etag})
+
+        assert with_options.status_code == 200 and with_options.headers["ETag"] != etag
+        assert after_ingest.status_code == 200 and after_ingest.headers["ETag"] != etag
+
+    def test_ingest_by_another_process_invalidates_etag(self, client, mock_service):
+        """Test that requests re-check the snapshot themselves instead of waiting for a background refresh"""
+        repo = Mock()
+        repo.get_latest_market_date = Mock(return_value=datetime(2024, 1, 3))
+        repo.get_first_market_date = Mock(return_value=datetime(2024, 1, 1))
+        repo.get_adjustments_version = Mock(return_value=None)
+        repo.get_latest_fx_date = Mock(return_value=None)
+        repo.get_all_latest_prices = Mock(return_value=[])
+        snapshot = MarketDataSnapshot(max_age=0)
+
+        with patch('src.modules.etf.conditional.market_snapshot', snapshot), \
+             patch('src.modules.etf.conditional.MarketDataRepository', return_value=repo):
+            etag = client.post("/etf/analyze", files=csv_upload({"AAPL": 1})).headers["ETag"]
+            repo.get_latest_market_date.return_value = datetime(2024, 1, 4)
+            after_ingest = client.post("/etf/analyze", files=csv_upload({"AAPL": 1}), headers={"If-None-Match": etag})
+
+        assert after_ingest.status_code == 200 and after_ingest.headers["ETag"] != etag
+        assert snapshot.generation == 2
+
+    def test_same_date_correction_invalidates_etag(self, client, mock_service):
+        """Test that a price write that leaves the latest date alone still changes the ETag"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[
+            Security.__table__, SecurityPrice.__table__, LatestPrice.__table__,
+            CorporateAction.__table__, AdjustmentFactor.__table__, FxRate.__table__, PriceIngest.__table__
+        ])
+        db = sessionmaker(bind=engine)()
+        security_ids.reset()
+        repo = MarketDataRepository(db)
+        repo.bulk_save_prices([SecurityPrice(date=datetime(2024, 1, d), ticker="AAPL", price=100.0 + d) for d in (2, 3)])
+        snapshot = MarketDataSnapshot(max_age=0)
+
+        with patch('src.modules.etf.conditional.market_snapshot', snapshot), \
+             patch('src.modules.etf.conditional.MarketDataRepository', return_value=repo):
+            etag = client.post("/etf/analyze", files=csv_upload({"AAPL": 1})).headers["ETag"]
+            repo.bulk_save_prices([SecurityPrice(date=datetime(2024, 1, 2), ticker="AAPL", price=99.0)])
+            after_correction = client.post("/etf/analyze", files=csv_upload({"AAPL": 1}), headers={"If-None-Match": etag})
+        db.close()
+        security_ids.reset()
+
+        assert snapshot.latest_date == datetime(2024, 1, 3)
+        assert after_correction.status_code == 200 and after_correction.headers["ETag"] != etag
+
+    def test_snapshot_rechecked_at_most_once_per_max_age(self):
+        repo = Mock()
+        repo.get_latest_market_date = Mock(return_value=None)
+        snapshot = MarketDataSnapshot(max_age=60)
+
+        assert snapshot.refresh_if_stale(repo)
+        assert not snapshot.refresh_if_stale(repo)
+        assert repo.get_latest_market_date.call_count == 1
+
+    def test_no_etag_until_market_data_is_loaded(self, client, mock_service):
+        with patch('src.modules.etf.conditional.market_snapshot', MarketDataSnapshot(max_age=None)):
+            response = client.post("/etf/analyze", files=csv_upload({"AAPL": 1}), headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+
+class TestPortfolioConditional:
+    """Test suite for conditional saved-portfolio reads"""
+
+    def test_portfolio_analysis_cacheable(self, client, snapshot, mock_service):
+        portfolio = SimpleNamespace(id=7, name="saved", weights={"AAPL": 1.0})
+        with patch('src.modules.etf.conditional.EtfRepository') as repo_class:
+            repo_class.return_value.get_portfolio = Mock(return_value=portfolio)
+            first = client.get("/etf/portfolios/7/analysis")
+            second = client.get("/etf/portfolios/7/analysis", headers={"If-None-Match": f'W/{first.headers["ETag"]}'})
+
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"].startswith("public, max-age=")
+        assert second.status_code == 304
+        assert mock_service.get_portfolio_analysis.call_count == 1
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,108 @@
+"""Tests for LTTB downsampling of the NAV series"""
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+
+from src.modules.etf import schemas
+from src.modules.etf.downsampling import downsample_index, lttb_indices, minmax_indices
+from src.modules.etf.encoding import decode_series
+from src.modules.etf.service import EtfService
+from src.modules.market_data.repository import PriceRecord
+
+
+def reference_lttb(x, y, max_points):
+    """Textbook per-bucket LTTB loop."""
+    n = len(y)
+    every = (n - 2) / (max_points - 2)
+    picks, a = [0], 0
+    for i in range(max_points - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_hi = min(int((i + 2) * every) + 1, n)
+        cx, cy = (np.mean(x[hi:next_hi]), np.mean(y[hi:next_hi])) if i < max_points - 3 else (x[-1], y[-1])
+        areas = [abs((x[a] - cx) * (y[b] - y[a]) - (x[a] - x[b]) * (cy - y[a])) for b in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        picks.append(a)
+    return picks + [n - 1]
+
+
+@pytest.fixture
+def walk():
+    rng = np.random.default_rng(5)
+    y = 1000 * np.cumprod(1 + rng.normal(0, 0.01, 5000))
+    return np.arange(len(y), dtype=float), y
+
+
+class TestLttb:
+    def test_matches_reference(self, walk):
+        x, y = walk[0][:900], walk[1][:900]
+
+        assert lttb_indices(x, y, 300).tolist() == reference_lttb(x, y, 300)
+
+    def test_keeps_spikes_and_ends(self, walk):
+        x, y = walk
+        y = y.copy()
+        y[1234], y[3210] = y.max() * 2, y.min() / 2
+
+        picks = lttb_indices(x, y, 200)
+
+        assert len(picks) == 200 and picks[0] == 0 and picks[-1] == len(y) - 1
+        assert np.all(np.diff(picks) > 0)
+        assert 1234 in picks and 3210 in picks
+
+    def test_short_series_untouched(self, walk):
+        assert lttb_indices(walk[0][:50], walk[1][:50], 100).tolist() == list(range(50))
+
+    def test_minmax_preselection(self):
+        y = np.array([3.0, 1.0, 2.0, 9.0, 5.0, 4.0, 0.0])
+
+        assert minmax_indices(y, 3).tolist() == [0, 1, 3, 5, 6]
+
+
+class TestDownsampledResponse:
+    @pytest.fixture
+    def result(self, walk):
+        dates = pd.bdate_range("2004-01-01", periods=len(walk[1]))
+        points = [schemas.TimeSeriesPoint(date=str(d), nav=round(float(v), 2)) for d, v in zip(dates, walk[1])]
+        series = [schemas.AnalyticsSeriesPoint(date=p.date, drawdown=0.0) for p in points]
+        return schemas.EtfAnalysisResponse(
+            etf_name="T", latest_close=points[-1].nav, etf_time_series=points, latest_prices=[],
+            analytics=schemas.PortfolioAnalytics(series=series)
+        )
+
+    def test_series_and_analytics_share_dates(self, result):
+        service = EtfService.__new__(EtfService)
+        small = service._apply_view(result, schemas.AnalysisOptions(max_points=1000))
+
+        assert len(small.etf_time_series) == 1000 and small.downsampled_from == 5000
+        assert [p.date for p in small.analytics.series] == [p.date for p in small.etf_time_series]
+        assert len(small.model_dump_json()) < len(result.model_dump_json()) / 4
+
+    def test_compact_encoding_of_downsampled_series(self, result):
+        service = EtfService.__new__(EtfService)
+        compact = service._apply_view(result, schemas.AnalysisOptions(max_points=500, series_encoding="delta"))
+        dates, values = decode_series(compact.etf_time_series_compact)
+
+        assert len(dates) == 500 and values[-1] == pytest.approx(result.latest_close)
+
+    def test_fresh_analysis_downsampled_before_building_points(self, walk):
+        dates = pd.bdate_range("2004-01-01", periods=2000)
+        records = [PriceRecord(d.to_pydatetime(), "T", float(v)) for d, v in zip(dates, walk[1][:2000])]
+        with patch('src.modules.etf.service.MarketDataRepository'), \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            service = EtfService(Mock())
+        options = schemas.AnalysisOptions(max_points=300, include_analytics=True)
+
+        with patch.object(schemas, "TimeSeriesPoint", wraps=schemas.TimeSeriesPoint) as built:
+            small = service._calculate_portfolio_math({"T": 1.0}, records, "T", options)
+
+        assert built.call_count == 300 and small.downsampled_from == 2000
+        expected = downsample_index(dates, walk[1][:2000], 300)
+        assert [p.date for p in small.etf_time_series] == [str(dates[i]) for i in expected]
+        assert [p.date for p in small.analytics.series] == [p.date for p in small.etf_time_series]
+        full = service._calculate_portfolio_math({"T": 1.0}, records, "T", schemas.AnalysisOptions(include_analytics=True))
+        assert small.analytics.max_drawdown == full.analytics.max_drawdown
+
+    def test_max_points_is_not_part_of_compute_key(self):
+        assert schemas.AnalysisOptions(max_points=10).compute_key() == schemas.AnalysisOptions().compute_key()
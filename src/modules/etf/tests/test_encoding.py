@@ -0,0 +1,118 @@
+"""Tests for the compact NAV series encoding and response compression"""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.modules.etf import schemas
+from src.modules.etf.service import EtfService
+from src.modules.etf.encoding import rle_calendar, encode_series, decode_series
+from configs.compression import CompressionMiddleware, negotiate_encoding
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    navs = np.round(1000 * np.cumprod(1 + rng.normal(0, 0.01, len(dates))), 2)
+    return [schemas.TimeSeriesPoint(date=str(d), nav=float(v)) for d, v in zip(dates, navs)]
+
+
+class TestCompactSeries:
+    """Test suite for compact series encodings"""
+
+    def test_rle_calendar(self):
+        dates = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-08", "2024-01-09"])
+
+        assert rle_calendar(dates) == [[1, 2], [5, 1], [1, 1]]
+        assert rle_calendar(dates[:1]) == []
+
+    def test_delta_round_trip_is_lossless(self, points):
+        compact = encode_series(points, "delta")
+        dates, values = decode_series(compact)
+
+        assert compact.scale == 100
+        assert [str(d) for d in dates] == [p.date for p in points]
+        np.testing.assert_array_equal(np.round(values, 2), [p.nav for p in points])
+
+    def test_float32_round_trip(self, points):
+        compact = encode_series(points, "float32")
+        dates, values = decode_series(compact)
+
+        assert isinstance(compact.values, str)
+        assert len(dates) == len(points)
+        np.testing.assert_allclose(values, [p.nav for p in points], rtol=1e-6)
+
+    def test_compact_is_smaller(self, points):
+        full = schemas.EtfAnalysisResponse(etf_name="T", latest_close=1.0, etf_time_series=points, latest_prices=[])
+        service = EtfService.__new__(EtfService)
+
+        for encoding in ("delta", "float32"):
+            compact = service._apply_view(full, schemas.AnalysisOptions(series_encoding=encoding))
+            assert compact.etf_time_series == []
+            assert len(compact.model_dump_json()) < len(full.model_dump_json()) / 3
+
+    def test_empty_series(self):
+        compact = encode_series([], "delta")
+        dates, values = decode_series(compact)
+
+        assert len(dates) == 0 and len(values) == 0
+
+
+class TestCompression:
+    """Test suite for negotiated response compression"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+        @app.get("/big")
+        def big():
+            return {"values": list(range(200))}
+
+        @app.get("/small")
+        def small():
+            return {"ok": True}
+
+        @app.get("/text")
+        def text():
+            return PlainTextResponse("x" * 500)
+
+        @app.get("/stream")
+        def stream():
+            return StreamingResponse(iter([b"data: 1\n\n" * 50, b"data: 2\n\n"]), media_type="text/event-stream")
+
+        return TestClient(app)
+
+    def test_negotiation(self):
+        assert negotiate_encoding("gzip, deflate", ["zstd", "br", "gzip"]) == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity", ["gzip"]) == ""
+        assert negotiate_encoding("*", ["gzip"]) == "gzip"
+        assert negotiate_encoding("", ["gzip"]) == ""
+
+    def test_large_json_compressed(self, client):
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.json() == {"values": list(range(200))}
+
+    def test_small_or_unaccepted_or_streamed_untouched(self, client):
+        assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+        assert client.get("/text", headers={"Accept-Encoding": "gzip"}).headers["Content-Encoding"] == "gzip"
+
+        stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in stream.headers
+        assert stream.text.endswith("data: 2\n\n")
+
+    @pytest.mark.parametrize("encoding, module", [("br", "brotli"), ("zstd", "zstandard")])
+    def test_optional_encodings(self, client, encoding, module):
+        pytest.importorskip(module)
+
+        response = client.get("/big", headers={"Accept-Encoding": f"gzip;q=0.5, {encoding}"})
+
+        assert response.headers["Content-Encoding"] == encoding
@@ -0,0 +1,161 @@
+"""Unit tests for popular-portfolio precomputation"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import UploadFile
+from io import BytesIO
+from datetime import datetime
+import pandas as pd
+
+from src.modules.etf import schemas
+from src.modules.etf.service import EtfService
+from src.modules.etf.scheduler import PrecomputeScheduler
+from src.modules.etf.cache import (
+    weights_fingerprint,
+    analysis_key,
+    PopularityTracker,
+    AnalysisResultCache
+)
+from src.modules.market_data.cache import MarketDataSnapshot
+
+
+@pytest.fixture
+def cached_result():
+    """Precomputed analysis result"""
+    return schemas.EtfAnalysisResponse(
+        etf_name="precomputed",
+        latest_close=227.0,
+        etf_time_series=[schemas.TimeSeriesPoint(date="2024-01-01", nav=227.0)],
+        latest_prices=[]
+    )
+
+
+class TestPrecomputeCache:
+    """Test suite for fingerprinting, popularity tracking and the result cache"""
+
+    def test_fingerprint_ignores_order_and_formatting(self):
+        """Test that equal weight sets share a fingerprint"""
+        assert weights_fingerprint({"AAPL": 0.6, "MSFT": 0.4}) == weights_fingerprint({"MSFT": 0.40, "AAPL": 0.6})
+        assert weights_fingerprint({"AAPL": 0.6}) != weights_fingerprint({"AAPL": 0.5})
+
+    def test_tracker_returns_most_popular(self):
+        """Test that the most frequently analyzed weight sets come first"""
+        tracker = PopularityTracker(max_tracked=10)
+        for _ in range(3):
+            tracker.record("a", {"AAPL": 1.0})
+        tracker.record("b", {"MSFT": 1.0})
+
+        assert tracker.top(1) == [("a", {"AAPL": 1.0})]
+
+    def test_tracker_is_bounded(self):
+        """Test that one-off weight sets are dropped once the bound is reached"""
+        tracker = PopularityTracker(max_tracked=4)
+        for _ in range(5):
+            tracker.record("popular", {"AAPL": 1.0})
+        for i in range(10):
+            tracker.record(f"once-{i}", {"MSFT": float(i)})
+
+        assert len(tracker.counts) <= 4
+        assert tracker.top(1)[0][0] == "popular"
+
+    def test_cache_evicts_least_recently_used(self, cached_result):
+        """Test LRU eviction and generation invalidation"""
+        cache = AnalysisResultCache(max_entries=2)
+        cache.put("a", 1, cached_result)
+        cache.put("b", 1, cached_result)
+        cache.get("a", 1)
+        cache.put("c", 1, cached_result)
+
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is cached_result
+        assert cache.get("a", 2) is None
+        assert cache.hits == 2
+        assert cache.misses == 2
+
+
+class TestPrecomputeScheduler:
+    """Test suite for PrecomputeScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_run_once_precomputes_popular_portfolios(self):
+        """Test that a run computes the popular set once per market-data generation"""
+        tracker = PopularityTracker()
+        tracker.record("fp", {"AAPL": 1.0})
+        cache = AnalysisResultCache()
+        snapshot = MarketDataSnapshot(max_age=None)
+        snapshot.generation = 3
+        scheduler = PrecomputeScheduler(top_k=5)
+        scheduler._refresh_snapshot = Mock()
+        scheduler._compute = Mock(return_value="result")
+
+        with patch('src.modules.etf.scheduler.popularity', tracker), \
+             patch('src.modules.etf.scheduler.analysis_cache', cache), \
+             patch('src.modules.etf.scheduler.market_snapshot', snapshot):
+            await scheduler.run_once()
+            await scheduler.run_once()
+            snapshot.generation = 4
+            await scheduler.run_once()
+
+        assert scheduler._compute.call_count == 2
+        assert cache.contains(analysis_key("fp", schemas.AnalysisOptions()), 4)
+        assert scheduler.stats().runs == 3
+
+
+class TestAnalyzeServedFromCache:
+    """Test suite for /etf/analyze cache hits"""
+
+    @pytest.mark.asyncio
+    async def test_analyze_served_from_precomputed_cache(self, cached_result):
+        """Test that a precomputed portfolio skips the price fetch and math"""
+        csv_content = pd.DataFrame({'name': ['AAPL', 'MSFT'], 'weight': [0.6, 0.4]}).to_csv(index=False).encode('utf-8')
+        cache = AnalysisResultCache()
+        snapshot = MarketDataSnapshot(max_age=None)
+        snapshot.generation = 2
+        cache.put(analysis_key(weights_fingerprint({"AAPL": 0.6, "MSFT": 0.4}), schemas.AnalysisOptions()), 2, cached_result)
+
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'), \
+             patch('src.modules.etf.service.ENABLE_BACKGROUND_STORING_TASK', False), \
+             patch('src.modules.etf.service.analysis_cache', cache), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            service = EtfService(Mock())
+            result = await service.analyze_portfolio(
+                UploadFile(filename="mine.csv", file=BytesIO(csv_content))
+            )
+
+        mock_market_repo_class.return_value.get_price_history.assert_not_called()
+        assert result.etf_name == "mine"
+        assert result.latest_close == 227.0
+        assert cached_result.etf_name == "precomputed"
+        assert cache.hit_rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_cached_result_dropped_after_ingest_by_another_process(self, cached_result, sample_price_data):
+        """Test that the request itself notices new prices instead of serving the cached analysis"""
+        csv_content = pd.DataFrame({'name': ['AAPL', 'MSFT'], 'weight': [0.6, 0.4]}).to_csv(index=False).encode('utf-8')
+        cache = AnalysisResultCache()
+        snapshot = MarketDataSnapshot(max_age=0)
+        snapshot.loaded, snapshot.latest_date, snapshot.generation = True, datetime(2024, 1, 2), 2
+        cache.put(analysis_key(weights_fingerprint({"AAPL": 0.6, "MSFT": 0.4}), schemas.AnalysisOptions()), 2, cached_result)
+
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'), \
+             patch('src.modules.etf.service.ENABLE_BACKGROUND_STORING_TASK', False), \
+             patch('src.modules.etf.service.analysis_cache', cache), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            repo = mock_market_repo_class.return_value
+            repo.get_latest_market_date.return_value = datetime(2024, 1, 3)
+            repo.get_first_market_date.return_value = datetime(2024, 1, 1)
+            repo.get_adjustments_version.return_value = None
+            repo.get_latest_fx_date.return_value = None
+            repo.get_all_latest_prices.return_value = []
+            repo.get_price_history.return_value = sample_price_data
+            service = EtfService(Mock())
+            result = await service.analyze_portfolio(
+                UploadFile(filename="mine.csv", file=BytesIO(csv_content))
+            )
+
+        repo.get_price_history.assert_called_once()
+        assert snapshot.generation == 3
+        assert result.latest_close != cached_result.latest_close
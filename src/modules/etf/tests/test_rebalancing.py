@@ -0,0 +1,116 @@
+"""Unit tests for the rebalanced NAV methodology"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from src.modules.etf import schemas
+from src.modules.etf.service import EtfService
+from src.modules.etf.rebalancing import rebalance_starts, rebalanced_nav
+
+
+def naive_rebalanced_nav(dates, prices, targets, frequency, initial_nav):
+    """Reference implementation: walk the dates and reset holdings on each period start."""
+    targets = targets / targets.sum()
+    starts = set(rebalance_starts(dates, frequency).tolist())
+    nav = np.empty(len(prices))
+    shares = None
+    for i in range(len(prices)):
+        if shares is None:
+            value = initial_nav
+        else:
+            value = float(np.sum(shares * prices[i]))
+        nav[i] = value
+        if i in starts:
+            shares = value * targets / prices[i]
+    return nav
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2021-01-01", "2023-06-30")
+    returns = rng.normal(0.0003, 0.01, size=(len(dates), 4))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return dates, prices
+
+
+class TestRebalancedNav:
+    """Test suite for the vectorized segment math"""
+
+    def test_rebalance_starts(self):
+        """Test that each period starts on its first trading day"""
+        dates = pd.to_datetime(["2024-01-30", "2024-01-31", "2024-02-01", "2024-04-02", "2025-01-02"])
+
+        assert rebalance_starts(dates, "monthly").tolist() == [0, 2, 3, 4]
+        assert rebalance_starts(dates, "quarterly").tolist() == [0, 3, 4]
+        assert rebalance_starts(dates, "annual").tolist() == [0, 4]
+        with pytest.raises(ValueError):
+            rebalance_starts(dates, "weekly")
+
+    @pytest.mark.parametrize("frequency", ["monthly", "quarterly", "annual"])
+    def test_matches_naive_loop(self, panel, frequency):
+        """Test the vectorized NAV against the per-date loop"""
+        dates, prices = panel
+        targets = np.array([0.4, 0.3, 0.2, 0.1])
+
+        nav, pnl, latest_values = rebalanced_nav(dates, prices, targets, frequency, initial_nav=1000.0)
+
+        expected = naive_rebalanced_nav(dates, prices, targets, frequency, 1000.0)
+        np.testing.assert_allclose(nav, expected, rtol=1e-10)
+        np.testing.assert_allclose(pnl.sum(), nav[-1] - nav[0], rtol=1e-10)
+        np.testing.assert_allclose(latest_values.sum(), nav[-1], rtol=1e-10)
+
+    def test_missing_price_is_held_unchanged(self):
+        """Test that a NaN price does not poison the NAV"""
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-02-01"])
+        prices = np.array([[10.0, 20.0], [np.nan, 22.0], [11.0, 22.0]])
+
+        nav, _, _ = rebalanced_nav(dates, prices, np.array([1.0, 1.0]), "monthly", initial_nav=100.0)
+
+        np.testing.assert_allclose(nav, [100.0, 105.0, 110.0])
+
+    def test_zero_targets_rejected(self):
+        with pytest.raises(ValueError):
+            rebalanced_nav([datetime(2024, 1, 2)], np.ones((1, 2)), np.zeros(2), "monthly", 1.0)
+
+
+class TestRebalancedAnalysis:
+    """Test suite for the methodology option in the service"""
+
+    @pytest.fixture
+    def service(self):
+        """Create EtfService instance with mocked dependencies"""
+        with patch('src.modules.etf.service.MarketDataRepository'), \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            yield EtfService(Mock())
+
+    def test_methodology_changes_nav(self, service):
+        """Test that the rebalanced NAV diverges from the share-basis NAV after a rebalance"""
+        records = [
+            {"date": datetime(2024, 1, 2), "ticker": "A", "price": 10.0},
+            {"date": datetime(2024, 1, 2), "ticker": "B", "price": 10.0},
+            {"date": datetime(2024, 1, 31), "ticker": "A", "price": 20.0},
+            {"date": datetime(2024, 1, 31), "ticker": "B", "price": 10.0},
+            {"date": datetime(2024, 2, 1), "ticker": "A", "price": 20.0},
+            {"date": datetime(2024, 2, 1), "ticker": "B", "price": 10.0},
+            {"date": datetime(2024, 2, 2), "ticker": "A", "price": 20.0},
+            {"date": datetime(2024, 2, 2), "ticker": "B", "price": 20.0},
+        ]
+        weights = {"A": 1.0, "B": 1.0}
+
+        shares = service._calculate_portfolio_math(weights, records, "T")
+        rebalanced = service._calculate_portfolio_math(
+            weights, records, "T",
+            schemas.AnalysisOptions(methodology="rebalanced", include_analytics=True)
+        )
+
+        assert [p.nav for p in shares.etf_time_series] == [20.0, 30.0, 30.0, 40.0]
+        # Reset to 50/50 of 30 on Feb 1, then B doubles: 15 + 30
+        assert [p.nav for p in rebalanced.etf_time_series] == [20.0, 30.0, 30.0, 45.0]
+        assert rebalanced.latest_close == 45.0
+        assert {p.ticker: p.value for p in rebalanced.latest_prices} == {"A": 15.0, "B": 30.0}
+        contributions = {c.ticker: c.contribution for c in rebalanced.analytics.contributions}
+        assert contributions == {"A": pytest.approx(0.5), "B": pytest.approx(0.75)}
@@ -7,11 +7,13 @@ from io import BytesIO
 import pandas as pd
 
 from src.main import app
+from configs.limiter import limiter
 from src.modules.etf.service import EtfService
 from src.modules.etf.exceptions import (
     InvalidCsvColumnsException,
     NoPriceDataException,
-    NoMatchingTickerDataException
+    NoMatchingTickerDataException,
+    PortfolioNotFoundException
 )
 from src.exceptions import InvalidCsvFormatException
 
@@ -238,6 +240,34 @@ class TestAnalyzeEndpoint:
         # Rate limiting can occur if too many tests run in sequence
         assert response.status_code in [400, 429]
 
+    @patch('src.modules.etf.router.EtfService')
+    def test_analyze_analytics_options(
+        self,
+        mock_etf_service_class,
+        client,
+        valid_csv_content
+    ):
+        """Test that analytics query parameters reach the service"""
+        from src.modules.etf import schemas
+
+        mock_service = Mock()
+        mock_service.analyze_portfolio = AsyncMock(
+            return_value=schemas.EtfAnalysisResponse(
+                etf_name="portfolio", latest_close=1.0, etf_time_series=[], latest_prices=[]
+            )
+        )
+        mock_etf_service_class.return_value = mock_service
+        limiter.reset()
+
+        response = client.post(
+            "/etf/analyze?include_analytics=true&windows=5&windows=10&view=summary",
+            files={"file": ("portfolio.csv", BytesIO(valid_csv_content), "text/csv")}
+        )
+
+        assert response.status_code == 200
+        options = mock_service.analyze_portfolio.call_args.kwargs["options"]
+        assert options == schemas.AnalysisOptions(include_analytics=True, rolling_windows=[5, 10], view="summary")
+
     def test_analyze_missing_file(self, client):
         """Test analysis endpoint without file"""
         # Make request without file
@@ -252,3 +282,44 @@ class TestAnalyzeEndpoint:
         response = client.post("/etf/analyze")
         # Should not be 404 (endpoint exists)
         assert response.status_code != 404
+
+
+class TestPortfolioEndpoints:
+    """Test suite for saved portfolio endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        """Test client for FastAPI app"""
+        return TestClient(app)
+
+    @patch('src.modules.etf.router.EtfService')
+    def test_create_portfolio(self, mock_etf_service_class, client):
+        """Test POST /etf/portfolios"""
+        from src.modules.etf import schemas
+
+        mock_service = Mock()
+        mock_service.create_portfolio = AsyncMock(
+            return_value=schemas.PortfolioResponse(id=1, name="portfolio", weights={"AAPL": 1.0})
+        )
+        mock_etf_service_class.return_value = mock_service
+
+        csv = pd.DataFrame({'name': ['AAPL'], 'weight': [1.0]}).to_csv(index=False).encode('utf-8')
+        response = client.post(
+            "/etf/portfolios",
+            files={"file": ("portfolio.csv", BytesIO(csv), "text/csv")}
+        )
+
+        assert response.status_code == 201
+        assert response.json()["id"] == 1
+
+    @patch('src.modules.etf.router.EtfService')
+    def test_get_portfolio_analysis_not_found(self, mock_etf_service_class, client):
+        """Test GET /etf/portfolios/{id}/analysis for an unknown portfolio"""
+        mock_service = Mock()
+        mock_service.get_portfolio_analysis = AsyncMock(side_effect=PortfolioNotFoundException())
+        mock_etf_service_class.return_value = mock_service
+
+        response = client.get("/etf/portfolios/99/analysis")
+
+        assert response.status_code == 404
+        mock_service.get_portfolio_analysis.assert_called_once_with(99)
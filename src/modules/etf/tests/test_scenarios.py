@@ -0,0 +1,165 @@
+"""Unit tests for the vectorized scenario engine"""
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime
+
+from src.modules.etf import schemas
+from src.modules.etf.service import EtfService
+from src.exceptions import CostLimitExceededException
+from src.modules.etf.exceptions import InvalidScenarioRequestException
+from src.modules.etf.scenarios import (
+    grid_weights,
+    dirichlet_weights,
+    perturbed_weights,
+    scenario_stats,
+    evaluate_scenarios
+)
+from src.modules.market_data.models import SecurityPrice
+
+
+class TestScenarioMath:
+    """Test suite for weight generators and block evaluation"""
+
+    def test_grid_weights_cover_simplex_lattice(self):
+        """Test that the grid enumerates every vector with 1/steps increments"""
+        weights = grid_weights(3, 4, limit=1000)
+
+        assert len(weights) == 15  # C(4 + 2, 2)
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        assert len({tuple(row) for row in weights}) == 15
+
+    def test_grid_weights_limit(self):
+        """Test that oversized grids are rejected"""
+        with pytest.raises(ValueError):
+            grid_weights(10, 20, limit=100)
+
+    def test_dirichlet_and_perturbed_weights(self):
+        """Test generator totals"""
+        rng = np.random.default_rng(1)
+        np.testing.assert_allclose(dirichlet_weights(4, 50, 1.0, rng).sum(axis=1), 1.0)
+
+        base = np.array([0.5, 0.3, 0.2])
+        perturbed = perturbed_weights(base, 50, 0.2, rng)
+        np.testing.assert_allclose(perturbed.sum(axis=1), 1.0)
+        assert (perturbed > 0).all()
+
+    @pytest.mark.parametrize("block_size", [1, 7, 1000])
+    def test_evaluate_scenarios_matches_full_ranking(self, block_size):
+        """Test that block-wise top-k equals ranking every scenario at once"""
+        rng = np.random.default_rng(2)
+        prices = np.cumprod(1 + rng.normal(0.0005, 0.01, (250, 5)), axis=0) * 100
+        weights = rng.dirichlet(np.ones(5), size=200)
+
+        top_idx, top_stats = evaluate_scenarios(prices, weights, "sharpe_ratio", 10, block_size)
+
+        full = scenario_stats(prices @ weights.T)["sharpe_ratio"]
+        np.testing.assert_array_equal(top_idx, np.argsort(-full)[:10])
+        np.testing.assert_allclose(top_stats["sharpe_ratio"], np.sort(full)[::-1][:10])
+
+    def test_lower_is_better_metric(self):
+        """Test that volatility ranks ascending"""
+        rng = np.random.default_rng(3)
+        prices = np.cumprod(1 + rng.normal(0, 0.01, (100, 3)), axis=0)
+        weights = rng.dirichlet(np.ones(3), size=30)
+
+        _, top_stats = evaluate_scenarios(prices, weights, "annualized_volatility", 5, 8)
+
+        assert (np.diff(top_stats["annualized_volatility"]) >= 0).all()
+
+
+class TestScenarioService:
+    """Test suite for EtfService.run_scenarios"""
+
+    @pytest.fixture
+    def mock_market_data_repo(self):
+        """Mock MarketDataRepository with two tickers over four days"""
+        repo = Mock()
+        repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p * (1 + 0.01 * d * s))
+            for d in range(1, 5)
+            for t, p, s in (("AAPL", 150.0, 1), ("MSFT", 300.0, -1))
+        ])
+        return repo
+
+    @pytest.fixture
+    def service(self, mock_market_data_repo):
+        """Create EtfService instance with mocked dependencies"""
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            mock_market_repo_class.return_value = mock_market_data_repo
+            yield EtfService(Mock())
+
+    @pytest.mark.asyncio
+    async def test_explicit_weights_ranked(self, service, mock_market_data_repo):
+        """Test that the price panel is loaded once and scenarios are ranked"""
+        request = schemas.ScenarioRequest(
+            tickers=["aapl", "MSFT"],
+            weights=[[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
+            metric="total_return",
+            top_k=2,
+            include_series=True
+        )
+
+        result = await service.run_scenarios(request)
+
+        mock_market_data_repo.get_price_history.assert_called_once_with(["AAPL", "MSFT"])
+        assert result.scenarios_evaluated == 3
+        assert [r.index for r in result.results] == [0, 2]
+        assert result.results[0].weights == {"AAPL": 1.0, "MSFT": 0.0}
+        assert result.results[0].total_return == pytest.approx(0.03 / 1.01, abs=1e-6)
+        assert len(result.results[0].etf_time_series) == 4
+
+    @pytest.mark.asyncio
+    async def test_generator(self, service):
+        """Test a seeded Dirichlet sweep"""
+        request = schemas.ScenarioRequest(
+            tickers=["AAPL", "MSFT"],
+            generator=schemas.ScenarioGenerator(kind="dirichlet", count=500, seed=7),
+            top_k=3
+        )
+
+        result = await service.run_scenarios(request)
+
+        assert result.scenarios_evaluated == 500
+        assert len(result.results) == 3
+        assert result.results[0].sharpe_ratio >= result.results[-1].sharpe_ratio
+
+    @pytest.mark.asyncio
+    async def test_cost_charged_before_price_fetch(self, service, mock_market_data_repo):
+        """Test that an over-budget sweep is rejected before the panel is loaded"""
+        request = schemas.ScenarioRequest(tickers=["AAPL", "MSFT"], weights=[[1.0, 0.0], [0.0, 1.0]])
+        limiter = Mock(hit=Mock(return_value=False), retry_after=Mock(return_value=5))
+        snapshot = Mock(trading_days=250, generation=None, loaded=False)
+
+        with patch('src.modules.etf.service.analyze_cost_limiter', limiter), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            with pytest.raises(CostLimitExceededException):
+                await service.run_scenarios(request, client_key="1.2.3.4")
+
+        # 2 tickers x 250 stored trading days x one block
+        limiter.hit.assert_called_once_with("1.2.3.4", 500)
+        mock_market_data_repo.get_price_history.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cost_reconciled_to_loaded_quotes(self, service):
+        request = schemas.ScenarioRequest(tickers=["AAPL", "MSFT"], weights=[[1.0, 0.0], [0.0, 1.0]])
+        limiter = Mock(hit=Mock(return_value=True), reconcile=Mock(return_value=True))
+        snapshot = Mock(trading_days=250, generation=None, loaded=False)
+
+        with patch('src.modules.etf.service.analyze_cost_limiter', limiter), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            await service.run_scenarios(request, client_key="1.2.3.4")
+
+        limiter.reconcile.assert_called_once_with("1.2.3.4", 500, 8)
+
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self, service):
+        """Test validation of scenario requests"""
+        with pytest.raises(InvalidScenarioRequestException):
+            await service.run_scenarios(schemas.ScenarioRequest(tickers=["AAPL"], weights=[[0.5, 0.5]]))
+        with pytest.raises(InvalidScenarioRequestException):
+            await service.run_scenarios(schemas.ScenarioRequest(tickers=["AAPL"], weights=[[1.0]], metric="alpha"))
+        with pytest.raises(InvalidScenarioRequestException):
+            await service.run_scenarios(schemas.ScenarioRequest(tickers=["AAPL"]))
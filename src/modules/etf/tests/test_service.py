@@ -10,10 +10,16 @@ from src.modules.etf.service import EtfService
 from src.modules.etf.exceptions import (
     InvalidCsvColumnsException,
     NoPriceDataException,
-    NoMatchingTickerDataException
+    NoMatchingTickerDataException,
+    PortfolioNotFoundException
+)
+from src.exceptions import (
+    InvalidCsvFormatException,
+    CostLimitExceededException,
+    ServiceOverloadedException
 )
-from src.exceptions import InvalidCsvFormatException
 from src.modules.market_data.models import SecurityPrice
+from src.modules.etf.models import Portfolio, PortfolioNav
 
 
 class TestEtfService:
@@ -29,6 +35,7 @@ class TestEtfService:
         """Mock MarketDataRepository"""
         repo = Mock()
         repo.get_price_history = Mock(return_value=[])
+        repo.get_latest_prices = Mock(return_value=[])
         return repo
 
     @pytest.fixture
@@ -402,3 +409,363 @@ class TestEtfService:
 
             # Assertions
             assert result.etf_name == "ETF"  # Default name
+
+    @pytest.mark.asyncio
+    async def test_analyze_portfolio_cost_limit_exceeded(
+        self,
+        service,
+        mock_market_data_repo,
+        valid_csv_content,
+        sample_price_data
+    ):
+        """Test that an over-budget request is rejected before any price history is fetched"""
+        file = UploadFile(
+            filename="test.csv",
+            file=BytesIO(valid_csv_content)
+        )
+        mock_cost_limiter = Mock()
+        mock_cost_limiter.hit = Mock(return_value=False)
+        mock_cost_limiter.retry_after = Mock(return_value=42)
+        snapshot = Mock(trading_days=250, generation=None)
+
+        with patch('src.modules.etf.service.analyze_cost_limiter', mock_cost_limiter), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            with pytest.raises(CostLimitExceededException) as exc_info:
+                await service.analyze_portfolio(file, client_key="1.2.3.4")
+
+        # Estimated as 2 tickers x 250 stored trading days
+        mock_cost_limiter.hit.assert_called_once_with("1.2.3.4", 500)
+        mock_market_data_repo.get_price_history.assert_not_called()
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "42"
+
+    @pytest.mark.asyncio
+    async def test_analyze_portfolio_cost_reconciled_to_loaded_quotes(
+        self,
+        service,
+        mock_market_data_repo,
+        valid_csv_content,
+        sample_price_data
+    ):
+        """Test that the up-front estimate is corrected to the quotes actually loaded"""
+        file = UploadFile(
+            filename="test.csv",
+            file=BytesIO(valid_csv_content)
+        )
+        async def mock_to_thread(func, *args, **kwargs):
+            if func == service.market_data.get_price_history:
+                return sample_price_data
+            return func(*args, **kwargs)
+
+        mock_cost_limiter = Mock()
+        mock_cost_limiter.hit = Mock(return_value=True)
+        mock_cost_limiter.reconcile = Mock(return_value=False)
+        mock_cost_limiter.retry_after = Mock(return_value=42)
+        snapshot = Mock(trading_days=0, generation=None)
+
+        with patch('asyncio.to_thread', side_effect=mock_to_thread), \
+             patch('src.modules.etf.service.analyze_cost_limiter', mock_cost_limiter), \
+             patch('src.modules.etf.service.market_snapshot', snapshot):
+            with pytest.raises(CostLimitExceededException):
+                await service.analyze_portfolio(file, client_key="1.2.3.4")
+
+        # Unknown calendar: one unit per ticker up front, then 2 tickers x 3 days
+        mock_cost_limiter.hit.assert_called_once_with("1.2.3.4", 2)
+        mock_cost_limiter.reconcile.assert_called_once_with("1.2.3.4", 2, 6)
+
+    @pytest.mark.asyncio
+    async def test_analyze_portfolio_sheds_load_when_saturated(
+        self,
+        service,
+        mock_market_data_repo,
+        valid_csv_content,
+        sample_price_data
+    ):
+        """Test that a saturated math executor answers 503 instead of queueing"""
+        from configs.admission import AdmissionGate
+
+        file = UploadFile(
+            filename="test.csv",
+            file=BytesIO(valid_csv_content)
+        )
+        async def mock_to_thread(func, *args, **kwargs):
+            if func == service.market_data.get_price_history:
+                return sample_price_data
+            return func(*args, **kwargs)
+
+        gate = AdmissionGate(max_concurrency=1, max_queue=0, queue_timeout=1, retry_after=7)
+
+        with patch('asyncio.to_thread', side_effect=mock_to_thread), \
+             patch('src.modules.etf.service.math_admission', gate):
+            async with gate.slot():
+                with pytest.raises(ServiceOverloadedException) as exc_info:
+                    await service.analyze_portfolio(file)
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "7"
+        assert gate.rejected == 1
+
+
+class TestSavedPortfolios:
+    """Test suite for saved portfolios and their incrementally maintained NAV"""
+
+    @pytest.fixture
+    def mock_market_data_repo(self):
+        """Mock MarketDataRepository; the newest price write (2) only touched 2024-01-03"""
+        repo = Mock()
+        repo.get_price_history = Mock(return_value=[])
+        repo.get_ingest_version = Mock(return_value=2)
+        repo.get_earliest_ingested_date = Mock(return_value=datetime(2024, 1, 3))
+        return repo
+
+    @pytest.fixture
+    def mock_etf_repo(self):
+        """Mock EtfRepository"""
+        return Mock()
+
+    @pytest.fixture
+    def service(self, mock_market_data_repo, mock_etf_repo):
+        """Create EtfService instance with mocked dependencies"""
+        with patch('src.modules.etf.service.MarketDataRepository') as mock_market_repo_class, \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository') as mock_etf_repo_class:
+            mock_market_repo_class.return_value = mock_market_data_repo
+            mock_etf_repo_class.return_value = mock_etf_repo
+            yield EtfService(Mock())
+
+    @pytest.fixture
+    def portfolio(self):
+        """Saved portfolio computed through 2024-01-02"""
+        return Portfolio(
+            id=1,
+            name="saved",
+            weights={"AAPL": 0.5, "MSFT": 0.5},
+            latest_prices={"AAPL": 151.0, "MSFT": 301.0},
+            nav_computed_through=datetime(2024, 1, 2),
+            nav_ingest_version=1
+        )
+
+    @pytest.fixture
+    def stored_nav(self):
+        """Stored NAV series"""
+        return [
+            PortfolioNav(portfolio_id=1, date=datetime(2024, 1, 1), nav=225.0),
+            PortfolioNav(portfolio_id=1, date=datetime(2024, 1, 2), nav=226.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_portfolio(self, service, mock_etf_repo):
+        """Test that a portfolio is stored with parsed, normalized weights"""
+        csv_content = pd.DataFrame({'name': [' aapl', 'msft'], 'weight': [0.6, 0.4]}).to_csv(index=False).encode('utf-8')
+        mock_etf_repo.create_portfolio = Mock(
+            side_effect=lambda name, weights: Portfolio(id=7, name=name, weights=weights)
+        )
+
+        result = await service.create_portfolio(UploadFile(filename="growth.csv", file=BytesIO(csv_content)))
+
+        mock_etf_repo.create_portfolio.assert_called_once_with("growth", {"AAPL": 0.6, "MSFT": 0.4})
+        assert result.id == 7
+        assert result.name == "growth"
+
+    @pytest.mark.asyncio
+    async def test_analysis_appends_only_new_dates(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo,
+        portfolio,
+        stored_nav
+    ):
+        """Test that only the forward-fill context and new dates are fetched, and only new dates appended"""
+        new_prices = [
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="AAPL", price=151.0),
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="MSFT", price=301.0),
+            SecurityPrice(date=datetime(2024, 1, 3), ticker="AAPL", price=152.0),
+            SecurityPrice(date=datetime(2024, 1, 3), ticker="MSFT", price=302.0),
+        ]
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_date = Mock(return_value=datetime(2024, 1, 1))
+        mock_market_data_repo.get_price_history = Mock(return_value=new_prices)
+        mock_etf_repo.get_nav_series = Mock(
+            return_value=stored_nav + [PortfolioNav(portfolio_id=1, date=datetime(2024, 1, 3), nav=227.0)]
+        )
+
+        result = await service.get_portfolio_analysis(1)
+
+        mock_etf_repo.get_nav_date.assert_called_once_with(1, 5, before=None)
+        mock_market_data_repo.get_earliest_ingested_date.assert_called_once_with(1)
+        mock_market_data_repo.get_price_history.assert_called_once_with(
+            ["AAPL", "MSFT"], after=datetime(2024, 1, 1)
+        )
+        _, points, latest_prices, ingest_version, replace_from = mock_etf_repo.append_nav_points.call_args[0]
+        assert points == [(datetime(2024, 1, 3), 227.0)]
+        assert (ingest_version, replace_from) == (2, None)
+        assert latest_prices == {"AAPL": 152.0, "MSFT": 302.0}
+        assert result.latest_close == 227.0
+        assert len(result.etf_time_series) == 3
+
+    @pytest.mark.asyncio
+    async def test_constituent_without_new_quote_is_carried_forward(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo
+    ):
+        """Test that a constituent that did not trade on the new day still counts in the appended NAV"""
+        portfolio = Portfolio(
+            id=1, name="saved", weights={"A": 1.0, "B": 1.0},
+            latest_prices={"A": 10.0, "B": 20.0}, nav_computed_through=datetime(2024, 1, 2)
+        )
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_date = Mock(return_value=datetime(2024, 1, 1))
+        mock_etf_repo.get_nav_series = Mock(return_value=[])
+        mock_market_data_repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="A", price=10.0),
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="B", price=20.0),
+            SecurityPrice(date=datetime(2024, 1, 3), ticker="A", price=10.0),
+        ])
+
+        service._extend_portfolio_nav(1)
+
+        _, points, latest_prices, _, _ = mock_etf_repo.append_nav_points.call_args[0]
+        assert points == [(datetime(2024, 1, 3), 30.0)]
+        assert latest_prices == {"A": 10.0, "B": 20.0}
+
+    def test_stale_constituent_not_carried_past_ffill_limit(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo
+    ):
+        """Test that a price older than the forward-fill window is not revived by the extension"""
+        portfolio = Portfolio(
+            id=1, name="saved", weights={"A": 1.0, "B": 1.0},
+            latest_prices={"A": 10.0, "B": 20.0}, nav_computed_through=datetime(2024, 1, 10)
+        )
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_date = Mock(return_value=datetime(2024, 1, 5))
+        mock_market_data_repo.get_earliest_ingested_date = Mock(return_value=datetime(2024, 1, 11))
+        # B last traded before the context window, so only A is read back.
+        mock_market_data_repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, d), ticker="A", price=10.0) for d in range(6, 12)
+        ])
+
+        service._extend_portfolio_nav(1)
+
+        points = mock_etf_repo.append_nav_points.call_args[0][1]
+        assert points == [(datetime(2024, 1, 11), 10.0)]
+
+    def test_correction_recomputes_from_earliest_touched_date(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo
+    ):
+        """Test that a write to an already computed date rewrites the NAV from that date on"""
+        portfolio = Portfolio(
+            id=1, name="saved", weights={"A": 1.0, "B": 1.0},
+            latest_prices={"A": 10.0, "B": 20.0}, nav_computed_through=datetime(2024, 1, 4), nav_ingest_version=1
+        )
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_date = Mock(return_value=datetime(2024, 1, 1))
+        # Write 2 corrected A on 2024-01-03 and added B's late quote for it.
+        mock_market_data_repo.get_earliest_ingested_date = Mock(return_value=datetime(2024, 1, 3))
+        mock_market_data_repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p)
+            for d, t, p in ((2, "A", 10.0), (2, "B", 20.0), (3, "A", 11.0), (3, "B", 21.0), (4, "A", 12.0))
+        ])
+
+        service._extend_portfolio_nav(1)
+
+        mock_etf_repo.get_nav_date.assert_called_once_with(1, 5, before=datetime(2024, 1, 3))
+        _, points, latest_prices, ingest_version, replace_from = mock_etf_repo.append_nav_points.call_args[0]
+        assert points == [(datetime(2024, 1, 3), 32.0), (datetime(2024, 1, 4), 33.0)]
+        assert (ingest_version, replace_from) == (2, datetime(2024, 1, 3))
+        assert latest_prices == {"A": 12.0, "B": 21.0}
+
+    def test_write_to_other_securities_only_records_the_version(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo,
+        portfolio
+    ):
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_date = Mock(return_value=datetime(2024, 1, 1))
+        mock_market_data_repo.get_price_history = Mock(return_value=[
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="AAPL", price=151.0)
+        ])
+
+        service._extend_portfolio_nav(1)
+
+        mock_etf_repo.append_nav_points.assert_called_once_with(portfolio, [], portfolio.latest_prices, 2)
+
+    @pytest.mark.asyncio
+    async def test_analysis_skips_price_scan_when_up_to_date(
+        self,
+        service,
+        mock_market_data_repo,
+        mock_etf_repo,
+        portfolio,
+        stored_nav
+    ):
+        """Test that a repeat view is served from the stored series alone"""
+        from src.modules.market_data.cache import MarketDataSnapshot
+
+        snapshot = MarketDataSnapshot(max_age=None)
+        snapshot.loaded = True
+        snapshot.latest_date = datetime(2024, 1, 2)
+        snapshot.ingest_version = 1
+        mock_etf_repo.get_portfolio = Mock(return_value=portfolio)
+        mock_etf_repo.get_nav_series = Mock(return_value=stored_nav)
+
+        with patch('src.modules.etf.service.market_snapshot', snapshot):
+            result = await service.get_portfolio_analysis(1)
+
+        mock_market_data_repo.get_price_history.assert_not_called()
+        mock_etf_repo.append_nav_points.assert_not_called()
+        assert result.latest_close == 226.0
+        assert {p.ticker: p.value for p in result.latest_prices} == {"AAPL": 75.5, "MSFT": 150.5}
+
+    @pytest.mark.asyncio
+    async def test_analysis_portfolio_not_found(self, service, mock_etf_repo):
+        """Test analysis of an unknown portfolio"""
+        mock_etf_repo.get_portfolio = Mock(return_value=None)
+
+        with pytest.raises(PortfolioNotFoundException):
+            await service.get_portfolio_analysis(404)
+
+
+class TestLatestQuotes:
+    """Test suite for latest prices in the analysis response"""
+
+    def test_reported_prices_come_from_latest_quotes(self):
+        records = [
+            SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p + d)
+            for d in (1, 2, 3) for t, p in (("AAPL", 150.0), ("MSFT", 300.0))
+        ]
+        with patch('src.modules.etf.service.MarketDataRepository'), \
+             patch('src.modules.etf.service.StorageService'), \
+             patch('src.modules.etf.service.EtfRepository'):
+            service = EtfService(Mock())
+
+        result = service._calculate_portfolio_math({"AAPL": 2.0, "MSFT": 1.0}, records, "t", latest_quotes={"AAPL": 160.0})
+        prices = {p.ticker: (p.price, p.value) for p in result.latest_prices}
+
+        # MSFT is not in latest_prices, so it falls back to the last row of the history.
+        assert prices == {"AAPL": (160.0, 320.0), "MSFT": (303.0, 303.0)}
+
+
+class TestCostLimiter:
+    """Test suite for charging an estimate up front and reconciling it"""
+
+    def test_reconcile_refunds_and_charges_the_difference(self):
+        from configs.limiter import CostLimiter
+        limiter = CostLimiter("100/hour", "test_reconcile")
+
+        assert limiter.hit("client", 80)
+        # The request loaded only 30 ticker-days, so 50 go back to the budget.
+        assert limiter.reconcile("client", 80, 30)
+        assert limiter.hit("client", 70)
+        # An underestimate is topped up and reported once it overruns the budget.
+        assert not limiter.reconcile("client", 0, 5)
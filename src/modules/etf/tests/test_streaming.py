@@ -0,0 +1,118 @@
+"""Unit tests for the live NAV feed of saved portfolios"""
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+from datetime import datetime
+
+from src.modules.etf import schemas
+from src.modules.etf.models import PortfolioNav
+from src.modules.etf.streaming import NavBroadcaster, nav_events
+
+
+@pytest.fixture
+def analysis():
+    """Full analysis sent to a new subscriber"""
+    return schemas.EtfAnalysisResponse(
+        etf_name="saved",
+        latest_close=226.0,
+        etf_time_series=[
+            schemas.TimeSeriesPoint(date="2024-01-01 00:00:00", nav=225.0),
+            schemas.TimeSeriesPoint(date="2024-01-02 00:00:00", nav=226.0),
+        ],
+        latest_prices=[]
+    )
+
+
+@pytest.fixture
+def broadcaster(analysis):
+    """Broadcaster with database access mocked out"""
+    broadcaster = NavBroadcaster(poll_interval=3600)
+    broadcaster._load_analysis = AsyncMock(return_value=analysis)
+    broadcaster._load_new_points = Mock(return_value=[
+        PortfolioNav(portfolio_id=1, date=datetime(2024, 1, 3), nav=227.0)
+    ])
+    return broadcaster
+
+
+class TestNavBroadcaster:
+    """Test suite for NavBroadcaster"""
+
+    @pytest.mark.asyncio
+    async def test_new_points_fan_out_to_all_subscribers(self, broadcaster):
+        """Test that one load of new points is shared by every subscriber of a portfolio"""
+        first, _ = await broadcaster.open(1)
+        second, _ = await broadcaster.open(1)
+
+        await broadcaster.publish_updates()
+
+        broadcaster._load_new_points.assert_called_once_with(1, datetime(2024, 1, 2))
+        assert first.get_nowait().nav == 227.0
+        assert second.get_nowait().nav == 227.0
+        assert broadcaster.feeds[1].last_date == datetime(2024, 1, 3)
+
+        broadcaster.unsubscribe(1, first)
+        broadcaster.unsubscribe(1, second)
+        assert broadcaster.feeds == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_closed(self, broadcaster):
+        """Test that a subscriber whose queue is full gets its stream closed"""
+        broadcaster.queue_size = 1
+        queue, _ = await broadcaster.open(1)
+        queue.put_nowait("unread")
+
+        await broadcaster.publish_updates()
+
+        assert queue.get_nowait() is None
+        assert 1 not in broadcaster.feeds
+
+    @pytest.mark.asyncio
+    async def test_update_during_open_is_not_a_full_history(self, broadcaster, analysis):
+        """Test that a price load observed while the series is loading sends only the points after it"""
+        broadcaster.queue_size = 2
+
+        async def load_analysis(portfolio_id):
+            await broadcaster.publish_updates()
+            return analysis
+        broadcaster._load_analysis = load_analysis
+
+        queue, _ = await broadcaster.open(1)
+
+        # Nothing is loaded for the opening feed until its last date is known, then it catches up.
+        broadcaster._load_new_points.assert_called_once_with(1, datetime(2024, 1, 2))
+        assert queue.get_nowait().nav == 227.0
+        assert queue.empty()
+        assert broadcaster.feeds[1].subscribers == {queue}
+        assert not broadcaster.feeds[1].missed_update
+
+    @pytest.mark.asyncio
+    async def test_open_unknown_portfolio_unsubscribes(self, broadcaster):
+        """Test that a failed initial load leaves no dangling subscription"""
+        broadcaster._load_analysis = AsyncMock(side_effect=ValueError("missing"))
+
+        with pytest.raises(ValueError):
+            await broadcaster.open(1)
+
+        assert broadcaster.feeds == {}
+
+
+class TestNavEvents:
+    """Test suite for the server-sent event stream"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_only_new_points(self, analysis):
+        """Test that the full series is sent once, followed by new points only"""
+        request = Mock()
+        request.is_disconnected = AsyncMock(return_value=False)
+        queue = asyncio.Queue()
+        queue.put_nowait(schemas.TimeSeriesPoint(date="2024-01-02 00:00:00", nav=226.0))
+        queue.put_nowait(schemas.TimeSeriesPoint(date="2024-01-03 00:00:00", nav=227.0))
+        queue.put_nowait(None)
+
+        events = [event async for event in nav_events(request, 1, queue, analysis)]
+
+        assert events[0].startswith("event: snapshot\n")
+        assert json.loads(events[0].split("data: ", 1)[1])["latest_close"] == 226.0
+        assert len(events) == 2
+        assert events[1] == 'event: nav\ndata: {"date": "2024-01-03 00:00:00", "nav": 227.0}\n\n'
@@ -0,0 +1,13 @@
+"""
+Health and readiness configuration settings
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Steps that must complete before /readyz reports ready, in order.
+WARMUP_STEPS = [s.strip() for s in os.getenv("WARMUP_STEPS", "db_pool,market_snapshot,compute").split(",") if s.strip()]
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "5"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
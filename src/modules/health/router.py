@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from configs.limiter import limiter
+from src.modules.health.service import HealthService
+from src.modules.health import schemas
+
+router = APIRouter(tags=["Health"])
+
+@router.get("/livez", response_model=schemas.LivenessResponse)
+@limiter.exempt
+async def livez(request: Request):
+    return {"status": "alive"}
+
+@router.get("/readyz", response_model=schemas.ReadinessResponse)
+@limiter.exempt
+async def readyz(request: Request):
+    service = HealthService()
+    report = service.readiness_report()
+    if not service.state.ready:
+        return JSONResponse(status_code=503, content=report.model_dump())
+    return report
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+class LivenessResponse(BaseModel):
+    status: str
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    capacity: int
+    saturation: float
+
+class CacheStatus(BaseModel):
+    generation: int
+    latest_date: Optional[str] = None
+
+class ReadinessResponse(BaseModel):
+    status: str
+    warmup: Dict[str, str]
+    pool: Optional[PoolStatus] = None
+    market_data_cache: CacheStatus
+    math_executor: Dict[str, int]
+    read_replicas: Optional[Dict[str, Any]] = None
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.pool import QueuePool
+
+from configs.db.postgresql import engine, SessionLocal
+from configs.admission import math_admission
+from configs.db.replicas import replica_router
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.cache import market_snapshot
+from src.modules.etf.service import EtfService
+from src.modules.health import schemas
+from src.modules.health.config import WARMUP_STEPS, WARMUP_POOL_CONNECTIONS, WARMUP_RETRY_SECONDS
+
+
+class ReadinessState:
+    """Tracks warmup progress; the service is ready once every configured step is done."""
+    def __init__(self, steps: list[str]):
+        self.steps: Dict[str, str] = {step: "pending" for step in steps}
+
+    @property
+    def ready(self) -> bool:
+        return all(status == "done" for status in self.steps.values())
+
+    def reset(self, steps: list[str]):
+        self.steps = {step: "pending" for step in steps}
+
+
+readiness = ReadinessState(WARMUP_STEPS)
+
+
+class HealthService:
+
+    def __init__(self, state: Optional[ReadinessState] = None):
+        self.state = state if state is not None else readiness
+        self.engine = engine
+
+    async def warmup(self):
+        steps = {
+            "db_pool": self._preconnect_pool,
+            "market_snapshot": self._load_market_snapshot,
+            "compute": self._exercise_compute,
+        }
+        for name in list(self.state.steps):
+            step = steps.get(name)
+            if step is None:
+                self.state.steps[name] = "failed: unknown warmup step"
+                continue
+            self.state.steps[name] = "running"
+            while True:
+                try:
+                    await asyncio.to_thread(step)
+                    self.state.steps[name] = "done"
+                    break
+                except Exception as e:
+                    self.state.steps[name] = f"retrying: {e}"
+                    await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+    def _preconnect_pool(self):
+        connections = [self.engine.connect() for _ in range(WARMUP_POOL_CONNECTIONS)]
+        try:
+            for connection in connections:
+                connection.exec_driver_sql("SELECT 1")
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def _load_market_snapshot(self):
+        db = SessionLocal()
+        try:
+            market_snapshot.refresh(MarketDataRepository(db))
+        finally:
+            db.close()
+
+    def _exercise_compute(self):
+        start = datetime(2000, 1, 3)
+        records = [
+            {'date': start + timedelta(days=d), 'ticker': t, 'price': 100.0 + d}
+            for d in range(30) for t in ("WARMUP_A", "WARMUP_B")
+        ]
+        db = SessionLocal()
+        try:
+            EtfService(db)._calculate_portfolio_math({"WARMUP_A": 0.5, "WARMUP_B": 0.5}, records, "warmup")
+        finally:
+            db.close()
+
+    def pool_status(self) -> Optional[schemas.PoolStatus]:
+        pool = self.engine.pool
+        # Only a queue pool has a bounded size; SingletonThreadPool and StaticPool do not.
+        if not isinstance(pool, QueuePool):
+            return None
+        size = pool.size()
+        capacity = size + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        return schemas.PoolStatus(
+            size=size,
+            checked_out=checked_out,
+            overflow=max(pool.overflow(), 0),
+            capacity=capacity,
+            saturation=round(checked_out / capacity, 4) if capacity else 0.0
+        )
+
+    def readiness_report(self) -> schemas.ReadinessResponse:
+        return schemas.ReadinessResponse(
+            status="ready" if self.state.ready else "warming_up",
+            warmup=dict(self.state.steps),
+            pool=self.pool_status(),
+            market_data_cache=schemas.CacheStatus(
+                generation=market_snapshot.generation,
+                latest_date=str(market_snapshot.latest_date) if market_snapshot.latest_date else None
+            ),
+            math_executor=math_admission.stats(),
+            read_replicas=replica_router.stats() if replica_router.enabled else None
+        )
@@ -0,0 +1,109 @@
+"""Unit tests for liveness/readiness endpoints and warmup"""
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
+
+from src.main import app
+from src.modules.health.service import HealthService, ReadinessState
+
+
+class TestHealthEndpoints:
+    """Test suite for GET /livez and GET /readyz"""
+
+    @pytest.fixture
+    def client(self):
+        """Test client for FastAPI app"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def state(self):
+        """Fresh readiness state patched into the router"""
+        state = ReadinessState(["db_pool", "market_snapshot", "compute"])
+        with patch('src.modules.health.service.readiness', state):
+            yield state
+
+    def test_livez(self, client):
+        """Test liveness probe always answers"""
+        response = client.get("/livez")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_probes_are_exempt_from_rate_limiting(self, client, state):
+        """Test that frequent probes never receive 429"""
+        for _ in range(40):
+            assert client.get("/livez").status_code == 200
+            assert client.get("/readyz").status_code in [200, 503]
+
+    def test_readyz_held_until_warmup_completes(self, client, state):
+        """Test readiness reports 503 while warmup is pending"""
+        state.steps["db_pool"] = "done"
+
+        with patch('src.modules.health.service.engine', create_engine("sqlite://", poolclass=QueuePool)):
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "warming_up"
+        assert data["warmup"]["market_snapshot"] == "pending"
+        assert "generation" in data["market_data_cache"]
+        assert data["pool"]["capacity"] > 0
+
+    @pytest.mark.parametrize("poolclass", [SingletonThreadPool, StaticPool])
+    def test_readyz_without_a_queue_pool(self, client, state, poolclass):
+        """Test that an engine without a sized pool reports no pool status instead of failing"""
+        with patch('src.modules.health.service.engine', create_engine("sqlite://", poolclass=poolclass)):
+            response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["pool"] is None
+
+    def test_readyz_ready_after_warmup(self, client, state):
+        """Test readiness reports 200 once every step is done"""
+        for step in state.steps:
+            state.steps[step] = "done"
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+
+class TestWarmup:
+    """Test suite for HealthService.warmup"""
+
+    @pytest.mark.asyncio
+    async def test_warmup_runs_steps_in_order(self):
+        """Test that warmup marks each configured step done"""
+        state = ReadinessState(["db_pool", "market_snapshot", "compute"])
+        service = HealthService(state)
+        calls = []
+        service._preconnect_pool = Mock(side_effect=lambda: calls.append("db_pool"))
+        service._load_market_snapshot = Mock(side_effect=lambda: calls.append("market_snapshot"))
+        service._exercise_compute = Mock(side_effect=lambda: calls.append("compute"))
+
+        await service.warmup()
+
+        assert calls == ["db_pool", "market_snapshot", "compute"]
+        assert state.ready
+
+    @pytest.mark.asyncio
+    async def test_warmup_retries_failed_step(self):
+        """Test that a failing step is retried rather than marking the service ready"""
+        state = ReadinessState(["db_pool"])
+        service = HealthService(state)
+        service._preconnect_pool = Mock(side_effect=[ConnectionError("db down"), None])
+
+        with patch('src.modules.health.service.WARMUP_RETRY_SECONDS', 0):
+            await service.warmup()
+
+        assert service._preconnect_pool.call_count == 2
+        assert state.ready
+
+    def test_exercise_compute(self):
+        """Test that the compute warmup runs the real portfolio math"""
+        with patch('src.modules.health.service.SessionLocal'), \
+             patch('src.modules.etf.service.StorageService'):
+            HealthService(ReadinessState([]))._exercise_compute()
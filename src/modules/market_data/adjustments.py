@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+ACTION_TYPES = ("split", "dividend")
+NAV_BASES = ("raw", "price_return", "total_return")
+
+
+class AdjustmentRecord(NamedTuple):
+    date: datetime
+    ticker: str
+    price_factor: float
+    total_factor: float
+
+
+def event_factors(split_ratio: float, dividend: float, previous_close: Optional[float]) -> Tuple[float, float]:
+    """
+    Multipliers of one ex-date: (split only, split and dividend). The dividend is reinvested
+    at the split-adjusted previous close; without a usable close it is left out.
+    """
+    total = split_ratio
+    if dividend and previous_close:
+        close = previous_close / split_ratio
+        if close > dividend:
+            total *= close / (close - dividend)
+    return split_ratio, total
+
+
+def cumulative_factors(
+    events: Sequence[Tuple[datetime, float, float, Optional[float]]],
+    base: Tuple[float, float] = (1.0, 1.0)
+) -> List[Tuple[datetime, float, float]]:
+    """
+    (ex_date, price_factor, total_factor) rows from ex-date ordered (ex_date, split ratio,
+    dividend, previous close) events, continuing from the factors in force before the first one.
+    """
+    price, total = base
+    rows = []
+    for ex_date, split_ratio, dividend, previous_close in events:
+        split_step, total_step = event_factors(split_ratio, dividend, previous_close)
+        price *= split_step
+        total *= total_step
+        rows.append((ex_date, price, total))
+    return rows
+
+
+def factor_matrix(records: Iterable[AdjustmentRecord], index: pd.Index, columns: Sequence[str], basis: str) -> np.ndarray:
+    """
+    (dates x tickers) factors for a price panel, normalized to 1 on its last date: the latest
+    prices stay as quoted and earlier ones are restated in today's terms.
+    """
+    if basis not in NAV_BASES:
+        raise ValueError(f"NAV basis must be one of: {', '.join(NAV_BASES)}")
+    factors = np.ones((len(index), len(columns)))
+    if basis == "raw" or not len(index):
+        return factors
+
+    column = "price_factor" if basis == "price_return" else "total_factor"
+    frame = pd.DataFrame(
+        [(r.date, r.ticker, getattr(r, column)) for r in records],
+        columns=["date", "ticker", "factor"]
+    )
+    if frame.empty:
+        return factors
+    steps = frame.pivot(index="date", columns="ticker", values="factor").reindex(columns=list(columns))
+    # Factor in force on each panel date: the last step on or before it; 1 before the first one.
+    in_force = steps.reindex(steps.index.union(index)).ffill().reindex(index).fillna(1.0).to_numpy()
+    return in_force / in_force[-1]
@@ -0,0 +1,84 @@
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.modules.market_data.config import SNAPSHOT_MAX_AGE_SECONDS
+from src.modules.market_data.repository import MarketDataRepository
+
+
+class MarketDataSnapshot:
+    """
+    Process-wide snapshot of the most recent trading day, the length of the stored calendar
+    and every ticker's latest quote.
+    `generation` is bumped every time a refresh observes new market data (any price write,
+    corporate actions or FX rates), so
+    anything derived from prices can be keyed on it and invalidated cheaply.
+    """
+    def __init__(self, max_age: Optional[float] = SNAPSHOT_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self.checked_at = float("-inf")
+        self.latest_date: Optional[datetime] = None
+        self.ingest_version: Optional[int] = None
+        self.latest_prices: Dict[str, float] = {}
+        self.trading_days = 0
+        self.adjustments_version: Optional[datetime] = None
+        self.fx_date: Optional[datetime] = None
+        self.generation = 0
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def refresh(self, repo: MarketDataRepository) -> bool:
+        """Reload from the database. Returns True when new market data was observed."""
+        with self._lock:
+            self.checked_at = time.monotonic()
+        latest_date = repo.get_latest_market_date()
+        ingest_version = repo.get_ingest_version()
+        adjustments_version = repo.get_adjustments_version()
+        fx_date = repo.get_latest_fx_date()
+        with self._lock:
+            if (
+                self.loaded
+                and latest_date == self.latest_date
+                and ingest_version == self.ingest_version
+                and adjustments_version == self.adjustments_version
+                and fx_date == self.fx_date
+            ):
+                return False
+
+        records = repo.get_all_latest_prices() if latest_date else []
+        trading_days = business_days(repo.get_first_market_date(), latest_date) if latest_date else 0
+        with self._lock:
+            self.latest_date = latest_date
+            self.ingest_version = ingest_version
+            self.trading_days = trading_days
+            self.latest_prices = {r.ticker: r.price for r in records}
+            self.adjustments_version = adjustments_version
+            self.fx_date = fx_date
+            self.generation += 1
+            self.loaded = True
+        return True
+
+    def refresh_if_stale(self, repo: MarketDataRepository) -> bool:
+        """
+        refresh() unless another caller checked within `max_age` seconds. Called on the request
+        path, so caches and ETags keyed on `generation` never lag an ingest by more than that.
+        `max_age` None leaves refreshing to the background tasks.
+        """
+        with self._lock:
+            if self.max_age is None or time.monotonic() - self.checked_at < self.max_age:
+                return False
+            self.checked_at = time.monotonic()
+        return self.refresh(repo)
+
+    def version(self) -> tuple:
+        return (self.latest_date, self.generation)
+
+
+def business_days(first: datetime, last: datetime) -> int:
+    """Weekdays from `first` to `last` inclusive; at least the trading days between them."""
+    return int(np.busday_count(first.date(), last.date())) + 1
+
+
+market_snapshot = MarketDataSnapshot()
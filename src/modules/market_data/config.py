@@ -0,0 +1,29 @@
+"""
+Market data configuration settings
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Requests re-check the market-data snapshot (latest price date, adjustments, FX) when their
+# last check is older than this, so an ingest by another process shows within that bound.
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "2"))
+
+LATEST_MAX_TICKERS = 500
+LATEST_CACHE_CONTROL = "public, max-age=60"
+
+# Price history export
+HISTORY_MAX_TICKERS = 1000
+HISTORY_BATCH_ROWS = 10000 # rows per server-side cursor fetch and per streamed chunk
+# Rows per price upsert statement (three bind parameters each)
+PRICE_WRITE_BATCH_ROWS = 10000
+
+# Ticker-set queries: above this many ids PostgreSQL gets one array parameter (`= ANY(:ids)`)
+# instead of one bind parameter per id; other dialects get IN lists of at most IN_LIST_MAX_IDS.
+PRICE_HISTORY_ARRAY_THRESHOLD = int(os.getenv("PRICE_HISTORY_ARRAY_THRESHOLD", "100"))
+IN_LIST_MAX_IDS = 900
+# Ticker sets of at least PRICE_HISTORY_FAN_OUT_MIN_TICKERS are split into this many shards,
+# each read on its own pooled connection in parallel. 1 disables the fan-out.
+PRICE_HISTORY_FAN_OUT = int(os.getenv("PRICE_HISTORY_FAN_OUT", "1"))
+PRICE_HISTORY_FAN_OUT_MIN_TICKERS = int(os.getenv("PRICE_HISTORY_FAN_OUT_MIN_TICKERS", "1000"))
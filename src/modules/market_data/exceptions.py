@@ -0,0 +1,13 @@
+from fastapi import HTTPException
+
+class InvalidTickersException(HTTPException):
+    """Raised when the requested ticker list is empty or too long"""
+    def __init__(self, detail: str = "Provide between 1 and 500 tickers"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_TICKERS"
+
+class InvalidExportRequestException(HTTPException):
+    """Raised when a history export request cannot be served"""
+    def __init__(self, detail: str = "Invalid export request"):
+        super().__init__(status_code=400, detail=detail)
+        self.error_code = "INVALID_EXPORT"
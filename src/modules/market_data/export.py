@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List
+
+from src.modules.market_data.repository import PriceRecord
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional dependency
+    pyarrow = None
+
+# Format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+def available_formats() -> List[str]:
+    return [f for f in EXPORT_FORMATS if f != "arrow" or pyarrow is not None]
+
+
+def _day(record: PriceRecord) -> str:
+    return record.date.date().isoformat()
+
+
+def encode_ndjson(batches: Iterable[List[PriceRecord]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps({"ticker": r.ticker, "date": _day(r), "price": r.price}) + "\n"
+            for r in batch
+        ).encode("utf-8")
+
+
+def encode_csv(batches: Iterable[List[PriceRecord]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["ticker", "date", "price"])
+    yield buffer.getvalue().encode("utf-8")
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((r.ticker, _day(r), repr(r.price)) for r in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_arrow(batches: Iterable[List[PriceRecord]]) -> Iterator[bytes]:
+    """Arrow IPC stream: one record batch per database batch."""
+    schema = pyarrow.schema([
+        ("ticker", pyarrow.string()),
+        ("date", pyarrow.date32()),
+        ("price", pyarrow.float64()),
+    ])
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(pyarrow.record_batch([
+                pyarrow.array([r.ticker for r in batch], pyarrow.string()),
+                pyarrow.array([r.date.date() for r in batch], pyarrow.date32()),
+                pyarrow.array([r.price for r in batch], pyarrow.float64()),
+            ], schema=schema))
+            yield drain()
+    yield drain()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "arrow": encode_arrow}
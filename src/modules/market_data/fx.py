@@ -0,0 +1,66 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+# Currency the fx_rates table is quoted against; its rate is 1 by definition.
+RATE_CURRENCY = "USD"
+
+
+class FxRecord(NamedTuple):
+    date: datetime
+    currency: str
+    usd_rate: float
+
+
+def fx_frame(records: Iterable[FxRecord]) -> pd.DataFrame:
+    """(dates x currencies) USD rates."""
+    frame = pd.DataFrame(list(records), columns=["date", "currency", "usd_rate"])
+    return frame.pivot(index="date", columns="currency", values="usd_rate").sort_index()
+
+
+def conversion_matrix(fx: pd.DataFrame, index: pd.Index, currencies: Sequence[str], base: str) -> np.ndarray:
+    """
+    (dates x tickers) multipliers from each ticker's currency (`currencies`, one per column)
+    into `base`, using the latest rate on or before each date (as-of). Dates before a
+    currency's first rate get NaN, so those prices count as missing.
+    """
+    if all(c == base for c in currencies):
+        return np.ones((len(index), len(currencies)))
+
+    needed = sorted(set(currencies).union([base]) - {RATE_CURRENCY})
+    missing = [c for c in needed if c not in fx.columns]
+    if missing:
+        raise ValueError(f"No FX rates for {', '.join(missing)}")
+
+    as_of = fx[needed].reindex(fx.index.union(index)).ffill().reindex(index)
+    as_of[RATE_CURRENCY] = 1.0
+    usd = as_of.to_numpy(dtype=float)
+    position = {c: i for i, c in enumerate(as_of.columns)}
+    return usd[:, [position[c] for c in currencies]] / usd[:, [position[base]]]
+
+
+class FxMatrixCache:
+    """
+    Every FX rate as one (dates x currencies) frame, loaded once per market-data generation
+    and shared by all requests; conversions only reindex it.
+    """
+    def __init__(self):
+        self.frame: Optional[pd.DataFrame] = None
+        self.generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, repo, generation: Optional[int]) -> pd.DataFrame:
+        """`generation` None (snapshot not loaded yet) bypasses the cache."""
+        with self._lock:
+            if generation is not None and generation == self.generation:
+                return self.frame
+        frame = fx_frame(repo.get_fx_rates())
+        if generation is not None:
+            with self._lock:
+                self.frame, self.generation = frame, generation
+        return frame
+
+
+fx_matrix = FxMatrixCache()
@@ -1,14 +1,89 @@
-from sqlalchemy import Column, String, Float, DateTime, Index, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint, func, text
 from configs.db.postgresql import Base
 
+class Security(Base):
+    __tablename__ = "securities"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String, nullable=False, unique=True)
+    currency = Column(String(3), nullable=False, server_default="USD") # ISO 4217 code prices are quoted in
+
+
 class SecurityPrice(Base):
     __tablename__ = "security_prices"
 
-    date = Column(DateTime, primary_key=True, nullable=False, index=True)
-    ticker = Column(String, primary_key=True, nullable=False, index=True)
+    date = Column(DateTime, primary_key=True, nullable=False)
+    security_id = Column(Integer, ForeignKey("securities.id"), primary_key=True, nullable=False)
     price = Column(Float, nullable=False)
+
+    # Not stored: resolved from security_id through the in-memory id map.
+    ticker = None
     
-    
     __table_args__ = (
-        Index('idx_ticker_date', 'ticker', text('date DESC')),
-    )
\ No newline at end of file
+        Index('idx_security_date', 'security_id', text('date DESC')),
+    )
+
+
+class LatestPrice(Base):
+    """Most recent quote of each security, maintained by the ingestion path."""
+    __tablename__ = "latest_prices"
+
+    security_id = Column(Integer, ForeignKey("securities.id"), primary_key=True)
+    date = Column(DateTime, nullable=False)
+    price = Column(Float, nullable=False)
+
+
+class CorporateAction(Base):
+    """A split (`value` = new shares per old share) or cash dividend (`value` = amount per share)."""
+    __tablename__ = "corporate_actions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    security_id = Column(Integer, ForeignKey("securities.id"), nullable=False)
+    ex_date = Column(DateTime, nullable=False)
+    action_type = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    recorded_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Not stored: resolved from security_id through the in-memory id map.
+    ticker = None
+
+    __table_args__ = (
+        UniqueConstraint('security_id', 'ex_date', 'action_type', name='uq_corporate_action'),
+    )
+
+
+class AdjustmentFactor(Base):
+    """
+    Cumulative adjustment factors of a security from `date` (an ex-date) until its next row,
+    maintained by the corporate action ingestion path. Raw price times factor is continuous
+    across splits (`price_factor`) or across splits and reinvested dividends (`total_factor`).
+    """
+    __tablename__ = "adjustment_factors"
+
+    security_id = Column(Integer, ForeignKey("securities.id"), primary_key=True)
+    date = Column(DateTime, primary_key=True)
+    price_factor = Column(Float, nullable=False)
+    total_factor = Column(Float, nullable=False)
+
+
+class FxRate(Base):
+    """Value of one unit of `currency` in USD at the close of `date`."""
+    __tablename__ = "fx_rates"
+
+    date = Column(DateTime, primary_key=True, nullable=False)
+    currency = Column(String(3), primary_key=True, nullable=False)
+    usd_rate = Column(Float, nullable=False)
+
+
+class PriceIngest(Base):
+    """
+    One row per committed price write, in the same transaction. The newest id changes on every
+    ingest, including backfills and same-date corrections the latest date does not reveal.
+    """
+    __tablename__ = "price_ingests"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    first_date = Column(DateTime, nullable=False) # earliest price date the write touched
+    last_date = Column(DateTime, nullable=False)
+    rows = Column(Integer, nullable=False)
+    ingested_at = Column(DateTime, nullable=False, server_default=func.now())
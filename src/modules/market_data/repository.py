@@ -1,52 +1,436 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from src.modules.market_data.models import SecurityPrice
+from sqlalchemy import Integer, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate, PriceIngest
+from src.modules.market_data.adjustments import ACTION_TYPES, AdjustmentRecord, cumulative_factors
+from src.modules.market_data.fx import FxRecord
+from src.modules.market_data.securities import security_ids
+from src.modules.market_data.config import (
+    PRICE_HISTORY_ARRAY_THRESHOLD,
+    IN_LIST_MAX_IDS,
+    PRICE_HISTORY_FAN_OUT,
+    PRICE_HISTORY_FAN_OUT_MIN_TICKERS,
+    PRICE_WRITE_BATCH_ROWS
+)
+from configs.db.replicas import replica_router
+
+
+class PriceRecord(NamedTuple):
+    date: datetime
+    ticker: str
+    price: float
+
 
 class MarketDataRepository:
+    """Reads go to a read replica when replicas are configured; writes always use `db`."""
     def __init__(self, db: Session):
         self.db = db
 
-    def get_price_history(self, tickers: list[str]) -> List[SecurityPrice]:
-        
+    @contextmanager
+    def _reader(self):
+        if not replica_router.enabled:
+            yield self.db
+            return
+        with replica_router.read_session() as session:
+            yield session
+
+    def get_price_history(
+        self,
+        tickers: list[str],
+        after: Optional[datetime] = None,
+        fan_out: int = PRICE_HISTORY_FAN_OUT
+    ) -> List[PriceRecord]:
+        """
+        Large ticker sets are bound as a single array on PostgreSQL and, with `fan_out` > 1,
+        split into shards read in parallel on separate pooled connections.
+        """
         if not tickers:
             return []
-        
-        
-        return self.db.query(SecurityPrice)\
-            .filter(SecurityPrice.ticker.in_(tickers))\
-            .all()
+
+        with self._reader() as db:
+            ids = security_ids.ids_for(db, tickers)
+            if not ids:
+                return []
+
+            shards = self._shards(ids, fan_out)
+            if len(shards) > 1:
+                rows = self._fan_out(db, shards, after)
+            else:
+                rows = self._history_rows(db, ids, after)
+            return self._to_records(db, rows)
+
+    def _history_rows(self, db: Session, ids: List[int], after: Optional[datetime]) -> list:
+        rows = []
+        for id_filter in self._id_filters(db, SecurityPrice.security_id, ids):
+            query = db.query(SecurityPrice.date, SecurityPrice.security_id, SecurityPrice.price)\
+                .filter(id_filter)
+            if after is not None:
+                query = query.filter(SecurityPrice.date > after)
+            rows += query.all()
+        return rows
+
+    def _fan_out(self, db: Session, shards: List[List[int]], after: Optional[datetime]) -> list:
+        # Shards run on connections of their own, so they see committed data only; rows are merged in shard order.
+        engine = db.get_bind()
+
+        def read(shard):
+            with Session(bind=engine, autoflush=False) as session:
+                return self._history_rows(session, shard, after)
+
+        with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="price-shard") as pool:
+            return [row for rows in pool.map(read, shards) for row in rows]
+
+    @staticmethod
+    def _shards(ids: List[int], fan_out: int) -> List[List[int]]:
+        if fan_out <= 1 or len(ids) < PRICE_HISTORY_FAN_OUT_MIN_TICKERS:
+            return [ids]
+        size = -(-len(ids) // fan_out)
+        return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+    @staticmethod
+    def _id_filters(db: Session, column, ids: List[int]) -> list:
+        """
+        WHERE clauses covering `ids`: one `= ANY(array)` on PostgreSQL above the threshold
+        (a single bind parameter, so statement size and planning time stay flat), otherwise
+        IN lists short enough for the dialect's bind parameter limit.
+        """
+        if len(ids) > PRICE_HISTORY_ARRAY_THRESHOLD and db.get_bind().dialect.name == "postgresql":
+            return [column == any_(bindparam("security_ids", ids, type_=ARRAY(Integer)))]
+        return [column.in_(ids[i:i + IN_LIST_MAX_IDS]) for i in range(0, len(ids), IN_LIST_MAX_IDS)]
     
-    def get_latest_price(self, ticker: str) -> Optional[SecurityPrice]:
-        return self.db.query(SecurityPrice)\
-            .filter(SecurityPrice.ticker == ticker)\
-            .order_by(desc(SecurityPrice.date))\
-            .first()
+    def stream_price_history(
+        self,
+        tickers: list[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[str, datetime]] = None,
+        batch_size: int = 10000
+    ) -> Iterator[List[PriceRecord]]:
+        """
+        Prices ordered by (ticker, date), in batches read through a server-side cursor, so
+        memory stays at one batch however long the history. `after` is the (ticker, date) of
+        the last row already received; `start` is inclusive and `end` exclusive.
+        Each ticker is one range scan of idx_security_date.
+        """
+        with self._reader() as db:
+            security_ids.ids_for(db, tickers)
+            known = security_ids.ids
+            for ticker in sorted(set(tickers)):
+                if ticker not in known or (after is not None and ticker < after[0]):
+                    continue
+
+                query = select(SecurityPrice.date, SecurityPrice.price)\
+                    .where(SecurityPrice.security_id == known[ticker])
+                if after is not None and ticker == after[0]:
+                    query = query.where(SecurityPrice.date > after[1])
+                if start is not None:
+                    query = query.where(SecurityPrice.date >= start)
+                if end is not None:
+                    query = query.where(SecurityPrice.date < end)
+
+                result = db.execute(
+                    query.order_by(SecurityPrice.date).execution_options(stream_results=True, yield_per=batch_size)
+                )
+                try:
+                    for rows in result.partitions():
+                        yield [PriceRecord(date, ticker, price) for date, price in rows]
+                finally:
+                    result.close()
+
+    def get_latest_market_date(self) -> Optional[datetime]:
+        with self._reader() as db:
+            return db.query(func.max(SecurityPrice.date)).scalar()
+
+    def get_ingest_version(self) -> Optional[int]:
+        """Id of the newest price write; changes on every ingest."""
+        with self._reader() as db:
+            return db.query(func.max(PriceIngest.id)).scalar()
+
+    def get_earliest_ingested_date(self, after_version: Optional[int]) -> Optional[datetime]:
+        """Earliest price date touched by the writes newer than `after_version` (all writes for None)."""
+        with self._reader() as db:
+            query = db.query(func.min(PriceIngest.first_date))
+            if after_version is not None:
+                query = query.filter(PriceIngest.id > after_version)
+            return query.scalar()
+
+    def get_first_market_date(self) -> Optional[datetime]:
+        with self._reader() as db:
+            return db.query(func.min(SecurityPrice.date)).scalar()
+
+    def get_prices_on(self, date: datetime) -> List[PriceRecord]:
+        with self._reader() as db:
+            rows = db.query(SecurityPrice.date, SecurityPrice.security_id, SecurityPrice.price)\
+                .filter(SecurityPrice.date == date)\
+                .all()
+            return self._to_records(db, rows)
+
+    def get_latest_price(self, ticker: str) -> Optional[PriceRecord]:
+        records = self.get_latest_prices([ticker])
+        return records[0] if records else None
     
-    def get_latest_prices(self, tickers: list[str]) -> List[SecurityPrice]:
+    def get_latest_prices(self, tickers: list[str]) -> List[PriceRecord]:
+        """Primary-key lookups in latest_prices; no scan of the price history."""
         if not tickers:
             return []
-        
-       
-        subquery = self.db.query(
-            SecurityPrice.ticker,
-            func.max(SecurityPrice.date).label('max_date')
-        ).filter(
-            SecurityPrice.ticker.in_(tickers)
-        ).group_by(SecurityPrice.ticker).subquery()
-        
-        return self.db.query(SecurityPrice)\
-            .join(
-                subquery,
-                (SecurityPrice.ticker == subquery.c.ticker) & 
-                (SecurityPrice.date == subquery.c.max_date)
-            ).all()
 
-    
+        with self._reader() as db:
+            ids = security_ids.ids_for(db, tickers)
+            if not ids:
+                return []
+
+            rows = []
+            for id_filter in self._id_filters(db, LatestPrice.security_id, ids):
+                rows += db.query(LatestPrice.date, LatestPrice.security_id, LatestPrice.price)\
+                    .filter(id_filter)\
+                    .all()
+            return self._to_records(db, rows)
+
+    def get_all_latest_prices(self) -> List[PriceRecord]:
+        with self._reader() as db:
+            rows = db.query(LatestPrice.date, LatestPrice.security_id, LatestPrice.price).all()
+            return self._to_records(db, rows)
+
     def bulk_save_prices(self, prices: List[SecurityPrice]):
+        """
+        Upserts the quotes: a quote for a date already stored replaces it (a correction).
+        Every write is logged in price_ingests, so readers notice it even when the latest
+        date does not move.
+        """
+        if not prices:
+            return
         try:
-            self.db.bulk_save_objects(prices)
+            ids = security_ids.ensure(self.db, {p.ticker for p in prices if p.security_id is None})
+            for p in prices:
+                if p.security_id is None:
+                    p.security_id = ids[p.ticker]
+            self._upsert_prices(prices)
+            self._upsert_latest(prices)
+            self.db.add(PriceIngest(
+                first_date=min(p.date for p in prices),
+                last_date=max(p.date for p in prices),
+                rows=len(prices)
+            ))
+            self._refresh_pending_dividends(prices)
             self.db.commit()
+            # Replicas may not have the new prices yet.
+            replica_router.pin_primary()
         except Exception as e:
             self.db.rollback()
-            raise e
\ No newline at end of file
+            # Ids created in the rolled back transaction must not stay in the map.
+            security_ids.reset()
+            raise e
+
+    def get_adjustment_factors(self, tickers: list[str]) -> List[AdjustmentRecord]:
+        if not tickers:
+            return []
+
+        with self._reader() as db:
+            ids = security_ids.ids_for(db, tickers)
+            rows = []
+            for id_filter in self._id_filters(db, AdjustmentFactor.security_id, ids) if ids else []:
+                rows += db.query(
+                    AdjustmentFactor.date,
+                    AdjustmentFactor.security_id,
+                    AdjustmentFactor.price_factor,
+                    AdjustmentFactor.total_factor
+                ).filter(id_filter).all()
+            tickers_by_id = security_ids.tickers
+            return [
+                AdjustmentRecord(date, tickers_by_id.get(security_id) or security_ids.ticker_of(db, security_id), price, total)
+                for date, security_id, price, total in rows
+            ]
+
+    def get_adjustments_version(self) -> Optional[datetime]:
+        """Time of the most recent corporate action write; changes whenever adjustment factors may have."""
+        with self._reader() as db:
+            return db.query(func.max(CorporateAction.recorded_at)).scalar()
+
+    def get_currencies(self, tickers: list[str]) -> Dict[str, str]:
+        """Quote currency of each known ticker."""
+        with self._reader() as db:
+            security_ids.ids_for(db, tickers)
+            currencies = security_ids.currencies
+            return {t: currencies[t] for t in tickers if t in currencies}
+
+    def get_fx_rates(self) -> List[FxRecord]:
+        with self._reader() as db:
+            rows = db.query(FxRate.date, FxRate.currency, FxRate.usd_rate).all()
+            return [FxRecord(date, currency, rate) for date, currency, rate in rows]
+
+    def get_latest_fx_date(self) -> Optional[datetime]:
+        with self._reader() as db:
+            return db.query(func.max(FxRate.date)).scalar()
+
+    def save_fx_rates(self, rates: List[FxRate]):
+        """Upserts rates; a rate loaded again for the same date and currency replaces the old one."""
+        if not rates:
+            return
+        try:
+            rows = {(r.date, r.currency.upper()): r.usd_rate for r in rates}
+            insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+            statement = insert(FxRate).values([
+                {"date": date, "currency": currency, "usd_rate": rate}
+                for (date, currency), rate in rows.items()
+            ])
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[FxRate.date, FxRate.currency],
+                set_={"usd_rate": statement.excluded.usd_rate}
+            ))
+            self.db.commit()
+            replica_router.pin_primary()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def set_currencies(self, currencies: Dict[str, str]):
+        """Sets the quote currency of tickers, creating securities that do not exist yet."""
+        try:
+            ids = security_ids.ensure(self.db, currencies)
+            for ticker, currency in currencies.items():
+                self.db.query(Security).filter(Security.id == ids[ticker]).update({"currency": currency.upper()})
+            self.db.commit()
+            security_ids.load(self.db)
+            replica_router.pin_primary()
+        except Exception as e:
+            self.db.rollback()
+            security_ids.reset()
+            raise e
+
+    def save_corporate_actions(self, actions: List[CorporateAction]):
+        """
+        Upserts the events, then rebuilds each affected security's adjustment factors from its
+        earliest changed ex-date onwards; factors before it are kept as they are.
+        """
+        try:
+            ids = security_ids.ensure(self.db, {a.ticker for a in actions if a.security_id is None})
+            rows = {}
+            for a in actions:
+                if a.action_type not in ACTION_TYPES:
+                    raise ValueError(f"Action type must be one of: {', '.join(ACTION_TYPES)}")
+                security_id = a.security_id if a.security_id is not None else ids[a.ticker]
+                # The last of duplicate events in a batch wins, as a later batch would.
+                rows[(security_id, a.ex_date, a.action_type)] = a.value
+            if not rows:
+                return
+
+            insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+            statement = insert(CorporateAction).values([
+                {"security_id": security_id, "ex_date": ex_date, "action_type": action_type, "value": value}
+                for (security_id, ex_date, action_type), value in rows.items()
+            ])
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[CorporateAction.security_id, CorporateAction.ex_date, CorporateAction.action_type],
+                set_={"value": statement.excluded.value, "recorded_at": func.now()}
+            ))
+
+            earliest = {}
+            for security_id, ex_date, _ in rows:
+                earliest[security_id] = min(earliest.get(security_id, ex_date), ex_date)
+            for security_id, since in earliest.items():
+                self._rebuild_factors(security_id, since)
+            self.db.commit()
+            replica_router.pin_primary()
+        except Exception as e:
+            self.db.rollback()
+            security_ids.reset()
+            raise e
+
+    def _rebuild_factors(self, security_id: int, since: datetime):
+        base = self.db.query(AdjustmentFactor.price_factor, AdjustmentFactor.total_factor)\
+            .filter(AdjustmentFactor.security_id == security_id, AdjustmentFactor.date < since)\
+            .order_by(AdjustmentFactor.date.desc())\
+            .first()
+        events = self.db.query(CorporateAction.ex_date, CorporateAction.action_type, CorporateAction.value)\
+            .filter(CorporateAction.security_id == security_id, CorporateAction.ex_date >= since)\
+            .order_by(CorporateAction.ex_date)\
+            .all()
+
+        by_date = {}
+        for ex_date, action_type, value in events:
+            split_ratio, dividend = by_date.get(ex_date, (1.0, 0.0))
+            if action_type == "split":
+                split_ratio *= value
+            else:
+                dividend += value
+            by_date[ex_date] = (split_ratio, dividend)
+
+        steps = [
+            (ex_date, split_ratio, dividend, self._close_before(security_id, ex_date) if dividend else None)
+            for ex_date, (split_ratio, dividend) in by_date.items()
+        ]
+        self.db.query(AdjustmentFactor)\
+            .filter(AdjustmentFactor.security_id == security_id, AdjustmentFactor.date >= since)\
+            .delete(synchronize_session=False)
+        self.db.add_all([
+            AdjustmentFactor(security_id=security_id, date=date, price_factor=price, total_factor=total)
+            for date, price, total in cumulative_factors(steps, tuple(base) if base else (1.0, 1.0))
+        ])
+
+    def _close_before(self, security_id: int, date: datetime) -> Optional[float]:
+        return self.db.query(SecurityPrice.price)\
+            .filter(SecurityPrice.security_id == security_id, SecurityPrice.date < date)\
+            .order_by(SecurityPrice.date.desc())\
+            .limit(1)\
+            .scalar()
+
+    def _refresh_pending_dividends(self, prices: List[SecurityPrice]):
+        """Dividend factors depend on the close before the ex-date, which may arrive after the dividend."""
+        if not prices:
+            return
+        ingested = {p.security_id for p in prices}
+        pending = self.db.query(CorporateAction.security_id, func.min(CorporateAction.ex_date))\
+            .filter(CorporateAction.action_type == "dividend", CorporateAction.ex_date > min(p.date for p in prices))\
+            .group_by(CorporateAction.security_id)\
+            .all()
+        for security_id, since in pending:
+            if security_id in ingested:
+                self._rebuild_factors(security_id, since)
+
+    def _upsert_prices(self, prices: List[SecurityPrice]):
+        # The last of duplicate quotes in a batch wins, as a later batch would.
+        rows = list({(p.date, p.security_id): p.price for p in prices}.items())
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        for start in range(0, len(rows), PRICE_WRITE_BATCH_ROWS):
+            statement = insert(SecurityPrice).values([
+                {"date": date, "security_id": security_id, "price": price}
+                for (date, security_id), price in rows[start:start + PRICE_WRITE_BATCH_ROWS]
+            ])
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[SecurityPrice.date, SecurityPrice.security_id],
+                set_={"price": statement.excluded.price}
+            ))
+
+    def _upsert_latest(self, prices: List[SecurityPrice]):
+        """Moves latest_prices forward to the newest quote of each security in the batch."""
+        newest = {}
+        for p in prices:
+            current = newest.get(p.security_id)
+            if current is None or p.date >= current.date:
+                newest[p.security_id] = p
+        if not newest:
+            return
+
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(LatestPrice).values([
+            {"security_id": p.security_id, "date": p.date, "price": p.price}
+            for p in newest.values()
+        ])
+        # An older batch (backfill) never replaces a newer quote.
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[LatestPrice.security_id],
+            set_={"date": statement.excluded.date, "price": statement.excluded.price},
+            where=LatestPrice.date <= statement.excluded.date
+        ))
+
+    def _to_records(self, db: Session, rows) -> List[PriceRecord]:
+        tickers = security_ids.tickers
+        return [
+            PriceRecord(date, tickers.get(security_id) or security_ids.ticker_of(db, security_id), price)
+            for date, security_id, price in rows
+        ]
@@ -0,0 +1,55 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from configs.db.postgresql import get_db
+from src.modules.market_data.service import MarketDataService
+from src.modules.market_data.config import LATEST_CACHE_CONTROL
+from src.modules.market_data.export import EXPORT_FORMATS
+from src.modules.market_data import schemas
+
+router = APIRouter(prefix="/market-data", tags=["Market Data"])
+
+@router.get("/latest", response_model=schemas.LatestPricesResponse)
+async def get_latest_prices(
+    request: Request,
+    response: Response,
+    tickers: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT"),
+    db: Session = Depends(get_db)
+):
+    service = MarketDataService(db)
+    response.headers["Cache-Control"] = LATEST_CACHE_CONTROL
+
+    return await service.get_latest(tickers.split(","))
+
+
+@router.get("/history")
+async def export_history(
+    request: Request,
+    tickers: str = Query(..., description="Comma-separated tickers"),
+    start: Optional[date] = Query(None, description="First day, inclusive"),
+    end: Optional[date] = Query(None, description="Last day, inclusive"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|arrow)$"),
+    after_ticker: Optional[str] = Query(None, description="Ticker of the last row already received"),
+    after_date: Optional[date] = Query(None, description="Date of the last row already received"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many rows"),
+    db: Session = Depends(get_db)
+):
+    service = MarketDataService(db)
+    stream = service.export_history(
+        tickers.split(","),
+        format,
+        start=start,
+        end=end,
+        after_ticker=after_ticker,
+        after_date=after_date,
+        limit=limit
+    )
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="price-history.{extension}"'}
+    )
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+
+class LatestQuote(BaseModel):
+    ticker: str
+    date: datetime
+    price: float
+
+class LatestPricesResponse(BaseModel):
+    prices: List[LatestQuote]
+    # Requested tickers with no price data
+    missing: List[str]
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from src.modules.market_data.models import Security
+
+# Minimum time between reloads triggered by tickers missing from the map.
+RELOAD_INTERVAL_SECONDS = 30
+
+
+class SecurityIdMap:
+    """
+    Process-wide ticker <-> security id dictionary, with each ticker's quote currency.
+    Loaded once from the securities table and reloaded when an unknown ticker is
+    requested (throttled, so lookups of tickers that do not exist stay cheap).
+    """
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.tickers: Dict[int, str] = {}
+        self.currencies: Dict[str, str] = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        rows = db.query(Security.id, Security.ticker, Security.currency).all()
+        with self._lock:
+            self.ids = {ticker: security_id for security_id, ticker, _ in rows}
+            self.tickers = {security_id: ticker for security_id, ticker, _ in rows}
+            self.currencies = {ticker: currency for _, ticker, currency in rows}
+            self._loaded_at = time.monotonic()
+
+    def ids_for(self, db: Session, tickers: Iterable[str]) -> List[int]:
+        """Ids of the known tickers; unknown tickers are skipped."""
+        tickers = list(tickers)
+        if self._needs_reload(tickers):
+            self.load(db)
+        ids = self.ids
+        return [ids[t] for t in tickers if t in ids]
+
+    def ticker_of(self, db: Session, security_id: int) -> str:
+        ticker = self.tickers.get(security_id)
+        if ticker is None:
+            # Ids only ever come from the database, so a miss means the map is stale.
+            self.load(db)
+            ticker = self.tickers[security_id]
+        return ticker
+
+    def ensure(self, db: Session, tickers: Iterable[str]) -> Dict[str, int]:
+        """Ids for every ticker, creating securities that do not exist yet (the caller commits)."""
+        tickers = set(tickers)
+        if not tickers.issubset(self.ids):
+            self.load(db)
+        missing = sorted(tickers.difference(self.ids))
+        if missing:
+            db.add_all([Security(ticker=t) for t in missing])
+            db.flush()
+            self.load(db)
+        return {t: self.ids[t] for t in tickers}
+
+    def reset(self):
+        with self._lock:
+            self.ids = {}
+            self.tickers = {}
+            self.currencies = {}
+            self._loaded_at = None
+
+    def _needs_reload(self, tickers: List[str]) -> bool:
+        if self._loaded_at is None:
+            return True
+        if all(t in self.ids for t in tickers):
+            return False
+        return time.monotonic() - self._loaded_at >= RELOAD_INTERVAL_SECONDS
+
+
+security_ids = SecurityIdMap()
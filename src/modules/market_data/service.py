@@ -0,0 +1,87 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional
+from sqlalchemy.orm import Session
+
+from configs.db.postgresql import SessionLocal
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.export import ENCODERS, available_formats
+from src.modules.market_data.exceptions import InvalidTickersException, InvalidExportRequestException
+from src.modules.market_data.config import LATEST_MAX_TICKERS, HISTORY_MAX_TICKERS, HISTORY_BATCH_ROWS
+from src.modules.market_data import schemas
+
+
+class MarketDataService:
+    def __init__(self, db: Session):
+        self.market_data = MarketDataRepository(db)
+
+    async def get_latest(self, tickers: List[str]) -> schemas.LatestPricesResponse:
+        requested = self._parse_tickers(tickers, LATEST_MAX_TICKERS)
+
+        records = await asyncio.to_thread(self.market_data.get_latest_prices, requested)
+        by_ticker = {r.ticker: r for r in records}
+        return schemas.LatestPricesResponse(
+            prices=[
+                schemas.LatestQuote(ticker=t, date=by_ticker[t].date, price=by_ticker[t].price)
+                for t in requested if t in by_ticker
+            ],
+            missing=[t for t in requested if t not in by_ticker]
+        )
+
+    def export_history(
+        self,
+        tickers: List[str],
+        export_format: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        after_ticker: Optional[str] = None,
+        after_date: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Validates the request up front, then returns the encoded stream. Rows come ordered by
+        (ticker, date); to resume an interrupted or limited export, pass the ticker and date of
+        the last row received as after_ticker / after_date.
+        """
+        requested = self._parse_tickers(tickers, HISTORY_MAX_TICKERS)
+        if export_format not in available_formats():
+            raise InvalidExportRequestException(f"Format must be one of: {', '.join(available_formats())}")
+        if (after_ticker is None) != (after_date is None):
+            raise InvalidExportRequestException("after_ticker and after_date must be given together")
+        if start and end and start > end:
+            raise InvalidExportRequestException("start must not be after end")
+
+        after = (after_ticker.strip().upper(), datetime.combine(after_date, time.max)) if after_ticker else None
+        batches = self._history_batches(
+            requested,
+            datetime.combine(start, time.min) if start else None,
+            # end is an inclusive day
+            datetime.combine(end + timedelta(days=1), time.min) if end else None,
+            after,
+            limit
+        )
+        return ENCODERS[export_format](batches)
+
+    @staticmethod
+    def _history_batches(tickers, start, end, after, limit) -> Iterator[list]:
+        # Runs while the response streams, after the request's session is gone, so it owns one.
+        db = SessionLocal()
+        try:
+            remaining = limit
+            for batch in MarketDataRepository(db).stream_price_history(tickers, start, end, after, HISTORY_BATCH_ROWS):
+                if remaining is not None:
+                    batch = batch[:remaining]
+                    remaining -= len(batch)
+                if batch:
+                    yield batch
+                if remaining == 0:
+                    return
+        finally:
+            db.close()
+
+    @staticmethod
+    def _parse_tickers(tickers: List[str], max_tickers: int) -> List[str]:
+        requested = list(dict.fromkeys(t.strip().upper() for raw in tickers for t in raw.split(",") if t.strip()))
+        if not requested or len(requested) > max_tickers:
+            raise InvalidTickersException(f"Provide between 1 and {max_tickers} tickers")
+        return requested
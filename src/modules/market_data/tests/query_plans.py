@@ -0,0 +1,234 @@
+"""
+EXPLAIN (ANALYZE, BUFFERS) capture for MarketDataRepository queries.
+
+The statements a repository method sends are recorded as executed (same SQL, same
+parameters) and explained one by one, so the plans reflect the real query shapes.
+Used by the plan regression tests and scripts/explain_market_data.py; both need a
+TimescaleDB database, and no read replicas configured (the statements are captured on
+the session's own engine). Kept with the tests, out of the service package, since
+seed_plan_dataset writes synthetic market data.
+"""
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+
+from src.modules.market_data.models import Security, SecurityPrice
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+PLAN_TICKER_PREFIX = "PLAN"
+PLAN_TICKERS = 2000
+PLAN_DAYS = 260
+PLAN_START = datetime(2030, 1, 1)
+# Tolerated growth over a baseline plan before it counts as a regression.
+BUFFER_TOLERANCE = 1.25
+BUFFER_SLACK = 16
+
+CHUNK_PATTERN = re.compile(r"^_hyper_\d+_\d+_chunk$")
+# Chunk indexes are named after the chunk; the prefix is dropped so plans compare across databases.
+CHUNK_INDEX_PREFIX = re.compile(r"^_hyper_\d+_\d+_chunk_")
+SCAN_NODES = ("Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan")
+
+
+def plan_dates(days: int = PLAN_DAYS) -> List[datetime]:
+    return [d.to_pydatetime() for d in pd.bdate_range(PLAN_START, periods=days)]
+
+
+def seed_plan_dataset(db: Session, tickers: int = PLAN_TICKERS, days: int = PLAN_DAYS) -> bool:
+    """
+    Loads a synthetic PLAN* universe (one row per ticker per business day, one chunk per day)
+    unless it is already there, then refreshes planner statistics. Returns True when it seeded.
+    """
+    first = f"{PLAN_TICKER_PREFIX}{0:05d}"
+    seeded = db.query(Security.id).filter(Security.ticker == first).first() is not None
+    if not seeded:
+        names = [f"{PLAN_TICKER_PREFIX}{i:05d}" for i in range(tickers)]
+        ids = security_ids.ensure(db, names)
+        rng = np.random.default_rng(0)
+        dates = plan_dates(days)
+        paths = 50 * np.cumprod(1 + rng.normal(0.0003, 0.015, (days, tickers)), axis=0)
+        for i, date in enumerate(dates):
+            db.execute(insert(SecurityPrice.__table__), [
+                {"date": date, "security_id": ids[t], "price": float(paths[i, j])}
+                for j, t in enumerate(names)
+            ])
+        db.commit()
+    db.execute(text("ANALYZE securities"))
+    db.execute(text("ANALYZE security_prices"))
+    db.commit()
+    return not seeded
+
+
+def plan_queries() -> Dict[str, Callable[[MarketDataRepository], object]]:
+    """Named repository calls covered by the plan checks."""
+    dates = plan_dates()
+    few = [f"{PLAN_TICKER_PREFIX}{i:05d}" for i in (3, 17, 512, 1024, 1999)]
+    many = [f"{PLAN_TICKER_PREFIX}{i:05d}" for i in range(0, PLAN_TICKERS, 2)]
+    return {
+        "price_history": lambda repo: repo.get_price_history(few),
+        "price_history_after": lambda repo: repo.get_price_history(few, after=dates[-6]),
+        "price_history_many": lambda repo: repo.get_price_history(many, after=dates[-6], fan_out=1),
+        "latest_market_date": lambda repo: repo.get_latest_market_date(),
+        "first_market_date": lambda repo: repo.get_first_market_date(),
+        "prices_on": lambda repo: repo.get_prices_on(dates[-1]),
+        "latest_price": lambda repo: repo.get_latest_price(few[0]),
+        "latest_prices": lambda repo: repo.get_latest_prices(few),
+    }
+
+
+# Structural expectations per query. `index`: an index whose name contains this must be used;
+# `no_seq_scan`: no chunk may be read with a sequential scan; `max_chunks`: chunk exclusion bound.
+PLAN_EXPECTATIONS = {
+    "price_history": {"index": "idx_security_date", "no_seq_scan": True},
+    "price_history_after": {"index": "idx_security_date", "no_seq_scan": True, "max_chunks": 5},
+    # One `= ANY(array)` statement for 1000 tickers.
+    "price_history_many": {"max_chunks": 5},
+    "latest_market_date": {"max_chunks": 1},
+    "first_market_date": {"max_chunks": 1},
+    "prices_on": {"max_chunks": 1},
+    "latest_price": {"index": "latest_prices_pkey", "max_chunks": 0},
+    "latest_prices": {"index": "latest_prices_pkey", "max_chunks": 0},
+}
+
+
+@contextmanager
+def captured_statements(db: Session):
+    """Collects (statement, parameters) of every statement reading prices."""
+    statements: List[Tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if ("security_prices" in statement or "latest_prices" in statement) and not statement.lstrip().upper().startswith("EXPLAIN"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def explain(db: Session, statement: str, parameters) -> dict:
+    row = db.connection().exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+    ).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]
+
+
+def explain_call(db: Session, call: Callable[[MarketDataRepository], object]) -> List[dict]:
+    """Runs `call` once to record its statements, then explains each of them."""
+    repo = MarketDataRepository(db)
+    with captured_statements(db) as statements:
+        call(repo)
+    return [
+        {"statement": statement, "plan": explain(db, statement, parameters)}
+        for statement, parameters in statements
+    ]
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def summarize(explained: dict) -> dict:
+    """Indexes used, sequentially scanned relations, chunks actually read and shared buffers of one plan."""
+    root = explained["Plan"]
+    indexes, seq_scans, chunks = set(), set(), set()
+    for node in _walk(root):
+        if node.get("Node Type") not in SCAN_NODES or node.get("Actual Loops", 1) == 0:
+            continue
+        relation = node.get("Relation Name")
+        if node.get("Index Name"):
+            indexes.add(CHUNK_INDEX_PREFIX.sub("", node["Index Name"]))
+        if node["Node Type"] == "Seq Scan" and relation:
+            seq_scans.add(relation)
+        if relation and CHUNK_PATTERN.match(relation):
+            chunks.add(relation)
+    return {
+        "indexes": sorted(indexes),
+        "seq_scans": sorted(seq_scans),
+        "chunks_scanned": len(chunks),
+        "shared_buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "execution_ms": explained.get("Execution Time"),
+        "planning_ms": explained.get("Planning Time"),
+    }
+
+
+def check_expectations(summary: dict, expectation: dict) -> List[str]:
+    problems = []
+    index = expectation.get("index")
+    if index and not any(index in name for name in summary["indexes"]):
+        problems.append(f"does not use {index} (indexes: {summary['indexes'] or 'none'})")
+    if expectation.get("no_seq_scan"):
+        chunk_scans = [r for r in summary["seq_scans"] if CHUNK_PATTERN.match(r) or r == "security_prices"]
+        if chunk_scans:
+            problems.append(f"sequential scan of {len(chunk_scans)} chunk(s)")
+    max_chunks = expectation.get("max_chunks")
+    if max_chunks is not None and summary["chunks_scanned"] > max_chunks:
+        problems.append(f"scans {summary['chunks_scanned']} chunks, expected at most {max_chunks}")
+    return problems
+
+
+def compare_to_baseline(summary: dict, baseline: dict) -> List[str]:
+    """Regressions against an earlier summary of the same query."""
+    problems = []
+    lost = set(baseline["indexes"]) - set(summary["indexes"])
+    if lost:
+        problems.append(f"no longer uses {sorted(lost)}")
+    if summary["chunks_scanned"] > baseline["chunks_scanned"]:
+        problems.append(f"chunks scanned grew from {baseline['chunks_scanned']} to {summary['chunks_scanned']}")
+    allowed = baseline["shared_buffers"] * BUFFER_TOLERANCE + BUFFER_SLACK
+    if summary["shared_buffers"] > allowed:
+        problems.append(f"shared buffers grew from {baseline['shared_buffers']} to {summary['shared_buffers']}")
+    return problems
+
+
+def write_artifact(directory: Path, name: str, explained: List[dict], summaries: List[dict]):
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = {"query": name, "statements": [
+        {"statement": e["statement"], "summary": s, "plan": e["plan"]}
+        for e, s in zip(explained, summaries)
+    ]}
+    (directory / f"{name}.json").write_text(json.dumps(payload, indent=2, default=str))
+
+
+def read_baseline(directory: Optional[Path], name: str) -> Optional[List[dict]]:
+    if directory is None:
+        return None
+    path = directory / f"{name}.json"
+    if not path.exists():
+        return None
+    return [s["summary"] for s in json.loads(path.read_text())["statements"]]
+
+
+def run_plan_checks(db: Session, artifact_dir: Optional[Path] = None, baseline_dir: Optional[Path] = None) -> Dict[str, dict]:
+    """Explains every covered query; returns name -> {"summaries": [...], "problems": [...]}."""
+    results = {}
+    for name, call in plan_queries().items():
+        explained = explain_call(db, call)
+        summaries = [summarize(e["plan"]) for e in explained]
+        problems = []
+        if not explained:
+            problems.append("issued no price statement")
+        # The expectation applies to the main (last) statement; earlier ones are lookups.
+        if summaries:
+            problems += check_expectations(summaries[-1], PLAN_EXPECTATIONS.get(name, {}))
+        baseline = read_baseline(baseline_dir, name)
+        if baseline and len(baseline) == len(summaries):
+            for current, previous in zip(summaries, baseline):
+                problems += compare_to_baseline(current, previous)
+        if artifact_dir is not None:
+            write_artifact(artifact_dir, name, explained, summaries)
+        results[name] = {"summaries": summaries, "problems": problems}
+    return results
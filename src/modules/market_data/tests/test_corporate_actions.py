@@ -0,0 +1,126 @@
+"""Tests for corporate actions and precomputed adjustment factors"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.modules.market_data.adjustments import AdjustmentRecord, cumulative_factors, factor_matrix
+from src.modules.market_data.cache import MarketDataSnapshot
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+
+def day(d: int) -> datetime:
+    return datetime(2024, 1, d)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        Security.__table__, SecurityPrice.__table__, LatestPrice.__table__,
+        CorporateAction.__table__, AdjustmentFactor.__table__, FxRate.__table__, PriceIngest.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    security_ids.reset()
+    yield session
+    session.close()
+    security_ids.reset()
+
+
+@pytest.fixture
+def repo(db):
+    repo = MarketDataRepository(db)
+    # A 2-for-1 split on day 3 and a 1.00 dividend on day 5.
+    repo.bulk_save_prices([
+        SecurityPrice(date=day(d), ticker="AAPL", price=p)
+        for d, p in ((1, 200.0), (2, 202.0), (3, 101.0), (4, 102.0), (5, 100.0))
+    ])
+    return repo
+
+
+def factors(repo, ticker="AAPL"):
+    return [(r.date.day, round(r.price_factor, 6), round(r.total_factor, 6)) for r in sorted(repo.get_adjustment_factors([ticker]))]
+
+
+def adjusted(prices, records, basis):
+    index = pd.DatetimeIndex([day(d) for d in range(1, len(prices) + 1)])
+    return np.array(prices) * factor_matrix(records, index, ["AAPL"], basis)[:, 0]
+
+
+class TestAdjustmentFactors:
+    def test_split_and_dividend_steps(self):
+        rows = cumulative_factors([(day(3), 2.0, 0.0, None), (day(5), 1.0, 1.0, 102.0)])
+
+        assert rows[0] == (day(3), 2.0, 2.0)
+        assert rows[1][1] == 2.0
+        assert rows[1][2] == pytest.approx(2.0 * 102.0 / 101.0)
+
+    def test_factor_matrix_restates_history_in_todays_terms(self):
+        records = [AdjustmentRecord(day(3), "AAPL", 2.0, 2.0)]
+        prices = [200.0, 202.0, 101.0, 102.0]
+
+        assert adjusted(prices, records, "price_return").tolist() == [100.0, 101.0, 101.0, 102.0]
+        assert adjusted(prices, records, "raw").tolist() == prices
+        with pytest.raises(ValueError):
+            factor_matrix(records, pd.DatetimeIndex([day(1)]), ["AAPL"], "excess")
+
+
+class TestCorporateActionIngest:
+    def test_factors_built_on_ingest(self, repo):
+        repo.save_corporate_actions([
+            CorporateAction(ticker="AAPL", ex_date=day(3), action_type="split", value=2.0),
+            CorporateAction(ticker="AAPL", ex_date=day(5), action_type="dividend", value=1.0),
+        ])
+
+        assert factors(repo) == [(3, 2.0, 2.0), (5, 2.0, round(2.0 * 102.0 / 101.0, 6))]
+        total = adjusted([200.0, 202.0, 101.0, 102.0, 100.0], repo.get_adjustment_factors(["AAPL"]), "total_return")
+        # No jump on the split; the dividend drop is reinvested.
+        assert total[2] / total[1] == pytest.approx(1.0)
+        assert total[4] / total[3] == pytest.approx(100.0 / 101.0)
+
+    def test_later_event_keeps_earlier_factors(self, repo, db):
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(3), action_type="split", value=2.0)])
+        first = db.query(AdjustmentFactor).filter(AdjustmentFactor.date == day(3)).one()
+        first.price_factor = 7.0  # marker: an incremental rebuild from day 5 leaves it alone
+        db.commit()
+
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(5), action_type="split", value=3.0)])
+
+        assert factors(repo) == [(3, 7.0, 2.0), (5, 21.0, 6.0)]
+
+    def test_earlier_event_rebuilds_later_factors(self, repo):
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(5), action_type="split", value=3.0)])
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(3), action_type="split", value=2.0)])
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(3), action_type="split", value=4.0)])
+
+        assert factors(repo) == [(3, 4.0, 4.0), (5, 12.0, 12.0)]
+
+    def test_dividend_waits_for_previous_close(self, repo):
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(8), action_type="dividend", value=1.0)])
+        assert factors(repo) == [(8, 1.0, round(100.0 / 99.0, 6))]
+
+        repo.bulk_save_prices([SecurityPrice(date=day(7), ticker="AAPL", price=50.0)])
+
+        assert factors(repo) == [(8, 1.0, round(50.0 / 49.0, 6))]
+
+    def test_unknown_action_type_rolls_back(self, repo, db):
+        with pytest.raises(ValueError):
+            repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(3), action_type="merger", value=1.0)])
+
+        assert db.query(CorporateAction).count() == 0
+
+    def test_snapshot_sees_new_corporate_actions(self, repo):
+        snapshot = MarketDataSnapshot()
+        assert snapshot.refresh(repo)
+        assert not snapshot.refresh(repo)
+
+        repo.save_corporate_actions([CorporateAction(ticker="AAPL", ex_date=day(3), action_type="split", value=2.0)])
+
+        assert snapshot.refresh(repo)
+        assert snapshot.adjustments_version is not None
@@ -0,0 +1,96 @@
+"""Tests for ticker currencies, FX rates and as-of conversion"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.modules.market_data.fx import FxMatrixCache, FxRecord, conversion_matrix, fx_frame
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+
+def day(d: int) -> datetime:
+    return datetime(2024, 1, d)
+
+
+@pytest.fixture
+def fx():
+    # CAD quoted on days 1 and 3 only, EUR from day 2
+    return fx_frame([
+        FxRecord(day(1), "CAD", 0.75),
+        FxRecord(day(3), "CAD", 0.80),
+        FxRecord(day(2), "EUR", 1.10),
+        FxRecord(day(4), "EUR", 1.20),
+    ])
+
+
+@pytest.fixture
+def repo():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        Security.__table__, SecurityPrice.__table__, LatestPrice.__table__,
+        CorporateAction.__table__, AdjustmentFactor.__table__, FxRate.__table__, PriceIngest.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    security_ids.reset()
+    yield MarketDataRepository(session)
+    session.close()
+    security_ids.reset()
+
+
+class TestConversionMatrix:
+    def test_as_of_rates_per_ticker_currency(self, fx):
+        index = pd.DatetimeIndex([day(d) for d in range(1, 5)])
+        matrix = conversion_matrix(fx, index, ["CAD", "USD", "EUR"], "USD")
+
+        assert matrix[:, 0].tolist() == [0.75, 0.75, 0.80, 0.80]
+        assert matrix[:, 1].tolist() == [1.0] * 4
+        # No EUR rate yet on day 1
+        assert np.isnan(matrix[0, 2]) and matrix[1:, 2].tolist() == [1.10, 1.10, 1.20]
+
+    def test_cross_rates_through_usd(self, fx):
+        matrix = conversion_matrix(fx, pd.DatetimeIndex([day(4)]), ["CAD", "USD", "EUR"], "EUR")
+
+        assert matrix[0].tolist() == pytest.approx([0.80 / 1.20, 1 / 1.20, 1.0])
+
+    def test_same_currency_needs_no_rates(self):
+        assert conversion_matrix(pd.DataFrame(), pd.DatetimeIndex([day(1)]), ["CAD"], "CAD").tolist() == [[1.0]]
+
+    def test_missing_currency_rejected(self, fx):
+        with pytest.raises(ValueError, match="GBP"):
+            conversion_matrix(fx, pd.DatetimeIndex([day(1)]), ["GBP"], "USD")
+
+    def test_matrix_cached_per_generation(self):
+        repo = Mock()
+        repo.get_fx_rates = Mock(return_value=[FxRecord(day(1), "CAD", 0.75)])
+        cache = FxMatrixCache()
+
+        first = cache.get(repo, 1)
+        assert cache.get(repo, 1) is first
+        cache.get(repo, 2)
+        cache.get(repo, None)
+
+        assert repo.get_fx_rates.call_count == 3
+
+
+class TestFxRepository:
+    def test_currencies_and_rates_round_trip(self, repo):
+        repo.bulk_save_prices([SecurityPrice(date=day(1), ticker="RY", price=130.0)])
+        repo.set_currencies({"RY": "cad", "SAP": "EUR"})
+        repo.save_fx_rates([FxRate(date=day(1), currency="CAD", usd_rate=0.74)])
+        repo.save_fx_rates([FxRate(date=day(1), currency="CAD", usd_rate=0.75)])
+
+        assert repo.get_currencies(["RY", "SAP", "UNKNOWN"]) == {"RY": "CAD", "SAP": "EUR"}
+        assert repo.get_fx_rates() == [FxRecord(day(1), "CAD", 0.75)]
+        assert repo.get_latest_fx_date() == day(1)
+
+    def test_new_tickers_default_to_usd(self, repo):
+        repo.bulk_save_prices([SecurityPrice(date=day(1), ticker="AAPL", price=190.0)])
+
+        assert repo.get_currencies(["AAPL"]) == {"AAPL": "USD"}
@@ -0,0 +1,142 @@
+"""Tests for the streamed price history export (GET /market-data/history)"""
+import csv
+import io
+import json
+import pytest
+from datetime import date, datetime
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.main import app
+from src.modules.market_data.export import encode_csv, encode_ndjson
+from src.modules.market_data.exceptions import InvalidExportRequestException, InvalidTickersException
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository, PriceRecord
+from src.modules.market_data.securities import security_ids
+from src.modules.market_data.service import MarketDataService
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Security.__table__, SecurityPrice.__table__, LatestPrice.__table__, CorporateAction.__table__, AdjustmentFactor.__table__, PriceIngest.__table__])
+    factory = sessionmaker(bind=engine)
+    security_ids.reset()
+    db = factory()
+    MarketDataRepository(db).bulk_save_prices([
+        SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p + d)
+        for d in range(1, 6)
+        for t, p in (("MSFT", 200.0), ("AAPL", 100.0))
+    ])
+    db.close()
+    yield factory
+    security_ids.reset()
+
+
+def rows(batches):
+    return [(r.ticker, r.date.day) for batch in batches for r in batch]
+
+
+class TestStreamPriceHistory:
+    def test_ordered_by_ticker_then_date_in_batches(self, session_factory):
+        repo = MarketDataRepository(session_factory())
+        batches = list(repo.stream_price_history(["MSFT", "AAPL", "UNKNOWN"], batch_size=2))
+
+        assert rows(batches) == [("AAPL", d) for d in range(1, 6)] + [("MSFT", d) for d in range(1, 6)]
+        assert max(len(b) for b in batches) == 2
+
+    def test_range_and_resume_after_cursor(self, session_factory):
+        repo = MarketDataRepository(session_factory())
+        batches = repo.stream_price_history(
+            ["AAPL", "MSFT"],
+            start=datetime(2024, 1, 2),
+            end=datetime(2024, 1, 5),
+            after=("AAPL", datetime(2024, 1, 3))
+        )
+
+        assert rows(batches) == [("AAPL", 4), ("MSFT", 2), ("MSFT", 3), ("MSFT", 4)]
+
+
+class TestEncoders:
+    records = [[PriceRecord(datetime(2024, 1, 2), "AAPL", 101.5)], [PriceRecord(datetime(2024, 1, 3), "AAPL", 102.25)]]
+
+    def test_ndjson(self):
+        lines = b"".join(encode_ndjson(self.records)).decode().splitlines()
+
+        assert [json.loads(line) for line in lines] == [
+            {"ticker": "AAPL", "date": "2024-01-02", "price": 101.5},
+            {"ticker": "AAPL", "date": "2024-01-03", "price": 102.25},
+        ]
+
+    def test_csv_has_one_header(self):
+        text = b"".join(encode_csv(self.records)).decode()
+
+        assert list(csv.reader(io.StringIO(text))) == [
+            ["ticker", "date", "price"], ["AAPL", "2024-01-02", "101.5"], ["AAPL", "2024-01-03", "102.25"]
+        ]
+
+    def test_arrow_stream(self):
+        pyarrow = pytest.importorskip("pyarrow")
+        from src.modules.market_data.export import encode_arrow
+
+        table = pyarrow.ipc.open_stream(b"".join(encode_arrow(self.records))).read_all()
+
+        assert table.column("price").to_pylist() == [101.5, 102.25]
+        assert table.column("date").to_pylist() == [date(2024, 1, 2), date(2024, 1, 3)]
+
+
+class TestExportValidation:
+    @pytest.fixture
+    def service(self):
+        with patch("src.modules.market_data.service.MarketDataRepository"):
+            yield MarketDataService(Mock())
+
+    def test_rejects_bad_requests_before_streaming(self, service):
+        with patch("src.modules.market_data.service.SessionLocal") as session_local:
+            with pytest.raises(InvalidTickersException):
+                service.export_history([" "], "csv")
+            with pytest.raises(InvalidExportRequestException):
+                service.export_history(["AAPL"], "xml")
+            with pytest.raises(InvalidExportRequestException):
+                service.export_history(["AAPL"], "csv", after_ticker="AAPL")
+            with pytest.raises(InvalidExportRequestException):
+                service.export_history(["AAPL"], "csv", start=date(2024, 2, 1), end=date(2024, 1, 1))
+
+        session_local.assert_not_called()
+
+
+class TestHistoryEndpoint:
+    def get(self, session_factory, query):
+        with patch("src.modules.market_data.service.SessionLocal", session_factory):
+            return TestClient(app).get("/market-data/history", params=query)
+
+    def test_streams_ndjson_with_inclusive_end(self, session_factory):
+        response = self.get(session_factory, {"tickers": "msft,aapl", "start": "2024-01-04", "end": "2024-01-05"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [(r["ticker"], r["date"]) for r in map(json.loads, response.text.splitlines())] == [
+            ("AAPL", "2024-01-04"), ("AAPL", "2024-01-05"), ("MSFT", "2024-01-04"), ("MSFT", "2024-01-05")
+        ]
+
+    def test_limit_then_resume_covers_everything_once(self, session_factory):
+        first = self.get(session_factory, {"tickers": "AAPL,MSFT", "format": "csv", "limit": 4})
+        page = list(csv.DictReader(io.StringIO(first.text)))
+        last = page[-1]
+        rest = self.get(session_factory, {
+            "tickers": "AAPL,MSFT", "format": "csv", "after_ticker": last["ticker"], "after_date": last["date"]
+        })
+        page += list(csv.DictReader(io.StringIO(rest.text)))
+
+        assert first.headers["content-disposition"] == 'attachment; filename="price-history.csv"'
+        assert len(page) == 10
+        assert len({(r["ticker"], r["date"]) for r in page}) == 10
+
+    def test_invalid_export_is_400(self, session_factory):
+        response = self.get(session_factory, {"tickers": "AAPL", "after_date": "2024-01-02"})
+
+        assert response.status_code == 400
@@ -0,0 +1,54 @@
+"""Tests for GET /market-data/latest"""
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.modules.market_data import schemas
+from src.modules.market_data.exceptions import InvalidTickersException
+from src.modules.market_data.repository import PriceRecord
+from src.modules.market_data.service import MarketDataService
+
+
+@pytest.fixture
+def service():
+    repo = Mock()
+    repo.get_latest_prices = Mock(return_value=[
+        PriceRecord(datetime(2024, 1, 3), "AAPL", 103.0),
+        PriceRecord(datetime(2024, 1, 2), "MSFT", 202.0),
+    ])
+    with patch("src.modules.market_data.service.MarketDataRepository", return_value=repo):
+        yield MarketDataService(Mock())
+
+
+class TestMarketDataService:
+    async def test_normalizes_and_reports_missing(self, service):
+        result = await service.get_latest(["aapl, msft", "ZZZZ", "AAPL"])
+
+        service.market_data.get_latest_prices.assert_called_once_with(["AAPL", "MSFT", "ZZZZ"])
+        assert [(q.ticker, q.price) for q in result.prices] == [("AAPL", 103.0), ("MSFT", 202.0)]
+        assert result.missing == ["ZZZZ"]
+
+    @pytest.mark.parametrize("tickers", [[" , "], [",".join(f"T{i}" for i in range(501))]])
+    async def test_rejects_empty_and_oversized_lists(self, service, tickers):
+        with pytest.raises(InvalidTickersException):
+            await service.get_latest(tickers)
+
+
+class TestLatestEndpoint:
+    def test_returns_quotes(self):
+        response_model = schemas.LatestPricesResponse(
+            prices=[schemas.LatestQuote(ticker="AAPL", date=datetime(2024, 1, 3), price=103.0)],
+            missing=[]
+        )
+        with patch("src.modules.market_data.router.MarketDataService") as service_class:
+            service_class.return_value.get_latest = AsyncMock(return_value=response_model)
+            response = TestClient(app).get("/market-data/latest?tickers=AAPL")
+
+        assert response.status_code == 200
+        assert response.json()["prices"][0]["price"] == 103.0
+        assert response.headers["Cache-Control"] == "public, max-age=60"
+
+    def test_requires_tickers(self):
+        assert TestClient(app).get("/market-data/latest").status_code == 422
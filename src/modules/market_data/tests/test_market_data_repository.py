@@ -0,0 +1,106 @@
+"""Tests for the dictionary-encoded price repository (in-memory SQLite)"""
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from configs.db.postgresql import Base
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Security.__table__, SecurityPrice.__table__, LatestPrice.__table__, CorporateAction.__table__, AdjustmentFactor.__table__, PriceIngest.__table__])
+    session = sessionmaker(bind=engine)()
+    security_ids.reset()
+    yield session
+    session.close()
+    security_ids.reset()
+
+
+@pytest.fixture
+def repo(db):
+    repo = MarketDataRepository(db)
+    repo.bulk_save_prices([
+        SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=p + d)
+        for d in (1, 2, 3)
+        for t, p in (("AAPL", 100.0), ("MSFT", 200.0))
+    ])
+    return repo
+
+
+class TestMarketDataRepository:
+    """Test suite for ticker <-> id resolution in MarketDataRepository"""
+
+    def test_tickers_stored_once(self, repo, db):
+        """Test that each ticker becomes one security and prices reference it by id"""
+        securities = {s.ticker: s.id for s in db.query(Security).all()}
+
+        assert set(securities) == {"AAPL", "MSFT"}
+        assert {p.security_id for p in db.query(SecurityPrice).all()} == set(securities.values())
+
+    def test_price_history_resolves_tickers(self, repo):
+        records = repo.get_price_history(["MSFT", "UNKNOWN"], after=datetime(2024, 1, 1))
+
+        assert sorted((r.date.day, r.ticker, r.price) for r in records) == [(2, "MSFT", 202.0), (3, "MSFT", 203.0)]
+        assert repo.get_price_history(["UNKNOWN"]) == []
+
+    def test_latest_prices(self, repo):
+        assert repo.get_latest_price("AAPL").price == 103.0
+        assert repo.get_latest_price("UNKNOWN") is None
+        assert {r.ticker: r.price for r in repo.get_latest_prices(["AAPL", "MSFT"])} == {"AAPL": 103.0, "MSFT": 203.0}
+        assert {r.ticker for r in repo.get_prices_on(datetime(2024, 1, 2))} == {"AAPL", "MSFT"}
+
+    def test_new_ticker_on_later_ingest(self, repo, db):
+        """Test that a later ingest adds securities and reuses existing ids"""
+        aapl_id = security_ids.ids["AAPL"]
+
+        repo.bulk_save_prices([
+            SecurityPrice(date=datetime(2024, 1, 4), ticker="AAPL", price=104.0),
+            SecurityPrice(date=datetime(2024, 1, 4), ticker="NVDA", price=50.0),
+        ])
+
+        assert security_ids.ids["AAPL"] == aapl_id
+        assert db.query(Security).count() == 3
+        assert [r.price for r in repo.get_price_history(["NVDA"])] == [50.0]
+
+    def test_map_reloads_for_ids_created_elsewhere(self, repo, db):
+        """Test that a security added by another process is picked up"""
+        db.add(Security(ticker="TSLA"))
+        db.flush()
+        tsla = db.query(Security).filter(Security.ticker == "TSLA").one()
+        db.add(SecurityPrice(date=datetime(2024, 1, 2), security_id=tsla.id, price=10.0))
+        db.commit()
+
+        assert {r.ticker for r in repo.get_prices_on(datetime(2024, 1, 2))} == {"AAPL", "MSFT", "TSLA"}
+
+    def test_latest_prices_follow_ingests(self, repo, db):
+        """Test that latest_prices moves forward with new quotes and ignores backfills"""
+        repo.bulk_save_prices([
+            SecurityPrice(date=datetime(2024, 1, 4), ticker="AAPL", price=104.0),
+            SecurityPrice(date=datetime(2024, 1, 4), ticker="NVDA", price=50.0),
+        ])
+        repo.bulk_save_prices([SecurityPrice(date=datetime(2023, 12, 29), ticker="MSFT", price=1.0)])
+
+        latest = {r.ticker: (r.date.day, r.price) for r in repo.get_all_latest_prices()}
+        assert latest == {"AAPL": (4, 104.0), "MSFT": (3, 203.0), "NVDA": (4, 50.0)}
+        assert db.query(LatestPrice).count() == 3
+
+    def test_correction_replaces_quote_and_bumps_ingest_version(self, repo, db):
+        """Test that re-ingesting a stored date updates it and is visible as a new ingest"""
+        version = repo.get_ingest_version()
+
+        repo.bulk_save_prices([
+            SecurityPrice(date=datetime(2024, 1, 3), ticker="AAPL", price=90.0),
+            SecurityPrice(date=datetime(2024, 1, 2), ticker="AAPL", price=80.0)
+        ])
+
+        assert repo.get_ingest_version() == version + 1
+        assert repo.get_latest_price("AAPL").price == 90.0
+        assert {r.date.day: r.price for r in repo.get_price_history(["AAPL"])} == {1: 101.0, 2: 80.0, 3: 90.0}
+        ingest = db.query(PriceIngest).order_by(PriceIngest.id.desc()).first()
+        assert (ingest.first_date, ingest.last_date, ingest.rows) == (datetime(2024, 1, 2), datetime(2024, 1, 3), 2)
@@ -0,0 +1,114 @@
+"""
+Query-plan regression checks for MarketDataRepository.
+
+The checks against a database only run when QUERY_PLAN_DATABASE_URL points at a dedicated,
+migrated TimescaleDB (`alembic upgrade head`); a synthetic PLAN* universe dated 2030 is
+loaded into it once, so do not point it at a database the service uses.
+Plans are written to QUERY_PLAN_ARTIFACT_DIR (default .query-plans/) and, when
+QUERY_PLAN_BASELINE_DIR holds plans from an earlier run, compared against them.
+"""
+import os
+import pytest
+from pathlib import Path
+
+from src.modules.market_data.tests.query_plans import (
+    PLAN_EXPECTATIONS,
+    plan_queries,
+    summarize,
+    check_expectations,
+    compare_to_baseline,
+    seed_plan_dataset,
+    run_plan_checks
+)
+from src.modules.market_data.securities import security_ids
+
+QUERY_PLAN_DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL")
+
+
+def scan(node_type, relation, index=None, loops=1, children=()):
+    node = {"Node Type": node_type, "Relation Name": relation, "Actual Loops": loops, "Plans": list(children)}
+    if index:
+        node["Index Name"] = index
+    return node
+
+
+PLAN = {
+    "Plan": {
+        "Node Type": "Custom Scan",
+        "Shared Hit Blocks": 40,
+        "Shared Read Blocks": 2,
+        "Plans": [
+            scan("Index Scan", "_hyper_1_10_chunk", "_hyper_1_10_chunk_idx_security_date"),
+            scan("Index Scan", "_hyper_1_11_chunk", "_hyper_1_11_chunk_idx_security_date"),
+            scan("Seq Scan", "_hyper_1_12_chunk", loops=0),
+        ],
+    },
+    "Execution Time": 0.5,
+    "Planning Time": 1.2,
+}
+
+
+class TestPlanSummary:
+    def test_summarize_counts_only_executed_chunks(self):
+        summary = summarize(PLAN)
+
+        assert summary["chunks_scanned"] == 2
+        assert summary["seq_scans"] == []
+        assert summary["shared_buffers"] == 42
+        assert summary["indexes"] == ["idx_security_date"]
+
+    def test_expectations(self):
+        summary = summarize(PLAN)
+
+        assert check_expectations(summary, {"index": "idx_security_date", "no_seq_scan": True, "max_chunks": 2}) == []
+        problems = check_expectations(summary, {"index": "security_prices_pkey", "max_chunks": 1})
+        assert len(problems) == 2
+
+    def test_seq_scan_of_chunk_is_flagged(self):
+        summary = summarize({"Plan": scan("Seq Scan", "_hyper_1_3_chunk")})
+
+        assert check_expectations(summary, {"no_seq_scan": True}) == ["sequential scan of 1 chunk(s)"]
+
+    def test_baseline_comparison(self):
+        baseline = summarize(PLAN)
+        worse = dict(baseline, indexes=[], chunks_scanned=5, shared_buffers=500)
+
+        assert compare_to_baseline(baseline, baseline) == []
+        assert len(compare_to_baseline(worse, baseline)) == 3
+
+    def test_every_query_has_expectations(self):
+        assert set(plan_queries()) == set(PLAN_EXPECTATIONS)
+
+
+@pytest.fixture(scope="module")
+def timescale_db():
+    if not QUERY_PLAN_DATABASE_URL:
+        pytest.skip("QUERY_PLAN_DATABASE_URL is not set")
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(QUERY_PLAN_DATABASE_URL)
+    session = sessionmaker(bind=engine)()
+    if not session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")).first():
+        pytest.skip("QUERY_PLAN_DATABASE_URL has no timescaledb extension")
+    security_ids.reset()
+    seed_plan_dataset(session)
+    yield session
+    session.close()
+    security_ids.reset()
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plan_results(timescale_db):
+    baseline = os.getenv("QUERY_PLAN_BASELINE_DIR")
+    return run_plan_checks(
+        timescale_db,
+        artifact_dir=Path(os.getenv("QUERY_PLAN_ARTIFACT_DIR", ".query-plans")),
+        baseline_dir=Path(baseline) if baseline else None
+    )
+
+
+@pytest.mark.parametrize("name", sorted(PLAN_EXPECTATIONS))
+def test_query_plan(plan_results, name):
+    assert plan_results[name]["problems"] == []
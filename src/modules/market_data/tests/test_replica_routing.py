@@ -0,0 +1,136 @@
+"""Tests for read-replica routing (SQLite files stand in for the primary and replicas)"""
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from configs.db.postgresql import Base
+from configs.db.replicas import ReplicaRouter
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, FxRate, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+
+def make_db(path, price):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Security.__table__, SecurityPrice.__table__, LatestPrice.__table__, CorporateAction.__table__, AdjustmentFactor.__table__, FxRate.__table__, PriceIngest.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add(Security(id=1, ticker="AAPL"))
+    session.add(SecurityPrice(date=datetime(2024, 1, 2), security_id=1, price=price))
+    session.add(LatestPrice(date=datetime(2024, 1, 2), security_id=1, price=price))
+    session.commit()
+    session.close()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path):
+    # Each database holds a different price, so a read shows which one served it.
+    security_ids.reset()
+    yield {name: make_db(tmp_path / f"{name}.db", price) for name, price in (("primary", 1.0), ("r1", 2.0), ("r2", 3.0))}
+    security_ids.reset()
+
+
+@pytest.fixture
+def broken(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path}/missing/dir/replica.db")
+
+
+def latest_price(router, engines):
+    db = sessionmaker(bind=engines["primary"])()
+    with patch("src.modules.market_data.repository.replica_router", router):
+        price = MarketDataRepository(db).get_latest_price("AAPL").price
+    db.close()
+    return price
+
+
+class TestReplicaRouter:
+    def test_round_robin_over_replicas(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"], engines["r2"]])
+
+        assert [latest_price(router, engines) for _ in range(4)] == [2.0, 3.0, 2.0, 3.0]
+        assert router.replica_reads == 4 and router.primary_reads == 0
+
+    def test_failed_replica_is_skipped(self, engines, broken):
+        router = ReplicaRouter(engines["primary"], [broken, engines["r2"]])
+
+        assert [latest_price(router, engines) for _ in range(3)] == [3.0, 3.0, 3.0]
+        assert router.stats()["replicas"][0]["healthy"] is False
+
+    def test_falls_back_to_primary(self, engines, broken):
+        router = ReplicaRouter(engines["primary"], [broken])
+
+        assert latest_price(router, engines) == 1.0
+        assert router.primary_reads == 1
+
+    def test_connection_failure_marks_replica_down(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]])
+        router.candidates()  # health check passes
+
+        with patch.object(engines["r1"], "connect", side_effect=OperationalError("SELECT 1", {}, Exception("down"))):
+            assert latest_price(router, engines) == 1.0
+        assert router.replicas[0].healthy is False and router.replicas[0].failures == 1
+
+    def test_down_replica_is_rechecked_after_interval(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]], check_interval=0)
+        router._mark_down(engines["r1"])
+
+        assert latest_price(router, engines) == 2.0
+
+    def test_lagging_replica_is_skipped(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]], max_lag=5)
+        router.replicas[0].lag = 60
+        router.replicas[0].healthy = False
+        router.replicas[0].checked_at = float("inf")
+
+        assert latest_price(router, engines) == 1.0
+
+    def test_pin_sends_reads_to_primary(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]])
+        router.pin_primary(60)
+
+        assert latest_price(router, engines) == 1.0
+        router.pin_primary(0)
+        assert router.is_pinned()  # a pin is never shortened
+
+    def test_writes_go_to_primary_and_pin_reads(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]], pin_seconds=60)
+        db = sessionmaker(bind=engines["primary"])()
+
+        with patch("src.modules.market_data.repository.replica_router", router):
+            repo = MarketDataRepository(db)
+            repo.bulk_save_prices([SecurityPrice(date=datetime(2024, 1, 3), ticker="AAPL", price=9.0)])
+            latest = repo.get_latest_price("AAPL")
+        db.close()
+
+        assert (latest.date, latest.price) == (datetime(2024, 1, 3), 9.0)
+        assert router.is_pinned()
+
+    def test_replica_behind_another_process_ingest_is_skipped(self, engines):
+        router = ReplicaRouter(engines["primary"], [engines["r1"]], check_interval=0)
+        # An ingest script's own repository: no replicas, so this process is never pinned.
+        writer = sessionmaker(bind=engines["primary"])()
+        with patch("src.modules.market_data.repository.replica_router", ReplicaRouter(engines["primary"], [])):
+            MarketDataRepository(writer).bulk_save_prices([SecurityPrice(date=datetime(2024, 1, 3), ticker="AAPL", price=9.0)])
+        writer.close()
+
+        assert not router.is_pinned()
+        assert latest_price(router, engines) == 9.0
+        assert router.stats()["replicas"][0]["behind_primary"] is True
+
+        replayed = sessionmaker(bind=engines["r1"])()
+        replayed.add(LatestPrice(date=datetime(2024, 1, 3), security_id=2, price=4.0))
+        replayed.add(PriceIngest(id=1, first_date=datetime(2024, 1, 3), last_date=datetime(2024, 1, 3), rows=1))
+        replayed.commit()
+        replayed.close()
+        assert latest_price(router, engines) == 2.0
+        assert router.replicas[0].behind is False
+
+    def test_disabled_without_replicas(self, engines):
+        router = ReplicaRouter(engines["primary"], [])
+
+        assert not router.enabled
+        assert latest_price(router, engines) == 1.0
+        assert router.primary_reads == 0  # reads use the caller's session
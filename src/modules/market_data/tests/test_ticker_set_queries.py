@@ -0,0 +1,81 @@
+"""Tests for large ticker-set reads: array parameters, bounded IN lists and sharded fan-out"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from configs.db.postgresql import Base
+from src.modules.market_data.models import Security, SecurityPrice, LatestPrice, CorporateAction, AdjustmentFactor, PriceIngest
+from src.modules.market_data.repository import MarketDataRepository
+from src.modules.market_data.securities import security_ids
+
+TICKERS = [f"T{i:04d}" for i in range(2000)]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database, so fan-out shards get connections of their own.
+    engine = create_engine(f"sqlite:///{tmp_path / 'prices.db'}")
+    Base.metadata.create_all(engine, tables=[Security.__table__, SecurityPrice.__table__, LatestPrice.__table__, CorporateAction.__table__, AdjustmentFactor.__table__, PriceIngest.__table__])
+    security_ids.reset()
+    db = sessionmaker(bind=engine)()
+    MarketDataRepository(db).bulk_save_prices([
+        SecurityPrice(date=datetime(2024, 1, d), ticker=t, price=float(i + d))
+        for d in (1, 2)
+        for i, t in enumerate(TICKERS)
+    ])
+    db.close()
+    yield engine
+    security_ids.reset()
+    engine.dispose()
+
+
+@pytest.fixture
+def repo(engine):
+    db = sessionmaker(bind=engine)()
+    yield MarketDataRepository(db)
+    db.close()
+
+
+def history_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+    return statements
+
+
+def as_set(records):
+    return {(r.ticker, r.date.day, r.price) for r in records}
+
+
+class TestTickerSetQueries:
+    def test_in_lists_stay_under_the_parameter_limit(self, repo, engine):
+        statements = history_statements(engine)
+        records = repo.get_price_history(TICKERS + ["UNKNOWN"], fan_out=1)
+
+        assert len(records) == 4000
+        assert len([s for s in statements if "security_prices" in s]) == 3
+
+    def test_fan_out_matches_single_query(self, repo):
+        expected = as_set(repo.get_price_history(TICKERS[:1500], after=datetime(2024, 1, 1), fan_out=1))
+        with patch("src.modules.market_data.repository.PRICE_HISTORY_FAN_OUT_MIN_TICKERS", 100):
+            sharded = repo.get_price_history(TICKERS[:1500], after=datetime(2024, 1, 1), fan_out=4)
+
+        assert len(sharded) == 1500
+        assert as_set(sharded) == expected
+
+    def test_small_sets_are_not_sharded(self):
+        assert MarketDataRepository._shards(list(range(10)), 4) == [list(range(10))]
+        with patch("src.modules.market_data.repository.PRICE_HISTORY_FAN_OUT_MIN_TICKERS", 5):
+            assert MarketDataRepository._shards(list(range(10)), 4) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+    def test_postgres_binds_one_array(self):
+        db = Mock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        filters = MarketDataRepository._id_filters(db, SecurityPrice.security_id, list(range(5000)))
+        compiled = select(SecurityPrice.price).where(*filters).compile(dialect=postgresql.dialect())
+
+        assert len(filters) == 1
+        assert "= ANY (%(security_ids)s::INTEGER[])" in str(compiled)
+        assert compiled.params["security_ids"] == list(range(5000))
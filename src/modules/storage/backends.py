@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import Optional
+
+from src.modules.storage.config import STORAGE_BACKEND, STORAGE_LOCAL_ROOT
+
+
+class FirebaseBackend:
+    """Firebase / Google Cloud Storage bucket. Objects are uploaded public in a single request."""
+    def __init__(self, bucket=None):
+        if bucket is None:
+            # Imported lazily: importing it initializes the Firebase app from credentials.
+            from configs.objectstorage.firebase import get_storage_bucket
+            bucket = get_storage_bucket()
+        self.bucket = bucket
+
+    def put(self, key: str, data: bytes, content_type: str, content_encoding: Optional[str] = None) -> str:
+        blob = self.bucket.blob(key)
+        if content_encoding:
+            # Clients decode the object by its Content-Encoding; GCS also transcodes gzip
+            # for clients that do not accept it.
+            blob.content_encoding = content_encoding
+        # The ACL goes with the upload, saving the separate make_public round trip.
+        blob.upload_from_string(data, content_type=content_type, predefined_acl="publicRead")
+        return blob.public_url
+
+    def get(self, key: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        end = start + length - 1 if length is not None else None
+        return self.bucket.blob(key).download_as_bytes(start=start, end=end, raw_download=True)
+
+
+class LocalBackend:
+    """Files under a local directory; used for tests and development."""
+    def __init__(self, root: str = STORAGE_LOCAL_ROOT):
+        self.root = Path(root).resolve()
+
+    def put(self, key: str, data: bytes, content_type: str, content_encoding: Optional[str] = None) -> str:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path.as_uri()
+
+    def get(self, key: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        with open(self.root / key, "rb") as f:
+            f.seek(start)
+            return f.read() if length is None else f.read(length)
+
+
+def get_storage_backend():
+    if STORAGE_BACKEND == "local":
+        return LocalBackend()
+    return FirebaseBackend()
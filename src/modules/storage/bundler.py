@@ -0,0 +1,87 @@
+import asyncio
+import time
+from typing import Callable, List, Optional, Tuple
+
+from src.modules.storage.service import StorageService, ArchivedFile
+from src.modules.storage.config import (
+    STORAGE_BUNDLE_ENABLED,
+    STORAGE_BUNDLE_MAX_FILES,
+    STORAGE_BUNDLE_MAX_BYTES,
+    STORAGE_BUNDLE_MAX_AGE_SECONDS
+)
+
+
+class ArchiveBundler:
+    """
+    Buffers raw files in memory and writes them as one bundle object when the buffer reaches
+    `max_files` or `max_bytes`, or its oldest file is `max_age` seconds old. `on_flush` receives
+    the archived files (bundle key, offset, length) once the bundle is stored.
+    A failed write puts the files back in the buffer. Buffered files are lost if the process
+    dies before a flush.
+    """
+    def __init__(
+        self,
+        on_flush: Callable[[List[ArchivedFile]], None],
+        enabled: bool = STORAGE_BUNDLE_ENABLED,
+        max_files: int = STORAGE_BUNDLE_MAX_FILES,
+        max_bytes: int = STORAGE_BUNDLE_MAX_BYTES,
+        max_age: float = STORAGE_BUNDLE_MAX_AGE_SECONDS,
+        storage_factory: Callable[[], StorageService] = StorageService
+    ):
+        self.on_flush = on_flush
+        self.enabled = enabled
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.storage_factory = storage_factory
+        self.pending: List[Tuple[str, bytes]] = []
+        self.pending_bytes = 0
+        self.oldest: Optional[float] = None
+        self.bundles_written = 0
+        self.files_written = 0
+        self._lock = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def add(self, filename: str, content: bytes):
+        self.pending.append((filename, content))
+        self.pending_bytes += len(content)
+        if self.oldest is None:
+            self.oldest = time.monotonic()
+        if len(self.pending) >= self.max_files or self.pending_bytes >= self.max_bytes:
+            await self.flush()
+
+    async def flush(self):
+        async with self._get_lock():
+            if not self.pending:
+                return
+            files, self.pending = self.pending, []
+            oldest, self.oldest = self.oldest, None
+            self.pending_bytes = 0
+
+            try:
+                archived = await asyncio.to_thread(self._write, files)
+            except Exception:
+                # Back in front of anything added meanwhile; the next flush retries them.
+                self.pending = files + self.pending
+                self.pending_bytes = sum(len(content) for _, content in self.pending)
+                self.oldest = oldest
+                raise
+            self.bundles_written += 1
+            self.files_written += len(archived)
+        await asyncio.to_thread(self.on_flush, archived)
+
+    def _write(self, files: List[Tuple[str, bytes]]) -> List[ArchivedFile]:
+        return self.storage_factory().archive_bundle(files)
+
+    async def run_forever(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.max_age / 4))
+            if self.oldest is not None and time.monotonic() - self.oldest >= self.max_age:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"Archive bundle flush failed: {e}")
@@ -0,0 +1,20 @@
+"""
+Storage service configuration settings
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "firebase" (default) or "local" (files under STORAGE_LOCAL_ROOT, for tests and development)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firebase")
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", "./storage-data")
+STORAGE_PREFIX = os.getenv("STORAGE_PREFIX", "ETF")
+# Compression of archived files: "zstd" (falls back to gzip without the zstandard package), "gzip" or "none"
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "zstd")
+
+# Packing of small archived files into bundle objects
+STORAGE_BUNDLE_ENABLED = os.getenv("STORAGE_BUNDLE_ENABLED", "false").lower() == "true"
+STORAGE_BUNDLE_MAX_FILES = int(os.getenv("STORAGE_BUNDLE_MAX_FILES", "500"))
+STORAGE_BUNDLE_MAX_BYTES = int(os.getenv("STORAGE_BUNDLE_MAX_BYTES", str(8 * 1024 * 1024)))
+STORAGE_BUNDLE_MAX_AGE_SECONDS = float(os.getenv("STORAGE_BUNDLE_MAX_AGE_SECONDS", "300"))
@@ -1,11 +1,31 @@
+import io
+import json
+import tarfile
+import time
 import uuid
+from typing import List, NamedTuple, Optional, Tuple
 from fastapi import UploadFile
-from configs.objectstorage.firebase import get_storage_bucket
+from configs.compression import COMPRESSORS, DECOMPRESSORS
+from src.modules.storage.backends import get_storage_backend
+from src.modules.storage.config import STORAGE_PREFIX, STORAGE_COMPRESSION
 from src.modules.storage.exceptions import InvalidUploadParametersException
 
+EXTENSIONS = {"zstd": ".zst", "br": ".br", "gzip": ".gz"}
+
+
+class ArchivedFile(NamedTuple):
+    file_name: str
+    url: str
+    key: str
+    offset: Optional[int] = None # byte range inside a bundle object
+    length: Optional[int] = None
+    content_encoding: Optional[str] = None
+
+
 class StorageService:
-    def __init__(self):
-        self.bucket = get_storage_bucket()
+    def __init__(self, backend=None):
+        self.backend = backend or get_storage_backend()
+        self.compression = self._resolve_compression(STORAGE_COMPRESSION)
 
     def upload(self, file: UploadFile = None, file_content: bytes = None, filename: str = None, content_type: str = None) -> str:
         if file:
@@ -20,12 +40,63 @@ class StorageService:
             raise InvalidUploadParametersException()
         
         unique_name = f"{uuid.uuid4()}_{filename}"
-        blob = self.bucket.blob(f"ETF/{unique_name}")
-        
-        blob.upload_from_string(
-            content, 
-            content_type=content_type
-        )
-        blob.make_public()
-        
-        return blob.public_url
\ No newline at end of file
+        return self.backend.put(f"{STORAGE_PREFIX}/{unique_name}", content, content_type)
+
+    def archive(self, file_content: bytes, filename: str, content_type: str = "text/csv") -> ArchivedFile:
+        """Stores one raw file, compressed, as its own object."""
+        data = self._compress(file_content)
+        key = f"{STORAGE_PREFIX}/{uuid.uuid4()}_{filename}{EXTENSIONS.get(self.compression, '')}"
+        url = self.backend.put(key, data, content_type, content_encoding=self.compression)
+        return ArchivedFile(filename, url, key, content_encoding=self.compression)
+
+    def archive_bundle(self, files: List[Tuple[str, bytes]]) -> List[ArchivedFile]:
+        """
+        Packs many raw files into one uncompressed tar object whose members are individually
+        compressed, so each file can be read back with a single ranged read. The last member,
+        index.json, lists every file with its byte offset and length.
+        """
+        buffer = io.BytesIO()
+        entries = []
+        with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            for position, (filename, content) in enumerate(files):
+                data = self._compress(content)
+                info = tarfile.TarInfo(f"{position:06d}_{filename}{EXTENSIONS.get(self.compression, '')}")
+                info.size = len(data)
+                info.mtime = int(time.time())
+                tar.addfile(info, io.BytesIO(data))
+                # Member data ends the archive so far, padded to a whole tar block.
+                offset = tar.offset - -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                entries.append({"file_name": filename, "member": info.name, "offset": offset, "length": len(data)})
+
+            index = json.dumps({"content_encoding": self.compression, "files": entries}).encode("utf-8")
+            info = tarfile.TarInfo("index.json")
+            info.size = len(index)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(index))
+
+        key = f"{STORAGE_PREFIX}/bundles/{time.strftime('%Y/%m/%d')}/{uuid.uuid4()}.tar"
+        url = self.backend.put(key, buffer.getvalue(), "application/x-tar")
+        return [
+            ArchivedFile(e["file_name"], url, key, e["offset"], e["length"], self.compression)
+            for e in entries
+        ]
+
+    def read_archived(self, key: str, offset: Optional[int] = None, length: Optional[int] = None, content_encoding: Optional[str] = None) -> bytes:
+        data = self.backend.get(key, offset or 0, length)
+        if content_encoding in DECOMPRESSORS:
+            return DECOMPRESSORS[content_encoding](data)
+        return data
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.compression is None:
+            return content
+        return COMPRESSORS[self.compression](content)
+
+    @staticmethod
+    def _resolve_compression(setting: str) -> Optional[str]:
+        if setting == "none":
+            return None
+        if setting in COMPRESSORS:
+            return setting
+        # zstd without the zstandard package
+        return "gzip"
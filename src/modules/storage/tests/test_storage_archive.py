@@ -0,0 +1,136 @@
+import gzip
+import json
+import tarfile
+import pytest
+from unittest.mock import MagicMock
+
+from src.modules.storage.backends import FirebaseBackend, LocalBackend
+from src.modules.storage.bundler import ArchiveBundler
+from src.modules.storage.exceptions import InvalidUploadParametersException
+from src.modules.storage.service import StorageService
+
+CSV = b"name,weight\nAAPL,0.5\nMSFT,0.5\n"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    service = StorageService(backend=LocalBackend(str(tmp_path)))
+    service.compression = "gzip"
+    return service
+
+
+class TestStorageService:
+    def test_upload_writes_raw_file(self, storage, tmp_path):
+        url = storage.upload(file_content=CSV, filename="etf.csv")
+
+        assert url.startswith("file://")
+        stored = list((tmp_path / "ETF").iterdir())
+        assert len(stored) == 1 and stored[0].name.endswith("_etf.csv")
+        assert stored[0].read_bytes() == CSV
+
+    def test_upload_requires_content_and_name(self, storage):
+        with pytest.raises(InvalidUploadParametersException):
+            storage.upload(file_content=CSV)
+
+    def test_archive_compresses(self, storage, tmp_path):
+        archived = storage.archive(CSV, "etf.csv")
+
+        assert archived.key.endswith("_etf.csv.gz")
+        assert archived.content_encoding == "gzip"
+        assert gzip.decompress((tmp_path / archived.key).read_bytes()) == CSV
+        assert storage.read_archived(archived.key, content_encoding="gzip") == CSV
+
+    def test_archive_without_compression(self, storage):
+        storage.compression = None
+        archived = storage.archive(CSV, "etf.csv")
+
+        assert archived.content_encoding is None
+        assert storage.read_archived(archived.key) == CSV
+
+    def test_missing_zstd_falls_back_to_gzip(self):
+        assert StorageService._resolve_compression("gzip") == "gzip"
+        assert StorageService._resolve_compression("none") is None
+        assert StorageService._resolve_compression("lz4") == "gzip"
+
+    @pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+    def test_firebase_blob_carries_content_encoding(self, encoding):
+        bucket = MagicMock()
+        storage = StorageService(backend=FirebaseBackend(bucket))
+        storage.compression = encoding
+        storage._compress = lambda content: content
+
+        archived = storage.archive(CSV, "etf.csv")
+
+        blob = bucket.blob.return_value
+        assert blob.content_encoding == encoding
+        assert bucket.blob.call_args.args[0] == archived.key
+
+    def test_bundle_members_are_readable_by_range(self, storage, tmp_path):
+        files = [(f"etf{i}.csv", CSV + str(i).encode()) for i in range(5)]
+        archived = storage.archive_bundle(files)
+
+        assert len({a.key for a in archived}) == 1
+        for (name, content), a in zip(files, archived):
+            assert a.file_name == name
+            assert storage.read_archived(a.key, a.offset, a.length, a.content_encoding) == content
+
+    def test_bundle_is_a_tar_with_index(self, storage, tmp_path):
+        archived = storage.archive_bundle([("a.csv", CSV), ("b.csv", CSV)])
+
+        with tarfile.open(tmp_path / archived[0].key) as tar:
+            names = tar.getnames()
+            index = json.load(tar.extractfile("index.json"))
+        assert names[-1] == "index.json"
+        assert [f["file_name"] for f in index["files"]] == ["a.csv", "b.csv"]
+        assert [f["offset"] for f in index["files"]] == [a.offset for a in archived]
+
+
+class TestArchiveBundler:
+    def make(self, storage, **limits):
+        flushed = []
+        options = {"max_files": 3, "max_bytes": 1 << 20, "max_age": 60, **limits}
+        bundler = ArchiveBundler(on_flush=flushed.extend, enabled=True, storage_factory=lambda: storage, **options)
+        return bundler, flushed
+
+    async def test_flushes_at_file_limit(self, storage):
+        bundler, flushed = self.make(storage)
+
+        await bundler.add("a.csv", CSV)
+        await bundler.add("b.csv", CSV)
+        assert flushed == []
+
+        await bundler.add("c.csv", CSV)
+        assert [f.file_name for f in flushed] == ["a.csv", "b.csv", "c.csv"]
+        assert bundler.pending == [] and bundler.bundles_written == 1
+
+    async def test_flushes_at_byte_limit(self, storage):
+        bundler, flushed = self.make(storage, max_bytes=len(CSV) * 2)
+
+        await bundler.add("a.csv", CSV)
+        await bundler.add("b.csv", CSV)
+        assert len(flushed) == 2
+
+    async def test_explicit_flush_and_empty_flush(self, storage):
+        bundler, flushed = self.make(storage)
+
+        await bundler.flush()
+        assert flushed == [] and bundler.bundles_written == 0
+
+        await bundler.add("a.csv", CSV)
+        await bundler.flush()
+        assert storage.read_archived(flushed[0].key, flushed[0].offset, flushed[0].length, "gzip") == CSV
+
+    async def test_failed_write_keeps_files_for_the_next_flush(self, storage, monkeypatch):
+        bundler, flushed = self.make(storage)
+        await bundler.add("a.csv", CSV)
+        await bundler.add("b.csv", CSV)
+
+        monkeypatch.setattr(storage, "archive_bundle", MagicMock(side_effect=OSError("bucket unavailable")))
+        with pytest.raises(OSError):
+            await bundler.flush()
+        assert [name for name, _ in bundler.pending] == ["a.csv", "b.csv"]
+        assert bundler.pending_bytes == 2 * len(CSV) and bundler.oldest is not None
+
+        monkeypatch.undo()
+        await bundler.flush()
+        assert [f.file_name for f in flushed] == ["a.csv", "b.csv"] and bundler.pending == []